@@ -6,6 +6,7 @@ import click
 from flask import current_app
 from werkzeug.exceptions import NotFound
 
+from core.rag.datasource.keyword.jieba.jieba import Jieba
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from extensions.ext_database import db
@@ -13,7 +14,7 @@ from libs.helper import email as email_validate
 from libs.password import hash_password, password_pattern, valid_password
 from libs.rsa import generate_key_pair
 from models.account import Tenant
-from models.dataset import Dataset, DatasetCollectionBinding, DocumentSegment
+from models.dataset import Dataset, DatasetCollectionBinding, DatasetKeywordTable, DocumentSegment
 from models.dataset import Document as DatasetDocument
 from models.model import Account, App, AppAnnotationSetting, AppMode, Conversation, MessageAnnotation
 from models.provider import Provider, ProviderModel
@@ -440,9 +441,45 @@ def convert_to_agent_apps():
     click.echo(click.style('Congratulations! Converted {} agent apps.'.format(len(proceeded_app_ids)), fg='green'))
 
 
+@click.command('migrate-keyword-postings', help='Migrate legacy keyword tables of datasets to keyword postings.')
+def migrate_keyword_postings():
+    """
+    Move the legacy json keyword tables of datasets into keyword postings, run once after upgrading.
+    Keyword search of a dataset returns nothing until its keyword table is migrated.
+    """
+    click.echo(click.style('Start migrate keyword tables.', fg='green'))
+    migrated_count = 0
+    failed_dataset_ids = set()
+
+    while True:
+        # migrated keyword tables are deleted
+        dataset = db.session.query(Dataset).join(
+            DatasetKeywordTable, DatasetKeywordTable.dataset_id == Dataset.id
+        ).filter(Dataset.id.notin_(failed_dataset_ids)).first()
+        if not dataset:
+            break
+
+        click.echo('Migrating keyword table of dataset: {}'.format(dataset.id))
+        try:
+            node_count = Jieba(dataset).migrate_legacy_keyword_table()
+            migrated_count += 1
+            click.echo(click.style('Migrated {} index nodes of dataset: {}'.format(node_count, dataset.id),
+                                   fg='green'))
+        except Exception as e:
+            db.session.rollback()
+            failed_dataset_ids.add(dataset.id)
+            click.echo(
+                click.style('Migrate keyword table error: {} {}'.format(e.__class__.__name__,
+                                                                        str(e)), fg='red'))
+
+    click.echo(click.style('Congratulations! Migrated keyword tables of {} datasets, {} failed.'.format(
+        migrated_count, len(failed_dataset_ids)), fg='green'))
+
+
 def register_commands(app):
     app.cli.add_command(reset_password)
     app.cli.add_command(reset_email)
     app.cli.add_command(reset_encrypt_key_pair)
     app.cli.add_command(vdb_migrate)
     app.cli.add_command(convert_to_agent_apps)
+    app.cli.add_command(migrate_keyword_postings)
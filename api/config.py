@@ -72,6 +72,35 @@ DEFAULTS = {
     'BATCH_UPLOAD_LIMIT': 20,
     'CODE_EXECUTION_ENDPOINT': 'http://sandbox:8194',
     'CODE_EXECUTION_API_KEY': 'dify-sandbox',
+    'WORKFLOW_MAX_PARALLELISM': 5,
+    'WORKFLOW_PERSISTENCE_FLUSH_INTERVAL': 5,
+    'EMBEDDING_QUERY_CACHE_SIZE': 1000,
+    'EMBEDDING_QUERY_CACHE_TTL': 600,
+    'EMBEDDING_MAX_CONCURRENCY': 5,
+    'HYBRID_SEARCH_FUSION_METHOD': 'rrf',
+    'HYBRID_SEARCH_OVERSAMPLE_FACTOR': 2,
+    'HYBRID_SEARCH_RRF_K': 60,
+    'HYBRID_SEARCH_SEMANTIC_WEIGHT': 0.5,
+    'RETRIEVAL_MAX_WORKERS': 32,
+    'RETRIEVAL_TIMEOUT': 30,
+    'RERANK_CACHE_SIZE': 10000,
+    'RERANK_CACHE_TTL': 3600,
+    'RERANK_BATCH_SIZE': 64,
+    'RERANK_MAX_CONCURRENCY': 4,
+    'RESPONSE_CACHE_MAX_ENTRIES': 500,
+    'PROVIDER_CONFIGURATIONS_CACHE_SIZE': 1000,
+    'PROVIDER_CONFIGURATIONS_CACHE_TTL': 300,
+    'ANNOTATION_INDEX_CACHE_SIZE': 100,
+    'ANNOTATION_INDEX_CACHE_TTL': 600,
+    'ANNOTATION_INDEX_MAX_SIZE': 2000,
+    'PROVIDER_USAGE_FLUSH_INTERVAL': 30,
+    'PROVIDER_QUOTA_COUNTER_TTL': 600,
+    'APP_QUEUE_BACKEND': 'memory',
+    'APP_QUEUE_STREAM_MAXLEN': 10000,
+    'APP_QUEUE_STREAM_TTL': 600,
+    'APP_QUEUE_STREAM_MAX_WORKERS': 100,
+    'STREAM_COALESCE_WINDOW_MS': 0,
+    'STREAM_COALESCE_MAX_SIZE': 1024,
     'TOOL_ICON_CACHE_MAX_AGE': 3600,
     'MILVUS_DATABASE': 'default',
     'KEYWORD_DATA_SOURCE_TYPE': 'database',
@@ -360,6 +389,69 @@ class Config:
         self.CODE_EXECUTION_ENDPOINT = get_env('CODE_EXECUTION_ENDPOINT')
         self.CODE_EXECUTION_API_KEY = get_env('CODE_EXECUTION_API_KEY')
 
+        # max number of workflow nodes of parallel branches running at the same time in one workflow run
+        self.WORKFLOW_MAX_PARALLELISM = int(get_env('WORKFLOW_MAX_PARALLELISM'))
+        # interval in seconds of flushing workflow run and node execution records during a run,
+        # they are always flushed when the run finishes
+        self.WORKFLOW_PERSISTENCE_FLUSH_INTERVAL = int(get_env('WORKFLOW_PERSISTENCE_FLUSH_INTERVAL'))
+
+        # query embedding cache, max number of vectors kept in process and ttl in seconds,
+        # ttl can be set per model like: openai:text-embedding-3-small=3600,cohere:embed-english-v3.0=1800
+        self.EMBEDDING_QUERY_CACHE_SIZE = int(get_env('EMBEDDING_QUERY_CACHE_SIZE'))
+        self.EMBEDDING_QUERY_CACHE_TTL = int(get_env('EMBEDDING_QUERY_CACHE_TTL'))
+        self.EMBEDDING_QUERY_CACHE_MODEL_TTLS = get_env('EMBEDDING_QUERY_CACHE_MODEL_TTLS')
+
+        # max number of concurrent embedding requests to one provider while indexing, per process
+        self.EMBEDDING_MAX_CONCURRENCY = int(get_env('EMBEDDING_MAX_CONCURRENCY'))
+
+        # hybrid search fusion of semantic and full text results, `rrf` (reciprocal rank fusion) or `weighted`
+        # (weighted sum of min-max normalized scores), each search fetches top k * oversample factor results
+        self.HYBRID_SEARCH_FUSION_METHOD = get_env('HYBRID_SEARCH_FUSION_METHOD')
+        self.HYBRID_SEARCH_OVERSAMPLE_FACTOR = int(get_env('HYBRID_SEARCH_OVERSAMPLE_FACTOR'))
+        self.HYBRID_SEARCH_RRF_K = int(get_env('HYBRID_SEARCH_RRF_K'))
+        self.HYBRID_SEARCH_SEMANTIC_WEIGHT = float(get_env('HYBRID_SEARCH_SEMANTIC_WEIGHT'))
+
+        # shared retrieval thread pool size per process, and seconds to wait for the searches of a retrieval
+        self.RETRIEVAL_MAX_WORKERS = int(get_env('RETRIEVAL_MAX_WORKERS'))
+        self.RETRIEVAL_TIMEOUT = float(get_env('RETRIEVAL_TIMEOUT'))
+
+        # rerank score cache, max number of scores kept in process and ttl in seconds,
+        # and documents per rerank request for models without max chunks, with concurrent requests per rerank
+        self.RERANK_CACHE_SIZE = int(get_env('RERANK_CACHE_SIZE'))
+        self.RERANK_CACHE_TTL = int(get_env('RERANK_CACHE_TTL'))
+        self.RERANK_BATCH_SIZE = int(get_env('RERANK_BATCH_SIZE'))
+        self.RERANK_MAX_CONCURRENCY = int(get_env('RERANK_MAX_CONCURRENCY'))
+
+        # max number of cached queries per app config kept for the similarity lookup of the app response cache
+        self.RESPONSE_CACHE_MAX_ENTRIES = int(get_env('RESPONSE_CACHE_MAX_ENTRIES'))
+
+        # max number of tenants whose provider configurations are cached in process, and ttl in seconds
+        self.PROVIDER_CONFIGURATIONS_CACHE_SIZE = int(get_env('PROVIDER_CONFIGURATIONS_CACHE_SIZE'))
+        self.PROVIDER_CONFIGURATIONS_CACHE_TTL = int(get_env('PROVIDER_CONFIGURATIONS_CACHE_TTL'))
+
+        # in-process annotation reply index, max number of apps kept and ttl in seconds,
+        # apps with more annotations than the max size are searched in the vector database
+        self.ANNOTATION_INDEX_CACHE_SIZE = int(get_env('ANNOTATION_INDEX_CACHE_SIZE'))
+        self.ANNOTATION_INDEX_CACHE_TTL = int(get_env('ANNOTATION_INDEX_CACHE_TTL'))
+        self.ANNOTATION_INDEX_MAX_SIZE = int(get_env('ANNOTATION_INDEX_MAX_SIZE'))
+
+        # seconds between flushes of provider quota usage and last used time accounted in redis,
+        # and ttl in seconds of the quota used counters, after which they are reloaded from the database
+        self.PROVIDER_USAGE_FLUSH_INTERVAL = int(get_env('PROVIDER_USAGE_FLUSH_INTERVAL'))
+        self.PROVIDER_QUOTA_COUNTER_TTL = int(get_env('PROVIDER_QUOTA_COUNTER_TTL'))
+
+        # backend of generate task event streams: memory or redis_stream, redis streams can be resumed
+        # from any api worker, with max length and ttl in seconds, produced by a pool of max workers per process
+        self.APP_QUEUE_BACKEND = get_env('APP_QUEUE_BACKEND')
+        self.APP_QUEUE_STREAM_MAXLEN = int(get_env('APP_QUEUE_STREAM_MAXLEN'))
+        self.APP_QUEUE_STREAM_TTL = int(get_env('APP_QUEUE_STREAM_TTL'))
+        self.APP_QUEUE_STREAM_MAX_WORKERS = int(get_env('APP_QUEUE_STREAM_MAX_WORKERS'))
+
+        # streamed text chunks received within the window are sent as one event, up to the max size in characters,
+        # 0 disables coalescing
+        self.STREAM_COALESCE_WINDOW_MS = int(get_env('STREAM_COALESCE_WINDOW_MS'))
+        self.STREAM_COALESCE_MAX_SIZE = int(get_env('STREAM_COALESCE_MAX_SIZE'))
+
         self.API_COMPRESSION_ENABLED = get_bool_env('API_COMPRESSION_ENABLED')
         self.TOOL_ICON_CACHE_MAX_AGE = get_env('TOOL_ICON_CACHE_MAX_AGE')
 
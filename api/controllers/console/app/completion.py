@@ -1,6 +1,7 @@
 import logging
 
 import flask_login
+from flask import request
 from flask_restful import Resource, reqparse
 from werkzeug.exceptions import InternalServerError, NotFound
 
@@ -13,11 +14,13 @@ from controllers.console.app.error import (
     ProviderModelCurrentlyNotSupportError,
     ProviderNotInitializeError,
     ProviderQuotaExceededError,
+    TooManyGenerateTasksError,
 )
 from controllers.console.app.wraps import get_app_model
 from controllers.console.setup import setup_required
 from controllers.console.wraps import account_initialization_required
 from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamPoolFullError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.model_runtime.errors.invoke import InvokeError
@@ -73,6 +76,8 @@ class CompletionMessageApi(Resource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -139,6 +144,8 @@ class ChatMessageApi(Resource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -161,7 +168,28 @@ class ChatMessageStopApi(Resource):
         return {'result': 'success'}, 200
 
 
+class TaskStreamApi(Resource):
+    @setup_required
+    @login_required
+    @account_initialization_required
+    @get_app_model
+    def get(self, app_model, task_id):
+        account = flask_login.current_user
+
+        response = AppGenerateService.attach_stream(
+            task_id=task_id,
+            user=account,
+            invoke_from=InvokeFrom.DEBUGGER,
+            last_event_id=request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        )
+        if response is None:
+            raise NotFound("Task Stream Not Exists.")
+
+        return helper.compact_generate_response(response)
+
+
 api.add_resource(CompletionMessageApi, '/apps/<uuid:app_id>/completion-messages')
 api.add_resource(CompletionMessageStopApi, '/apps/<uuid:app_id>/completion-messages/<string:task_id>/stop')
 api.add_resource(ChatMessageApi, '/apps/<uuid:app_id>/chat-messages')
 api.add_resource(ChatMessageStopApi, '/apps/<uuid:app_id>/chat-messages/<string:task_id>/stop')
+api.add_resource(TaskStreamApi, '/apps/<uuid:app_id>/tasks/<string:task_id>/stream')
@@ -91,3 +91,9 @@ class DraftWorkflowNotExist(BaseHTTPException):
     error_code = 'draft_workflow_not_exist'
     description = "Draft workflow need to be initialized."
     code = 400
+
+
+class TooManyGenerateTasksError(BaseHTTPException):
+    error_code = 'too_many_generate_tasks'
+    description = "Too many generate tasks in progress, please try again later."
+    code = 503
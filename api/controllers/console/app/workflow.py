@@ -7,11 +7,16 @@ from werkzeug.exceptions import InternalServerError, NotFound
 
 import services
 from controllers.console import api
-from controllers.console.app.error import ConversationCompletedError, DraftWorkflowNotExist
+from controllers.console.app.error import (
+    ConversationCompletedError,
+    DraftWorkflowNotExist,
+    TooManyGenerateTasksError,
+)
 from controllers.console.app.wraps import get_app_model
 from controllers.console.setup import setup_required
 from controllers.console.wraps import account_initialization_required
 from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamPoolFullError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from fields.workflow_fields import workflow_fields
 from fields.workflow_run_fields import workflow_run_node_execution_fields
@@ -122,6 +127,8 @@ class AdvancedChatDraftWorkflowRunApi(Resource):
             raise NotFound("Conversation Not Exists.")
         except services.errors.conversation.ConversationCompletedError:
             raise ConversationCompletedError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except ValueError as e:
             raise e
         except Exception as e:
@@ -153,6 +160,8 @@ class DraftWorkflowRunApi(Resource):
             )
 
             return helper.compact_generate_response(response)
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except ValueError as e:
             raise e
         except Exception as e:
@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime, timezone
 
+from flask import request
 from flask_login import current_user
 from flask_restful import reqparse
 from werkzeug.exceptions import InternalServerError, NotFound
@@ -14,10 +15,12 @@ from controllers.console.app.error import (
     ProviderModelCurrentlyNotSupportError,
     ProviderNotInitializeError,
     ProviderQuotaExceededError,
+    TooManyGenerateTasksError,
 )
 from controllers.console.explore.error import NotChatAppError, NotCompletionAppError
 from controllers.console.explore.wraps import InstalledAppResource
 from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamPoolFullError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.model_runtime.errors.invoke import InvokeError
@@ -73,6 +76,8 @@ class CompletionApi(InstalledAppResource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -136,6 +141,8 @@ class ChatApi(InstalledAppResource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -157,7 +164,22 @@ class ChatStopApi(InstalledAppResource):
         return {'result': 'success'}, 200
 
 
+class TaskStreamApi(InstalledAppResource):
+    def get(self, installed_app, task_id):
+        response = AppGenerateService.attach_stream(
+            task_id=task_id,
+            user=current_user,
+            invoke_from=InvokeFrom.EXPLORE,
+            last_event_id=request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        )
+        if response is None:
+            raise NotFound("Task Stream Not Exists.")
+
+        return helper.compact_generate_response(response)
+
+
 api.add_resource(CompletionApi, '/installed-apps/<uuid:installed_app_id>/completion-messages', endpoint='installed_app_completion')
 api.add_resource(CompletionStopApi, '/installed-apps/<uuid:installed_app_id>/completion-messages/<string:task_id>/stop', endpoint='installed_app_stop_completion')
 api.add_resource(ChatApi, '/installed-apps/<uuid:installed_app_id>/chat-messages', endpoint='installed_app_chat_completion')
 api.add_resource(ChatStopApi, '/installed-apps/<uuid:installed_app_id>/chat-messages/<string:task_id>/stop', endpoint='installed_app_stop_chat_completion')
+api.add_resource(TaskStreamApi, '/installed-apps/<uuid:installed_app_id>/tasks/<string:task_id>/stream', endpoint='installed_app_task_stream')
@@ -13,6 +13,7 @@ from controllers.console.app.error import (
     ProviderModelCurrentlyNotSupportError,
     ProviderNotInitializeError,
     ProviderQuotaExceededError,
+    TooManyGenerateTasksError,
 )
 from controllers.console.explore.error import (
     AppSuggestedQuestionsAfterAnswerDisabledError,
@@ -20,6 +21,7 @@ from controllers.console.explore.error import (
     NotCompletionAppError,
 )
 from controllers.console.explore.wraps import InstalledAppResource
+from core.app.apps.task_stream_broker import TaskStreamPoolFullError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.model_runtime.errors.invoke import InvokeError
@@ -108,6 +110,8 @@ class MessageMoreLikeThisApi(InstalledAppResource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -9,10 +9,12 @@ from controllers.console.app.error import (
     ProviderModelCurrentlyNotSupportError,
     ProviderNotInitializeError,
     ProviderQuotaExceededError,
+    TooManyGenerateTasksError,
 )
 from controllers.console.explore.error import NotWorkflowAppError
 from controllers.console.explore.wraps import InstalledAppResource
 from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamPoolFullError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.model_runtime.errors.invoke import InvokeError
@@ -55,6 +57,8 @@ class InstalledAppWorkflowRunApi(InstalledAppResource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -1,5 +1,6 @@
 import logging
 
+from flask import request
 from flask_restful import Resource, reqparse
 from werkzeug.exceptions import InternalServerError, NotFound
 
@@ -13,9 +14,11 @@ from controllers.service_api.app.error import (
     ProviderModelCurrentlyNotSupportError,
     ProviderNotInitializeError,
     ProviderQuotaExceededError,
+    TooManyGenerateTasksError,
 )
 from controllers.service_api.wraps import FetchUserArg, WhereisUserArg, validate_app_token
 from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamPoolFullError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.model_runtime.errors.invoke import InvokeError
@@ -73,6 +76,8 @@ class CompletionApi(Resource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -136,6 +141,8 @@ class ChatApi(Resource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -234,6 +241,8 @@ class ChatHomologyApi(Resource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -243,8 +252,24 @@ class ChatHomologyApi(Resource):
             raise InternalServerError()
 
 
+class TaskStreamApi(Resource):
+    @validate_app_token(fetch_user_arg=FetchUserArg(fetch_from=WhereisUserArg.QUERY, required=True))
+    def get(self, app_model: App, end_user: EndUser, task_id):
+        response = AppGenerateService.attach_stream(
+            task_id=task_id,
+            user=end_user,
+            invoke_from=InvokeFrom.SERVICE_API,
+            last_event_id=request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        )
+        if response is None:
+            raise NotFound("Task Stream Not Exists.")
+
+        return helper.compact_generate_response(response)
+
+
 api.add_resource(CompletionApi, '/completion-messages')
 api.add_resource(CompletionStopApi, '/completion-messages/<string:task_id>/stop')
 api.add_resource(ChatApi, '/chat-messages')
 api.add_resource(ChatStopApi, '/chat-messages/<string:task_id>/stop')
 api.add_resource(ChatHomologyApi, '/chat-homology-messages')
+api.add_resource(TaskStreamApi, '/tasks/<string:task_id>/stream')
@@ -1,5 +1,6 @@
 import logging
 
+from flask import request
 from flask_restful import reqparse
 from werkzeug.exceptions import InternalServerError, NotFound
 
@@ -14,9 +15,11 @@ from controllers.web.error import (
     ProviderModelCurrentlyNotSupportError,
     ProviderNotInitializeError,
     ProviderQuotaExceededError,
+    TooManyGenerateTasksError,
 )
 from controllers.web.wraps import WebApiResource
 from core.app.apps.base_app_queue_manager import AppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamPoolFullError
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.model_runtime.errors.invoke import InvokeError
@@ -68,6 +71,8 @@ class CompletionApi(WebApiResource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -129,6 +134,8 @@ class ChatApi(WebApiResource):
             raise ProviderQuotaExceededError()
         except ModelCurrentlyNotSupportError:
             raise ProviderModelCurrentlyNotSupportError()
+        except TaskStreamPoolFullError:
+            raise TooManyGenerateTasksError()
         except InvokeError as e:
             raise CompletionRequestError(e.description)
         except ValueError as e:
@@ -149,7 +156,22 @@ class ChatStopApi(WebApiResource):
         return {'result': 'success'}, 200
 
 
+class TaskStreamApi(WebApiResource):
+    def get(self, app_model, end_user, task_id):
+        response = AppGenerateService.attach_stream(
+            task_id=task_id,
+            user=end_user,
+            invoke_from=InvokeFrom.WEB_APP,
+            last_event_id=request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        )
+        if response is None:
+            raise NotFound("Task Stream Not Exists.")
+
+        return helper.compact_generate_response(response)
+
+
 api.add_resource(CompletionApi, '/completion-messages')
 api.add_resource(CompletionStopApi, '/completion-messages/<string:task_id>/stop')
 api.add_resource(ChatApi, '/chat-messages')
 api.add_resource(ChatStopApi, '/chat-messages/<string:task_id>/stop')
+api.add_resource(TaskStreamApi, '/tasks/<string:task_id>/stream')
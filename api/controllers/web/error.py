@@ -115,3 +115,9 @@ class UnsupportedFileTypeError(BaseHTTPException):
     error_code = 'unsupported_file_type'
     description = "File type not allowed."
     code = 415
+
+
+class TooManyGenerateTasksError(BaseHTTPException):
+    error_code = 'too_many_generate_tasks'
+    description = "Too many generate tasks in progress, please try again later."
+    code = 503
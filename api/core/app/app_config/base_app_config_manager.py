@@ -4,6 +4,7 @@ from core.app.app_config.entities import AppAdditionalFeatures, EasyUIBasedAppMo
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
 from core.app.app_config.features.more_like_this.manager import MoreLikeThisConfigManager
 from core.app.app_config.features.opening_statement.manager import OpeningStatementConfigManager
+from core.app.app_config.features.response_cache.manager import ResponseCacheConfigManager
 from core.app.app_config.features.retrieval_resource.manager import RetrievalResourceConfigManager
 from core.app.app_config.features.speech_to_text.manager import SpeechToTextConfigManager
 from core.app.app_config.features.suggested_questions_after_answer.manager import (
@@ -73,4 +74,8 @@ class BaseAppConfigManager:
             config=config_dict
         )
 
+        additional_features.response_cache = ResponseCacheConfigManager.convert(
+            config=config_dict
+        )
+
         return additional_features
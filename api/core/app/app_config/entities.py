@@ -183,6 +183,15 @@ class TextToSpeechEntity(BaseModel):
     language: Optional[str] = None
 
 
+class ResponseCacheEntity(BaseModel):
+    """
+    Response Cache Entity.
+    """
+    enabled: bool
+    ttl: int
+    similarity_threshold: float
+
+
 class FileExtraConfig(BaseModel):
     """
     File Upload Entity.
@@ -199,6 +208,7 @@ class AppAdditionalFeatures(BaseModel):
     more_like_this: bool = False
     speech_to_text: bool = False
     text_to_speech: Optional[TextToSpeechEntity] = None
+    response_cache: Optional[ResponseCacheEntity] = None
 
 
 class AppConfig(BaseModel):
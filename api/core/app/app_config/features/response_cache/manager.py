@@ -0,0 +1,67 @@
+from typing import Optional
+
+from core.app.app_config.entities import ResponseCacheEntity
+
+
+class ResponseCacheConfigManager:
+    DEFAULT_TTL = 3600
+    DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+    @classmethod
+    def convert(cls, config: dict) -> Optional[ResponseCacheEntity]:
+        """
+        Convert model config to model config
+
+        :param config: model config args
+        """
+        response_cache = None
+        response_cache_dict = config.get('response_cache')
+        if response_cache_dict:
+            if 'enabled' in response_cache_dict and response_cache_dict['enabled']:
+                response_cache = ResponseCacheEntity(
+                    enabled=True,
+                    ttl=response_cache_dict.get('ttl') or cls.DEFAULT_TTL,
+                    similarity_threshold=response_cache_dict.get('similarity_threshold')
+                    or cls.DEFAULT_SIMILARITY_THRESHOLD
+                )
+
+        return response_cache
+
+    @classmethod
+    def validate_and_set_defaults(cls, config: dict) -> tuple[dict, list[str]]:
+        """
+        Validate and set defaults for response cache feature
+
+        :param config: app model config args
+        """
+        if not config.get("response_cache"):
+            config["response_cache"] = {
+                "enabled": False
+            }
+
+        if not isinstance(config["response_cache"], dict):
+            raise ValueError("response_cache must be of dict type")
+
+        if "enabled" not in config["response_cache"] or not config["response_cache"]["enabled"]:
+            config["response_cache"]["enabled"] = False
+
+        if not isinstance(config["response_cache"]["enabled"], bool):
+            raise ValueError("enabled in response_cache must be of boolean type")
+
+        if not config["response_cache"]["enabled"]:
+            return config, ["response_cache"]
+
+        if not config["response_cache"].get("ttl"):
+            config["response_cache"]["ttl"] = cls.DEFAULT_TTL
+
+        if not isinstance(config["response_cache"]["ttl"], int) or config["response_cache"]["ttl"] <= 0:
+            raise ValueError("ttl in response_cache must be a positive integer")
+
+        if config["response_cache"].get("similarity_threshold") is None:
+            config["response_cache"]["similarity_threshold"] = cls.DEFAULT_SIMILARITY_THRESHOLD
+
+        similarity_threshold = config["response_cache"]["similarity_threshold"]
+        if not isinstance(similarity_threshold, int | float) or not 0 < similarity_threshold <= 1:
+            raise ValueError("similarity_threshold in response_cache must be a number between 0 and 1")
+
+        return config, ["response_cache"]
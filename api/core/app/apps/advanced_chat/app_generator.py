@@ -16,6 +16,7 @@ from core.app.apps.advanced_chat.generate_task_pipeline import AdvancedChatAppGe
 from core.app.apps.base_app_queue_manager import AppQueueManager, GenerateTaskStoppedException, PublishFrom
 from core.app.apps.message_based_app_generator import MessageBasedAppGenerator
 from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamBroker
 from core.app.entities.app_invoke_entities import AdvancedChatAppGenerateEntity, InvokeFrom
 from core.app.entities.task_entities import ChatbotAppBlockingResponse, ChatbotAppStreamResponse
 from core.file.message_file_parser import MessageFileParser
@@ -146,9 +147,12 @@ class AdvancedChatAppGenerator(MessageBasedAppGenerator):
             stream=stream
         )
 
-        return AdvancedChatAppGenerateResponseConverter.convert(
-            response=response,
-            invoke_from=invoke_from
+        return TaskStreamBroker.relay(
+            task_id=application_generate_entity.task_id,
+            response=AdvancedChatAppGenerateResponseConverter.convert(
+                response=response,
+                invoke_from=invoke_from
+            )
         )
 
     def _generate_worker(self, flask_app: Flask,
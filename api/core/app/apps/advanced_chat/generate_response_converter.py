@@ -4,10 +4,12 @@ from typing import cast
 
 from core.app.apps.base_app_generate_response_converter import AppGenerateResponseConverter
 from core.app.entities.task_entities import (
+    AgentMessageStreamResponse,
     ChatbotAppBlockingResponse,
     ChatbotAppStreamResponse,
     ErrorStreamResponse,
     MessageEndStreamResponse,
+    MessageStreamResponse,
     PingStreamResponse,
 )
 
@@ -58,6 +60,7 @@ class AdvancedChatAppGenerateResponseConverter(AppGenerateResponseConverter):
         :param stream_response: stream response
         :return:
         """
+        message_json_prefixes = {}
         for chunk in stream_response:
             chunk = cast(ChatbotAppStreamResponse, chunk)
             sub_stream_response = chunk.stream_response
@@ -73,6 +76,10 @@ class AdvancedChatAppGenerateResponseConverter(AppGenerateResponseConverter):
                 'created_at': chunk.created_at
             }
 
+            if isinstance(sub_stream_response, MessageStreamResponse | AgentMessageStreamResponse):
+                yield cls._message_to_json(response_chunk, sub_stream_response, message_json_prefixes)
+                continue
+
             if isinstance(sub_stream_response, ErrorStreamResponse):
                 data = cls._error_to_stream_response(sub_stream_response.err)
                 response_chunk.update(data)
@@ -88,6 +95,7 @@ class AdvancedChatAppGenerateResponseConverter(AppGenerateResponseConverter):
         :param stream_response: stream response
         :return:
         """
+        message_json_prefixes = {}
         for chunk in stream_response:
             chunk = cast(ChatbotAppStreamResponse, chunk)
             sub_stream_response = chunk.stream_response
@@ -103,6 +111,10 @@ class AdvancedChatAppGenerateResponseConverter(AppGenerateResponseConverter):
                 'created_at': chunk.created_at
             }
 
+            if isinstance(sub_stream_response, MessageStreamResponse | AgentMessageStreamResponse):
+                yield cls._message_to_json(response_chunk, sub_stream_response, message_json_prefixes)
+                continue
+
             if isinstance(sub_stream_response, MessageEndStreamResponse):
                 sub_stream_response_dict = sub_stream_response.to_dict()
                 metadata = sub_stream_response_dict.get('metadata', {})
@@ -36,6 +36,7 @@ from core.app.entities.task_entities import (
 from core.app.task_pipeline.based_generate_task_pipeline import BasedGenerateTaskPipeline
 from core.app.task_pipeline.message_cycle_manage import MessageCycleManage
 from core.app.task_pipeline.workflow_cycle_manage import WorkflowCycleManage
+from core.app.task_pipeline.workflow_run_writer import WorkflowRunWriter
 from core.file.file_obj import FileVar
 from core.model_runtime.entities.llm_entities import LLMUsage
 from core.model_runtime.utils.encoders import jsonable_encoder
@@ -48,7 +49,7 @@ from models.account import Account
 from models.model import Conversation, EndUser, Message
 from models.workflow import (
     Workflow,
-    WorkflowNodeExecution,
+    WorkflowNodeExecutionStatus,
     WorkflowRunStatus,
 )
 
@@ -102,6 +103,7 @@ class AdvancedChatAppGenerateTaskPipeline(BasedGenerateTaskPipeline, WorkflowCyc
         self._task_state = AdvancedChatTaskState(
             usage=LLMUsage.empty_usage()
         )
+        self._workflow_run_writer = WorkflowRunWriter()
 
         self._stream_generate_routes = self._get_stream_generate_routes()
         self._conversation_name_generate_thread = None
@@ -121,7 +123,7 @@ class AdvancedChatAppGenerateTaskPipeline(BasedGenerateTaskPipeline, WorkflowCyc
             self._application_generate_entity.query
         )
 
-        generator = self._process_stream_response()
+        generator = self._workflow_run_writer.flush_on_close(self._process_stream_response())
         if self._stream:
             return self._to_stream_response(generator)
         else:
@@ -164,8 +166,9 @@ class AdvancedChatAppGenerateTaskPipeline(BasedGenerateTaskPipeline, WorkflowCyc
         To stream response.
         :return:
         """
+        # per chunk, the stream responses are built without validation
         for stream_response in generator:
-            yield ChatbotAppStreamResponse(
+            yield ChatbotAppStreamResponse.construct(
                 conversation_id=self._conversation.id,
                 message_id=self._message.id,
                 created_at=int(self._message.created_at.timestamp()),
@@ -481,20 +484,24 @@ class AdvancedChatAppGenerateTaskPipeline(BasedGenerateTaskPipeline, WorkflowCyc
                     if route_chunk_node_id not in self._task_state.ran_node_execution_infos:
                         break
 
-                    latest_node_execution_info = self._task_state.latest_node_execution_info
-
                     # get route chunk node execution info
                     route_chunk_node_execution_info = self._task_state.ran_node_execution_infos[route_chunk_node_id]
+
+                    # get route chunk node execution
+                    route_chunk_node_execution = self._workflow_run_writer.get(
+                        route_chunk_node_execution_info.workflow_node_execution_id)
+
+                    # node of a parallel branch is still running, wait for it
+                    if route_chunk_node_execution.status == WorkflowNodeExecutionStatus.RUNNING.value:
+                        break
+
                     if (route_chunk_node_execution_info.node_type == NodeType.LLM
-                            and latest_node_execution_info.node_type == NodeType.LLM):
+                            and route_chunk_node_id in self._task_state.streamed_node_ids
+                            and route_chunk_node_id not in self._task_state.dropped_stream_node_ids):
                         # only LLM support chunk stream output
                         self._task_state.current_stream_generate_state.current_route_position += 1
                         continue
 
-                    # get route chunk node execution
-                    route_chunk_node_execution = db.session.query(WorkflowNodeExecution).filter(
-                        WorkflowNodeExecution.id == route_chunk_node_execution_info.workflow_node_execution_id).first()
-
                     outputs = route_chunk_node_execution.outputs_dict
 
                     # get value from outputs
@@ -570,11 +577,33 @@ class AdvancedChatAppGenerateTaskPipeline(BasedGenerateTaskPipeline, WorkflowCyc
         if 'node_id' not in event.metadata:
             return True
 
+        node_id = event.metadata.get('node_id')
         node_type = event.metadata.get('node_type')
         stream_output_value_selector = event.metadata.get('value_selector')
         if not stream_output_value_selector:
             return False
 
+        if node_type != NodeType.LLM:
+            # only LLM support chunk stream output
+            return False
+
+        if not self._is_stream_out_at_current_route(stream_output_value_selector) \
+                or node_id in self._task_state.dropped_stream_node_ids:
+            # once a chunk of the node is dropped, the whole output will be generated when the node finished
+            if node_id not in self._task_state.streamed_node_ids:
+                self._task_state.dropped_stream_node_ids.add(node_id)
+
+            return False
+
+        self._task_state.streamed_node_ids.add(node_id)
+        return True
+
+    def _is_stream_out_at_current_route(self, stream_output_value_selector: list[str]) -> bool:
+        """
+        Is stream output value selector at current route position
+        :param stream_output_value_selector: stream output value selector
+        :return:
+        """
         if not self._task_state.current_stream_generate_state:
             return False
 
@@ -584,18 +613,11 @@ class AdvancedChatAppGenerateTaskPipeline(BasedGenerateTaskPipeline, WorkflowCyc
         if route_chunk.type != 'var':
             return False
 
-        if node_type != NodeType.LLM:
-            # only LLM support chunk stream output
-            return False
-
         route_chunk = cast(VarGenerateRouteChunk, route_chunk)
         value_selector = route_chunk.value_selector
 
         # check chunk node id is before current node id or equal to current node id
-        if value_selector != stream_output_value_selector:
-            return False
-
-        return True
+        return value_selector == stream_output_value_selector
 
     def _handle_output_moderation_chunk(self, text: str) -> bool:
         """
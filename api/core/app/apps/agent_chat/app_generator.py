@@ -16,6 +16,7 @@ from core.app.apps.agent_chat.generate_response_converter import AgentChatAppGen
 from core.app.apps.base_app_queue_manager import AppQueueManager, GenerateTaskStoppedException, PublishFrom
 from core.app.apps.message_based_app_generator import MessageBasedAppGenerator
 from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamBroker
 from core.app.entities.app_invoke_entities import AgentChatAppGenerateEntity, InvokeFrom
 from core.file.message_file_parser import MessageFileParser
 from core.model_runtime.errors.invoke import InvokeAuthorizationError, InvokeError
@@ -155,9 +156,12 @@ class AgentChatAppGenerator(MessageBasedAppGenerator):
             stream=stream
         )
 
-        return AgentChatAppGenerateResponseConverter.convert(
-            response=response,
-            invoke_from=invoke_from
+        return TaskStreamBroker.relay(
+            task_id=application_generate_entity.task_id,
+            response=AgentChatAppGenerateResponseConverter.convert(
+                response=response,
+                invoke_from=invoke_from
+            )
         )
 
     def _generate_worker(self, flask_app: Flask,
@@ -1,13 +1,24 @@
+import json
 import logging
 from abc import ABC, abstractmethod
 from collections.abc import Generator
 from typing import Union
 
 from core.app.entities.app_invoke_entities import InvokeFrom
-from core.app.entities.task_entities import AppBlockingResponse, AppStreamResponse
+from core.app.entities.task_entities import (
+    AgentMessageStreamResponse,
+    AppBlockingResponse,
+    AppStreamResponse,
+    MessageStreamResponse,
+)
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.model_runtime.errors.invoke import InvokeError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class AppGenerateResponseConverter(ABC):
     _blocking_response_type: type[AppBlockingResponse]
@@ -96,6 +107,37 @@ class AppGenerateResponseConverter(ABC):
 
         return metadata
 
+    @classmethod
+    def _message_to_json(cls, response_chunk: dict,
+                         sub_stream_response: Union[MessageStreamResponse, AgentMessageStreamResponse],
+                         prefixes: dict[tuple, str]) -> str:
+        """
+        Message chunk to json, like the json of the response chunk updated with the stream response.
+        The json before the answer is rendered once per message of a stream, only the answer is encoded per chunk.
+        :param response_chunk: response chunk, like event, conversation id, message id and created at
+        :param sub_stream_response: message stream response
+        :param prefixes: rendered json before the answer by message, kept by the caller for the stream
+        :return:
+        """
+        key = (sub_stream_response.event, sub_stream_response.task_id, sub_stream_response.id)
+        prefix = prefixes.get(key)
+        if prefix is None:
+            response_chunk.update({
+                'event': sub_stream_response.event.value,
+                'task_id': sub_stream_response.task_id,
+                'id': sub_stream_response.id,
+                'answer': ''
+            })
+            prefix = json.dumps(response_chunk)[:-len('""}')]
+            prefixes[key] = prefix
+
+        if orjson:
+            answer = orjson.dumps(sub_stream_response.answer).decode()
+        else:
+            answer = json.dumps(sub_stream_response.answer)
+
+        return f'{prefix}{answer}}}'
+
     @classmethod
     def _error_to_stream_response(cls, e: Exception) -> dict:
         """
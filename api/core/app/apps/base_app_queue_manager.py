@@ -5,15 +5,21 @@ from collections.abc import Generator
 from enum import Enum
 from typing import Any
 
+from flask import current_app
 from sqlalchemy.orm import DeclarativeMeta
 
+from core.app.apps.task_stop_registry import TaskStopRegistry
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
+    QueueAgentMessageEvent,
     QueueErrorEvent,
+    QueueLLMChunkEvent,
+    QueueMessage,
     QueuePingEvent,
     QueueStopEvent,
 )
+from core.model_runtime.entities.message_entities import AssistantPromptMessage
 from extensions.ext_redis import redis_client
 
 
@@ -40,6 +46,10 @@ class AppQueueManager:
         q = queue.Queue()
 
         self._q = q
+        self._stopped = TaskStopRegistry.register(self._task_id)
+
+        self._coalesce_window = current_app.config['STREAM_COALESCE_WINDOW_MS'] / 1000
+        self._coalesce_max_size = current_app.config['STREAM_COALESCE_MAX_SIZE']
 
     def listen(self) -> Generator:
         """
@@ -50,13 +60,18 @@ class AppQueueManager:
         listen_timeout = 600
         start_time = time.time()
         last_ping_time = 0
+        # message which ended a coalesce window
+        backlog = []
 
         while True:
             try:
-                message = self._q.get(timeout=1)
+                message = backlog.pop() if backlog else self._q.get(timeout=1)
                 if message is None:
                     break
 
+                if self._coalesce_window > 0 and self._is_text_chunk(message):
+                    message = self._coalesce_text_chunks(message, backlog)
+
                 yield message
             except queue.Empty:
                 continue
@@ -74,6 +89,60 @@ class AppQueueManager:
                     self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
                     last_ping_time = elapsed_time // 10
 
+    def _coalesce_text_chunks(self, message: QueueMessage, backlog: list) -> QueueMessage:
+        """
+        Coalesce the text chunks received within the coalesce window after message, up to the max size
+        :param message: first text chunk
+        :param backlog: receives the message which ended the window, if any
+        :return: coalesced text chunk
+        """
+        deadline = time.monotonic() + self._coalesce_window
+        chunk = message.event.chunk
+        texts = [chunk.delta.message.content]
+        size = len(texts[0])
+        last_delta = chunk.delta
+        while size < self._coalesce_max_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+
+            try:
+                next_message = self._q.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            if (next_message is None
+                    or type(next_message.event) is not type(message.event)
+                    or not self._is_text_chunk(next_message)):
+                backlog.append(next_message)
+                break
+
+            last_delta = next_message.event.chunk.delta
+            texts.append(last_delta.message.content)
+            size += len(last_delta.message.content)
+
+        if len(texts) == 1:
+            return message
+
+        # usage and finish reason come with the last chunk
+        coalesced_chunk = chunk.copy(update={
+            'delta': last_delta.copy(update={
+                'index': chunk.delta.index,
+                'message': AssistantPromptMessage(content=''.join(texts))
+            })
+        })
+
+        return message.copy(update={'event': message.event.copy(update={'chunk': coalesced_chunk})})
+
+    @staticmethod
+    def _is_text_chunk(message: QueueMessage) -> bool:
+        event = message.event
+        if not isinstance(event, QueueLLMChunkEvent | QueueAgentMessageEvent):
+            return False
+
+        delta_message = event.chunk.delta.message
+        return isinstance(delta_message.content, str) and not delta_message.tool_calls
+
     def stop_listen(self) -> None:
         """
         Stop listen to queue
@@ -118,28 +187,30 @@ class AppQueueManager:
         Set task stop flag
         :return:
         """
+        if not cls.is_task_owner(task_id, invoke_from, user_id):
+            return
+
+        TaskStopRegistry.stop(task_id)
+
+    @classmethod
+    def is_task_owner(cls, task_id: str, invoke_from: InvokeFrom, user_id: str) -> bool:
+        """
+        Check if task belongs to user
+        :return:
+        """
         result = redis_client.get(cls._generate_task_belong_cache_key(task_id))
         if result is None:
-            return
+            return False
 
         user_prefix = 'account' if invoke_from in [InvokeFrom.EXPLORE, InvokeFrom.DEBUGGER] else 'end-user'
-        if result.decode('utf-8') != f"{user_prefix}-{user_id}":
-            return
-
-        stopped_cache_key = cls._generate_stopped_cache_key(task_id)
-        redis_client.setex(stopped_cache_key, 600, 1)
+        return result.decode('utf-8') == f"{user_prefix}-{user_id}"
 
     def _is_stopped(self) -> bool:
         """
-        Check if task is stopped
+        Check if task is stopped, by the local flag set when the stop is published
         :return:
         """
-        stopped_cache_key = AppQueueManager._generate_stopped_cache_key(self._task_id)
-        result = redis_client.get(stopped_cache_key)
-        if result is not None:
-            return True
-
-        return False
+        return self._stopped.is_set()
 
     @classmethod
     def _generate_task_belong_cache_key(cls, task_id: str) -> str:
@@ -150,15 +221,6 @@ class AppQueueManager:
         """
         return f"generate_task_belong:{task_id}"
 
-    @classmethod
-    def _generate_stopped_cache_key(cls, task_id: str) -> str:
-        """
-        Generate stopped cache key
-        :param task_id: task id
-        :return:
-        """
-        return f"generate_task_stopped:{task_id}"
-
     def _check_for_sqlalchemy_models(self, data: Any):
         # from entity to dict or list
         if isinstance(data, dict):
@@ -10,9 +10,15 @@ from core.app.entities.app_invoke_entities import (
     InvokeFrom,
     ModelConfigWithCredentialsEntity,
 )
-from core.app.entities.queue_entities import QueueAgentMessageEvent, QueueLLMChunkEvent, QueueMessageEndEvent
+from core.app.entities.queue_entities import (
+    QueueAgentMessageEvent,
+    QueueLLMChunkEvent,
+    QueueMessageEndEvent,
+    QueueResponseCacheHitEvent,
+)
 from core.app.features.annotation_reply.annotation_reply import AnnotationReplyFeature
 from core.app.features.hosting_moderation.hosting_moderation import HostingModerationFeature
+from core.app.features.response_cache.response_cache import ResponseCacheFeature
 from core.external_data_tool.external_data_fetch import ExternalDataFetch
 from core.file.file_obj import FileVar
 from core.memory.token_buffer_memory import TokenBufferMemory
@@ -202,7 +208,9 @@ class AppRunner:
                       prompt_messages: list,
                       text: str,
                       stream: bool,
-                      usage: Optional[LLMUsage] = None) -> None:
+                      usage: Optional[LLMUsage] = None,
+                      chunk_size: int = 1,
+                      interval: float = 0.01) -> None:
         """
         Direct output
         :param queue_manager: application queue manager
@@ -211,17 +219,19 @@ class AppRunner:
         :param text: text
         :param stream: stream
         :param usage: usage
+        :param chunk_size: characters per streamed chunk
+        :param interval: seconds to wait between streamed chunks
         :return:
         """
         if stream:
             index = 0
-            for token in text:
+            for i in range(0, len(text), chunk_size):
                 chunk = LLMResultChunk(
                     model=app_generate_entity.model_config.model,
                     prompt_messages=prompt_messages,
                     delta=LLMResultChunkDelta(
                         index=index,
-                        message=AssistantPromptMessage(content=token)
+                        message=AssistantPromptMessage(content=text[i:i + chunk_size])
                     )
                 )
 
@@ -231,7 +241,8 @@ class AppRunner:
                     ), PublishFrom.APPLICATION_MANAGER
                 )
                 index += 1
-                time.sleep(0.01)
+                if interval:
+                    time.sleep(interval)
 
         queue_manager.publish(
             QueueMessageEndEvent(
@@ -412,6 +423,39 @@ class AppRunner:
             query=query
         )
     
+    def query_response_cache(self, application_generate_entity: EasyUIBasedAppGenerateEntity) -> Optional[str]:
+        """
+        Query cached answer of the request
+        :param application_generate_entity: application generate entity
+        :return: cached answer
+        """
+        response_cache_feature = ResponseCacheFeature()
+        return response_cache_feature.query(application_generate_entity)
+
+    def direct_output_cached_response(self, queue_manager: AppQueueManager,
+                                      app_generate_entity: EasyUIBasedAppGenerateEntity,
+                                      prompt_messages: list,
+                                      text: str) -> None:
+        """
+        Replay cached answer through the task pipeline
+        :param queue_manager: application queue manager
+        :param app_generate_entity: app generate entity
+        :param prompt_messages: prompt messages
+        :param text: cached answer
+        :return:
+        """
+        queue_manager.publish(QueueResponseCacheHitEvent(), PublishFrom.APPLICATION_MANAGER)
+
+        self.direct_output(
+            queue_manager=queue_manager,
+            app_generate_entity=app_generate_entity,
+            prompt_messages=prompt_messages,
+            text=text,
+            stream=app_generate_entity.stream,
+            chunk_size=ResponseCacheFeature.REPLAY_CHUNK_SIZE,
+            interval=0
+        )
+
     def query_app_annotations_to_reply(self, app_record: App,
                                        message: Message,
                                        query: str,
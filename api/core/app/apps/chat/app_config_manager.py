@@ -9,6 +9,7 @@ from core.app.app_config.easy_ui_based_app.variables.manager import BasicVariabl
 from core.app.app_config.entities import EasyUIBasedAppConfig, EasyUIBasedAppModelConfigFrom
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
 from core.app.app_config.features.opening_statement.manager import OpeningStatementConfigManager
+from core.app.app_config.features.response_cache.manager import ResponseCacheConfigManager
 from core.app.app_config.features.retrieval_resource.manager import RetrievalResourceConfigManager
 from core.app.app_config.features.speech_to_text.manager import SpeechToTextConfigManager
 from core.app.app_config.features.suggested_questions_after_answer.manager import (
@@ -131,6 +132,10 @@ class ChatAppConfigManager(BaseAppConfigManager):
         config, current_related_config_keys = TextToSpeechConfigManager.validate_and_set_defaults(config)
         related_config_keys.extend(current_related_config_keys)
 
+        # response_cache
+        config, current_related_config_keys = ResponseCacheConfigManager.validate_and_set_defaults(config)
+        related_config_keys.extend(current_related_config_keys)
+
         # return retriever resource
         config, current_related_config_keys = RetrievalResourceConfigManager.validate_and_set_defaults(config)
         related_config_keys.extend(current_related_config_keys)
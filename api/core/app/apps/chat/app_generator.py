@@ -17,6 +17,7 @@ from core.app.apps.chat.app_runner import ChatAppRunner
 from core.app.apps.chat.generate_response_converter import ChatAppGenerateResponseConverter
 from core.app.apps.message_based_app_generator import MessageBasedAppGenerator
 from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamBroker
 from core.app.entities.app_invoke_entities import ChatAppGenerateEntity, InvokeFrom
 from core.file.message_file_parser import MessageFileParser
 from core.model_runtime.errors.invoke import InvokeAuthorizationError, InvokeError
@@ -165,9 +166,12 @@ class ChatAppGenerator(MessageBasedAppGenerator):
             stream=stream
         )
 
-        return ChatAppGenerateResponseConverter.convert(
-            response=response,
-            invoke_from=invoke_from
+        return TaskStreamBroker.relay(
+            task_id=application_generate_entity.task_id,
+            response=ChatAppGenerateResponseConverter.convert(
+                response=response,
+                invoke_from=invoke_from
+            )
         )
 
     def _generate_worker(self, flask_app: Flask,
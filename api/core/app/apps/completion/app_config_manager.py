@@ -9,6 +9,7 @@ from core.app.app_config.easy_ui_based_app.variables.manager import BasicVariabl
 from core.app.app_config.entities import EasyUIBasedAppConfig, EasyUIBasedAppModelConfigFrom
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
 from core.app.app_config.features.more_like_this.manager import MoreLikeThisConfigManager
+from core.app.app_config.features.response_cache.manager import ResponseCacheConfigManager
 from core.app.app_config.features.text_to_speech.manager import TextToSpeechConfigManager
 from models.model import App, AppMode, AppModelConfig
 
@@ -113,6 +114,10 @@ class CompletionAppConfigManager(BaseAppConfigManager):
         config, current_related_config_keys = MoreLikeThisConfigManager.validate_and_set_defaults(config)
         related_config_keys.extend(current_related_config_keys)
 
+        # response_cache
+        config, current_related_config_keys = ResponseCacheConfigManager.validate_and_set_defaults(config)
+        related_config_keys.extend(current_related_config_keys)
+
         # moderation validation
         config, current_related_config_keys = SensitiveWordAvoidanceConfigManager.validate_and_set_defaults(tenant_id,
                                                                                                             config)
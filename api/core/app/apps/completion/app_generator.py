@@ -16,6 +16,7 @@ from core.app.apps.completion.app_runner import CompletionAppRunner
 from core.app.apps.completion.generate_response_converter import CompletionAppGenerateResponseConverter
 from core.app.apps.message_based_app_generator import MessageBasedAppGenerator
 from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
+from core.app.apps.task_stream_broker import TaskStreamBroker
 from core.app.entities.app_invoke_entities import CompletionAppGenerateEntity, InvokeFrom
 from core.file.message_file_parser import MessageFileParser
 from core.model_runtime.errors.invoke import InvokeAuthorizationError, InvokeError
@@ -144,9 +145,12 @@ class CompletionAppGenerator(MessageBasedAppGenerator):
             stream=stream
         )
 
-        return CompletionAppGenerateResponseConverter.convert(
-            response=response,
-            invoke_from=invoke_from
+        return TaskStreamBroker.relay(
+            task_id=application_generate_entity.task_id,
+            response=CompletionAppGenerateResponseConverter.convert(
+                response=response,
+                invoke_from=invoke_from
+            )
         )
 
     def _generate_worker(self, flask_app: Flask,
@@ -303,7 +307,10 @@ class CompletionAppGenerator(MessageBasedAppGenerator):
             stream=stream
         )
 
-        return CompletionAppGenerateResponseConverter.convert(
-            response=response,
-            invoke_from=invoke_from
+        return TaskStreamBroker.relay(
+            task_id=application_generate_entity.task_id,
+            response=CompletionAppGenerateResponseConverter.convert(
+                response=response,
+                invoke_from=invoke_from
+            )
         )
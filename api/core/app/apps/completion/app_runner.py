@@ -88,6 +88,17 @@ class CompletionAppRunner(AppRunner):
             )
             return
 
+        # response cache
+        cached_answer = self.query_response_cache(application_generate_entity)
+        if cached_answer is not None:
+            self.direct_output_cached_response(
+                queue_manager=queue_manager,
+                app_generate_entity=application_generate_entity,
+                prompt_messages=prompt_messages,
+                text=cached_answer
+            )
+            return
+
         # fill in variable inputs from external data tools if exists
         external_data_tools = app_config.external_data_variables
         if external_data_tools:
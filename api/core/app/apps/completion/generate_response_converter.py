@@ -8,6 +8,7 @@ from core.app.entities.task_entities import (
     CompletionAppStreamResponse,
     ErrorStreamResponse,
     MessageEndStreamResponse,
+    MessageStreamResponse,
     PingStreamResponse,
 )
 
@@ -57,6 +58,7 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
         :param stream_response: stream response
         :return:
         """
+        message_json_prefixes = {}
         for chunk in stream_response:
             chunk = cast(CompletionAppStreamResponse, chunk)
             sub_stream_response = chunk.stream_response
@@ -71,6 +73,10 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
                 'created_at': chunk.created_at
             }
 
+            if isinstance(sub_stream_response, MessageStreamResponse):
+                yield cls._message_to_json(response_chunk, sub_stream_response, message_json_prefixes)
+                continue
+
             if isinstance(sub_stream_response, ErrorStreamResponse):
                 data = cls._error_to_stream_response(sub_stream_response.err)
                 response_chunk.update(data)
@@ -86,6 +92,7 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
         :param stream_response: stream response
         :return:
         """
+        message_json_prefixes = {}
         for chunk in stream_response:
             chunk = cast(CompletionAppStreamResponse, chunk)
             sub_stream_response = chunk.stream_response
@@ -100,6 +107,10 @@ class CompletionAppGenerateResponseConverter(AppGenerateResponseConverter):
                 'created_at': chunk.created_at
             }
 
+            if isinstance(sub_stream_response, MessageStreamResponse):
+                yield cls._message_to_json(response_chunk, sub_stream_response, message_json_prefixes)
+                continue
+
             if isinstance(sub_stream_response, MessageEndStreamResponse):
                 sub_stream_response_dict = sub_stream_response.to_dict()
                 metadata = sub_stream_response_dict.get('metadata', {})
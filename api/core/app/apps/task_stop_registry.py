@@ -0,0 +1,84 @@
+import threading
+import weakref
+
+from core.helper.pubsub_invalidation import PubSubSubscriber
+from extensions.ext_redis import redis_client
+
+
+class TaskStopRegistry:
+    """
+    Process-wide registry of the stop flags of generate tasks running in the process.
+
+    Stops are published through redis pubsub and set the local flag of the task,
+    so checking whether a task is stopped doesn't cost a redis round trip per event.
+    The stopped key is still set, it's checked when a task registers, as the stop may be published before,
+    and for all registered tasks when the subscriber (re)subscribes, as stops may have been missed.
+    Flags are only weakly referenced, they are dropped with the queue manager of the task.
+    """
+    CHANNEL = 'generate_task_stopped'
+    STOPPED_KEY_TTL = 600
+
+    _flags: weakref.WeakValueDictionary[str, threading.Event] = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    @classmethod
+    def register(cls, task_id: str) -> threading.Event:
+        """
+        Register task running in the process
+        :param task_id: task id
+        :return: stop flag of the task, kept by the caller
+        """
+        PubSubSubscriber.subscribe(cls.CHANNEL, cls._set_stopped, cls._sync_stopped)
+
+        flag = threading.Event()
+        with cls._lock:
+            cls._flags[task_id] = flag
+
+        if redis_client.exists(cls._generate_stopped_cache_key(task_id)):
+            flag.set()
+
+        return flag
+
+    @classmethod
+    def stop(cls, task_id: str) -> None:
+        """
+        Stop task, in whichever process it runs
+        :param task_id: task id
+        :return:
+        """
+        redis_client.setex(cls._generate_stopped_cache_key(task_id), cls.STOPPED_KEY_TTL, 1)
+        redis_client.publish(cls.CHANNEL, task_id)
+
+    @classmethod
+    def _set_stopped(cls, task_id: str) -> None:
+        with cls._lock:
+            flag = cls._flags.get(task_id)
+
+        if flag is not None:
+            flag.set()
+
+    @classmethod
+    def _sync_stopped(cls) -> None:
+        """
+        Set the flags of registered tasks which were stopped while not subscribed
+        :return:
+        """
+        with cls._lock:
+            task_ids = list(cls._flags.keys())
+
+        if not task_ids:
+            return
+
+        stopped = redis_client.mget([cls._generate_stopped_cache_key(task_id) for task_id in task_ids])
+        for task_id, value in zip(task_ids, stopped):
+            if value is not None:
+                cls._set_stopped(task_id)
+
+    @classmethod
+    def _generate_stopped_cache_key(cls, task_id: str) -> str:
+        """
+        Generate stopped cache key
+        :param task_id: task id
+        :return:
+        """
+        return f"generate_task_stopped:{task_id}"
@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+from flask import Flask, current_app
+
+from core.app.apps.task_stop_registry import TaskStopRegistry
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStreamBroker:
+    """
+    Redis streams backend of the event streams of generate tasks, enabled by APP_QUEUE_BACKEND=redis_stream.
+
+    The event stream of a task is produced by a bounded process-wide generation pool,
+    independent of the request which started the task, and appended to a redis stream
+    with bounded length and ttl. Any api worker can attach to the stream of a running or finished task
+    and resume after the id of the last received event, so a dropped client connection doesn't lose the output.
+    Tasks are rejected when all workers of the pool are busy, instead of being queued without a reader.
+    """
+    BLOCK_MILLISECONDS = 1000
+    # producers send pings every 10 seconds while waiting for the model
+    IDLE_TIMEOUT = 60
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _slots: Optional[threading.BoundedSemaphore] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return current_app.config['APP_QUEUE_BACKEND'] == 'redis_stream'
+
+    @classmethod
+    def relay(cls, task_id: str, response: Union[dict, Generator[str, None, None]]) \
+            -> Union[dict, Generator[str, None, None]]:
+        """
+        Produce the event stream of task in the generation pool and attach to it,
+        blocking responses and the memory backend are returned as is
+        :param task_id: task id
+        :param response: converted response of the task
+        :return:
+        """
+        if isinstance(response, dict) or not cls.is_enabled():
+            return response
+
+        flask_app = current_app._get_current_object()
+        executor = cls._get_executor(flask_app)
+        if not cls._slots.acquire(blocking=False):
+            # the task would wait for a worker with no reader attached, stop its generation
+            response.close()
+            TaskStopRegistry.stop(task_id)
+            raise TaskStreamPoolFullError()
+
+        executor.submit(cls._produce, flask_app, task_id, response)
+
+        return cls.attach(task_id)
+
+    @classmethod
+    def exists(cls, task_id: str) -> bool:
+        """
+        Check if the event stream of task exists
+        :param task_id: task id
+        :return:
+        """
+        return bool(redis_client.exists(cls._generate_stream_key(task_id)))
+
+    @classmethod
+    def attach(cls, task_id: str, last_event_id: Optional[str] = None) -> Generator[str, None, None]:
+        """
+        Attach to the event stream of task, until the task ends
+        :param task_id: task id
+        :param last_event_id: id of the last received event, to resume after
+        :return: server-sent events with ids
+        """
+        stream_key = cls._generate_stream_key(task_id)
+        last_event_id = last_event_id or '0-0'
+        idle_since = time.monotonic()
+
+        while True:
+            entries = redis_client.xread({stream_key: last_event_id}, block=cls.BLOCK_MILLISECONDS)
+            if not entries:
+                if time.monotonic() - idle_since >= cls.IDLE_TIMEOUT:
+                    # the producer is gone, e.g. its worker was killed
+                    return
+
+                continue
+
+            idle_since = time.monotonic()
+            for entry_id, fields in entries[0][1]:
+                last_event_id = entry_id.decode()
+                if b'end' in fields:
+                    return
+
+                yield f'id: {last_event_id}\n{fields[b"chunk"].decode()}'
+
+    @classmethod
+    def _produce(cls, flask_app: Flask, task_id: str, response: Generator[str, None, None]) -> None:
+        with flask_app.app_context():
+            stream_key = cls._generate_stream_key(task_id)
+            try:
+                for chunk in response:
+                    cls._append(stream_key, {'chunk': chunk})
+            except Exception:
+                logger.exception(f'Failed to produce event stream of task {task_id}')
+            finally:
+                cls._slots.release()
+                cls._append(stream_key, {'end': 1})
+
+    @classmethod
+    def _append(cls, stream_key: str, fields: dict) -> None:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.xadd(stream_key, fields, maxlen=current_app.config['APP_QUEUE_STREAM_MAXLEN'], approximate=True)
+        pipeline.expire(stream_key, current_app.config['APP_QUEUE_STREAM_TTL'])
+        pipeline.execute()
+
+    @classmethod
+    def _get_executor(cls, flask_app: Flask) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._slots = threading.BoundedSemaphore(flask_app.config['APP_QUEUE_STREAM_MAX_WORKERS'])
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=flask_app.config['APP_QUEUE_STREAM_MAX_WORKERS'],
+                        thread_name_prefix='generate-task-stream'
+                    )
+
+        return cls._executor
+
+    @classmethod
+    def _generate_stream_key(cls, task_id: str) -> str:
+        """
+        Generate stream key
+        :param task_id: task id
+        :return:
+        """
+        return f"generate_task_stream:{task_id}"
+
+
+class TaskStreamPoolFullError(Exception):
+    """
+    Raised when all workers of the generation pool are busy
+    """
+    description = "Too many generate tasks in progress, please try again later."
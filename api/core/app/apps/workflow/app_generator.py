@@ -11,6 +11,7 @@ from pydantic import ValidationError
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
 from core.app.apps.base_app_generator import BaseAppGenerator
 from core.app.apps.base_app_queue_manager import AppQueueManager, GenerateTaskStoppedException, PublishFrom
+from core.app.apps.task_stream_broker import TaskStreamBroker
 from core.app.apps.workflow.app_config_manager import WorkflowAppConfigManager
 from core.app.apps.workflow.app_queue_manager import WorkflowAppQueueManager
 from core.app.apps.workflow.app_runner import WorkflowAppRunner
@@ -104,9 +105,12 @@ class WorkflowAppGenerator(BaseAppGenerator):
             stream=stream
         )
 
-        return WorkflowAppGenerateResponseConverter.convert(
-            response=response,
-            invoke_from=invoke_from
+        return TaskStreamBroker.relay(
+            task_id=application_generate_entity.task_id,
+            response=WorkflowAppGenerateResponseConverter.convert(
+                response=response,
+                invoke_from=invoke_from
+            )
         )
 
     def _generate_worker(self, flask_app: Flask,
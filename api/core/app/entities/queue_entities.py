@@ -26,6 +26,7 @@ class QueueEvent(Enum):
     NODE_FAILED = "node_failed"
     RETRIEVER_RESOURCES = "retriever_resources"
     ANNOTATION_REPLY = "annotation_reply"
+    RESPONSE_CACHE_HIT = "response_cache_hit"
     AGENT_THOUGHT = "agent_thought"
     MESSAGE_FILE = "message_file"
     ERROR = "error"
@@ -89,6 +90,13 @@ class QueueAnnotationReplyEvent(AppQueueEvent):
     message_annotation_id: str
 
 
+class QueueResponseCacheHitEvent(AppQueueEvent):
+    """
+    QueueResponseCacheHitEvent entity
+    """
+    event = QueueEvent.RESPONSE_CACHE_HIT
+
+
 class QueueMessageEndEvent(AppQueueEvent):
     """
     QueueMessageEndEvent entity
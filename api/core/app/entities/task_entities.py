@@ -74,6 +74,11 @@ class AdvancedChatTaskState(WorkflowTaskState):
 
     current_stream_generate_state: Optional[ChatflowStreamGenerateRoute] = None
 
+    # LLM nodes whose chunks were streamed out / dropped because the answer route was not at them yet,
+    # nodes of parallel branches may stream while the answer still waits for another variable
+    streamed_node_ids: set[str] = set()
+    dropped_stream_node_ids: set[str] = set()
+
 
 class StreamEvent(Enum):
     """
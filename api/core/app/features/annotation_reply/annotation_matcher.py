@@ -0,0 +1,191 @@
+from typing import Optional
+
+import numpy as np
+from flask import current_app
+
+from core.embedding.cached_embedding import CacheEmbedding
+from core.helper.pubsub_invalidation import VersionedCache
+from core.model_manager import ModelManager
+from core.model_runtime.entities.model_entities import ModelType
+from core.rag.datasource.vdb.vector_factory import Vector
+from extensions.ext_database import db
+from models.dataset import Dataset
+from models.model import App, AppAnnotationSetting, MessageAnnotation
+from services.dataset_service import DatasetCollectionBindingService
+
+
+class AppAnnotationIndex:
+    """
+    Annotation reply setting of an app, with the normalized question embeddings of its annotations,
+    embeddings are None if the app has too many annotations to keep them in memory
+    """
+
+    def __init__(self, tenant_id: str,
+                 score_threshold: float,
+                 embedding_provider_name: str,
+                 embedding_model_name: str,
+                 collection_binding_id: str,
+                 annotation_ids: Optional[list[str]] = None,
+                 embeddings: Optional[np.ndarray] = None) -> None:
+        self.tenant_id = tenant_id
+        self.score_threshold = score_threshold
+        self.embedding_provider_name = embedding_provider_name
+        self.embedding_model_name = embedding_model_name
+        self.collection_binding_id = collection_binding_id
+        self.annotation_ids = annotation_ids
+        self.embeddings = embeddings
+
+
+class AnnotationMatcher:
+    """
+    Matcher of queries to the annotations of apps with annotation reply enabled.
+
+    The annotation setting and the question embeddings of an app are loaded lazily into a bounded
+    in-process cache, question embeddings come from the embedding cache the annotation index tasks fill.
+    Queries are matched by cosine similarity against all questions in memory,
+    apps with more than ANNOTATION_INDEX_MAX_SIZE annotations are searched in the vector database.
+    Changes of annotations and settings invalidate the app in all processes through redis pubsub.
+    """
+    CHANNEL = 'app_annotation_index_invalidated'
+
+    _cache = VersionedCache(
+        channel=CHANNEL,
+        size_config_key='ANNOTATION_INDEX_CACHE_SIZE',
+        ttl_config_key='ANNOTATION_INDEX_CACHE_TTL'
+    )
+    # apps without annotation reply are cached as None
+    _NOT_CACHED = object()
+
+    @classmethod
+    def match(cls, app_record: App, query: str) -> Optional[tuple[str, float]]:
+        """
+        Match query to the annotations of app
+        :param app_record: app record
+        :param query: query
+        :return: id of the most similar annotation and its score, if above the score threshold
+        """
+        annotation_index = cls._get_index(app_record)
+        if not annotation_index:
+            return None
+
+        if annotation_index.embeddings is None:
+            return cls._search_vector(app_record, annotation_index, query)
+
+        if not annotation_index.annotation_ids:
+            return None
+
+        query_embedding = np.asarray(cls._get_embeddings(annotation_index).embed_query(query), dtype=np.float32)
+        scores = annotation_index.embeddings @ query_embedding
+        index = int(np.argmax(scores))
+        score = float(scores[index])
+        if score > annotation_index.score_threshold:
+            return annotation_index.annotation_ids[index], score
+
+        return None
+
+    @classmethod
+    def invalidate(cls, app_id: str) -> None:
+        """
+        Invalidate annotation index of app in all processes
+        :param app_id: app id
+        :return:
+        """
+        cls._cache.invalidate(app_id)
+
+    @classmethod
+    def _get_index(cls, app_record: App) -> Optional[AppAnnotationIndex]:
+        annotation_index, version = cls._cache.get(app_record.id, cls._NOT_CACHED)
+        if annotation_index is not cls._NOT_CACHED:
+            return annotation_index
+
+        annotation_index = cls._load_index(app_record)
+        # not cached if the app was invalidated while loading
+        cls._cache.set(app_record.id, version, annotation_index)
+
+        return annotation_index
+
+    @classmethod
+    def _load_index(cls, app_record: App) -> Optional[AppAnnotationIndex]:
+        annotation_setting = db.session.query(AppAnnotationSetting).filter(
+            AppAnnotationSetting.app_id == app_record.id).first()
+
+        if not annotation_setting:
+            return None
+
+        collection_binding_detail = annotation_setting.collection_binding_detail
+        dataset_collection_binding = DatasetCollectionBindingService.get_dataset_collection_binding(
+            collection_binding_detail.provider_name,
+            collection_binding_detail.model_name,
+            'annotation'
+        )
+
+        annotation_index = AppAnnotationIndex(
+            tenant_id=app_record.tenant_id,
+            score_threshold=annotation_setting.score_threshold or 1,
+            embedding_provider_name=collection_binding_detail.provider_name,
+            embedding_model_name=collection_binding_detail.model_name,
+            collection_binding_id=dataset_collection_binding.id
+        )
+
+        annotation_count = db.session.query(db.func.count(MessageAnnotation.id)) \
+            .filter(MessageAnnotation.app_id == app_record.id) \
+            .scalar()
+        if annotation_count > current_app.config['ANNOTATION_INDEX_MAX_SIZE']:
+            return annotation_index
+
+        annotations = db.session.query(MessageAnnotation.id, MessageAnnotation.question) \
+            .filter(MessageAnnotation.app_id == app_record.id) \
+            .all()
+
+        annotation_index.annotation_ids = [annotation.id for annotation in annotations]
+        if annotations:
+            embeddings = cls._get_embeddings(annotation_index).embed_documents(
+                [annotation.question for annotation in annotations]
+            )
+            annotation_index.embeddings = np.asarray(embeddings, dtype=np.float32)
+        else:
+            annotation_index.embeddings = np.empty((0, 0), dtype=np.float32)
+
+        annotation_index.embeddings.setflags(write=False)
+
+        return annotation_index
+
+    @classmethod
+    def _search_vector(cls, app_record: App,
+                       annotation_index: AppAnnotationIndex,
+                       query: str) -> Optional[tuple[str, float]]:
+        dataset = Dataset(
+            id=app_record.id,
+            tenant_id=app_record.tenant_id,
+            indexing_technique='high_quality',
+            embedding_model_provider=annotation_index.embedding_provider_name,
+            embedding_model=annotation_index.embedding_model_name,
+            collection_binding_id=annotation_index.collection_binding_id
+        )
+
+        vector = Vector(dataset, attributes=['doc_id', 'annotation_id', 'app_id'])
+
+        documents = vector.search_by_vector(
+            query=query,
+            top_k=1,
+            score_threshold=annotation_index.score_threshold,
+            filter={
+                'group_id': [dataset.id]
+            }
+        )
+
+        if documents:
+            return documents[0].metadata['annotation_id'], documents[0].metadata['score']
+
+        return None
+
+    @classmethod
+    def _get_embeddings(cls, annotation_index: AppAnnotationIndex) -> CacheEmbedding:
+        embedding_model = ModelManager().get_model_instance(
+            tenant_id=annotation_index.tenant_id,
+            provider=annotation_index.embedding_provider_name,
+            model_type=ModelType.TEXT_EMBEDDING,
+            model=annotation_index.embedding_model_name
+        )
+
+        return CacheEmbedding(embedding_model)
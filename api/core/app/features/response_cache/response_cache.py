@@ -0,0 +1,248 @@
+import json
+import logging
+import re
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from flask import current_app
+
+from core.app.entities.app_invoke_entities import EasyUIBasedAppGenerateEntity
+from core.embedding.cached_embedding import CacheEmbedding
+from core.helper.lru_cache import LRUCache
+from core.model_manager import ModelInstance, ModelManager
+from core.model_runtime.entities.model_entities import ModelType
+from extensions.ext_redis import redis_client
+from libs import helper
+from models.dataset import Embedding
+from models.model import AppMode
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheFeature:
+    """
+    Opt-in cache of app answers, by app config, inputs, dataset versions and normalized query.
+
+    The exact normalized query is looked up first, then the most similar cached query of the same scope,
+    by cosine similarity of query embeddings of the tenant default embedding model.
+    A scope is left behind when the app model config changes or any dataset of the app is re-indexed,
+    and expires with the ttl of the app config.
+    Only stateless requests are cached: no conversation history, files, uploaded articles or external data,
+    which is filled in after the lookup and may change between requests.
+    """
+    REPLAY_CHUNK_SIZE = 16
+    INDEX_REFRESH_INTERVAL = 30
+    INDEX_CACHE_SIZE = 100
+
+    _indexes: Optional[LRUCache] = None
+    _lock = threading.Lock()
+
+    def query(self, application_generate_entity: EasyUIBasedAppGenerateEntity) -> Optional[str]:
+        """
+        Query cached answer of the request
+        :param application_generate_entity: application generate entity
+        :return: cached answer
+        """
+        try:
+            scope = self._get_scope(application_generate_entity)
+            if not scope:
+                return None
+
+            query = self.normalize_query(application_generate_entity.query)
+            answer = self._get_answer(scope, helper.generate_text_hash(query))
+            if answer is not None or not query:
+                return answer
+
+            model_instance = self._get_embedding_model_instance(application_generate_entity.app_config.tenant_id)
+            if not model_instance:
+                return None
+
+            embedding = CacheEmbedding(model_instance).embed_query(query)
+            query_hash = self._search_index(
+                index_key=self._get_index_key(scope, model_instance),
+                embedding=np.asarray(embedding, dtype=np.float32),
+                similarity_threshold=application_generate_entity.app_config.additional_features.response_cache
+                .similarity_threshold
+            )
+
+            return self._get_answer(scope, query_hash) if query_hash else None
+        except Exception:
+            logger.exception('Failed to query response cache')
+            return None
+
+    def save(self, application_generate_entity: EasyUIBasedAppGenerateEntity, answer: str) -> None:
+        """
+        Save answer of the request to cache
+        :param application_generate_entity: application generate entity
+        :param answer: answer
+        :return:
+        """
+        try:
+            scope = self._get_scope(application_generate_entity)
+            if not scope or not answer:
+                return
+
+            ttl = application_generate_entity.app_config.additional_features.response_cache.ttl
+            query = self.normalize_query(application_generate_entity.query)
+            query_hash = helper.generate_text_hash(query)
+            redis_client.setex(f'{scope}:answer:{query_hash}', ttl, answer)
+
+            if not query:
+                return
+
+            model_instance = self._get_embedding_model_instance(application_generate_entity.app_config.tenant_id)
+            if not model_instance:
+                return
+
+            index_key = self._get_index_key(scope, model_instance)
+            if redis_client.hlen(index_key) >= current_app.config['RESPONSE_CACHE_MAX_ENTRIES']:
+                return
+
+            embedding = CacheEmbedding(model_instance).embed_query(query)
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.hset(index_key, query_hash, Embedding.encode_embedding(embedding))
+            pipeline.expire(index_key, ttl)
+            pipeline.execute()
+
+            with self._lock:
+                self._get_indexes().put(index_key, None)
+        except Exception:
+            logger.exception('Failed to save response cache')
+
+    @classmethod
+    def invalidate_datasets(cls, dataset_ids: list[str]) -> None:
+        """
+        Invalidate cached answers of apps using the datasets
+        :param dataset_ids: dataset ids
+        :return:
+        """
+        if not dataset_ids:
+            return
+
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            for dataset_id in dataset_ids:
+                pipeline.incr(cls._get_dataset_version_key(dataset_id))
+            pipeline.execute()
+        except Exception:
+            logger.exception('Failed to invalidate response cache of datasets')
+
+    @staticmethod
+    def normalize_query(query: Optional[str]) -> str:
+        """
+        Normalize query, case and whitespace insensitive
+        :param query: query
+        :return:
+        """
+        return re.sub(r'\s+', ' ', query or '').strip().casefold()
+
+    def _get_scope(self, application_generate_entity: EasyUIBasedAppGenerateEntity) -> Optional[str]:
+        """
+        Get cache scope of the request, None if the request is not cacheable
+        :param application_generate_entity: application generate entity
+        :return:
+        """
+        app_config = application_generate_entity.app_config
+        response_cache = app_config.additional_features.response_cache
+        if not response_cache or not response_cache.enabled:
+            return None
+
+        if app_config.app_mode not in [AppMode.CHAT, AppMode.COMPLETION]:
+            return None
+
+        if (getattr(application_generate_entity, 'conversation_id', None)
+                or app_config.external_data_variables
+                or application_generate_entity.files
+                or 'user_article' in application_generate_entity.extras):
+            return None
+
+        dataset_ids = sorted(app_config.dataset.dataset_ids) if app_config.dataset else []
+        dataset_versions = {}
+        if dataset_ids:
+            versions = redis_client.mget([self._get_dataset_version_key(dataset_id) for dataset_id in dataset_ids])
+            dataset_versions = {dataset_id: version.decode() if version else '0'
+                                for dataset_id, version in zip(dataset_ids, versions)}
+
+        scope_hash = helper.generate_text_hash(json.dumps({
+            'app_model_config': app_config.app_model_config_dict,
+            'inputs': application_generate_entity.inputs,
+            'datasets': dataset_versions
+        }, sort_keys=True, ensure_ascii=False, default=str))
+
+        return f'response_cache:{app_config.app_id}:{scope_hash}'
+
+    @staticmethod
+    def _get_answer(scope: str, query_hash: str) -> Optional[str]:
+        answer = redis_client.get(f'{scope}:answer:{query_hash}')
+        return answer.decode() if answer is not None else None
+
+    @classmethod
+    def _search_index(cls, index_key: str, embedding: np.ndarray, similarity_threshold: float) -> Optional[str]:
+        """
+        Search the most similar cached query
+        :param index_key: index key
+        :param embedding: normalized query embedding
+        :param similarity_threshold: min cosine similarity
+        :return: hash of the cached query
+        """
+        query_hashes, embeddings = cls._get_index(index_key)
+        if not query_hashes or embeddings.shape[1] != embedding.shape[0]:
+            return None
+
+        similarities = embeddings @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < similarity_threshold:
+            return None
+
+        return query_hashes[best]
+
+    @classmethod
+    def _get_index(cls, index_key: str) -> tuple[list[str], np.ndarray]:
+        """
+        Get query hashes and embeddings of an index, cached in process for a short interval
+        :param index_key: index key
+        :return:
+        """
+        now = time.monotonic()
+        with cls._lock:
+            cached = cls._get_indexes().get(index_key)
+        if cached and cached[0] > now:
+            return cached[1], cached[2]
+
+        values = redis_client.hgetall(index_key)
+        query_hashes = [query_hash.decode() for query_hash in values]
+        embeddings = np.stack([Embedding.decode_embedding(value) for value in values.values()]) \
+            if values else np.empty((0, 0), dtype=np.float32)
+
+        with cls._lock:
+            cls._get_indexes().put(index_key, (now + cls.INDEX_REFRESH_INTERVAL, query_hashes, embeddings))
+
+        return query_hashes, embeddings
+
+    @classmethod
+    def _get_indexes(cls) -> LRUCache:
+        if cls._indexes is None:
+            cls._indexes = LRUCache(cls.INDEX_CACHE_SIZE)
+
+        return cls._indexes
+
+    @staticmethod
+    def _get_embedding_model_instance(tenant_id: str) -> Optional[ModelInstance]:
+        try:
+            return ModelManager().get_default_model_instance(
+                tenant_id=tenant_id,
+                model_type=ModelType.TEXT_EMBEDDING
+            )
+        except Exception:
+            # no default embedding model, exact match only
+            return None
+
+    @staticmethod
+    def _get_index_key(scope: str, model_instance: ModelInstance) -> str:
+        return f'{scope}:index:{model_instance.provider}:{model_instance.model}'
+
+    @staticmethod
+    def _get_dataset_version_key(dataset_id: str) -> str:
+        return f'response_cache_dataset_version:{dataset_id}'
@@ -2,8 +2,11 @@ import json
 import logging
 import time
 from collections.abc import Generator
+from threading import Thread
 from typing import Optional, Union, cast
 
+from flask import Flask, current_app
+
 from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
 from core.app.entities.app_invoke_entities import (
     AgentChatAppGenerateEntity,
@@ -20,6 +23,7 @@ from core.app.entities.queue_entities import (
     QueueMessageFileEvent,
     QueueMessageReplaceEvent,
     QueuePingEvent,
+    QueueResponseCacheHitEvent,
     QueueRetrieverResourcesEvent,
     QueueStopEvent,
 )
@@ -35,6 +39,7 @@ from core.app.entities.task_entities import (
     MessageEndStreamResponse,
     StreamResponse,
 )
+from core.app.features.response_cache.response_cache import ResponseCacheFeature
 from core.app.task_pipeline.based_generate_task_pipeline import BasedGenerateTaskPipeline
 from core.app.task_pipeline.message_cycle_manage import MessageCycleManage
 from core.model_runtime.entities.llm_entities import LLMResult, LLMResultChunk, LLMResultChunkDelta, LLMUsage
@@ -181,15 +186,16 @@ class EasyUIBasedGenerateTaskPipeline(BasedGenerateTaskPipeline, MessageCycleMan
         To stream response.
         :return:
         """
+        # per chunk, the stream responses are built without validation
         for stream_response in generator:
             if isinstance(self._application_generate_entity, CompletionAppGenerateEntity):
-                yield CompletionAppStreamResponse(
+                yield CompletionAppStreamResponse.construct(
                     message_id=self._message.id,
                     created_at=int(self._message.created_at.timestamp()),
                     stream_response=stream_response
                 )
             else:
-                yield ChatbotAppStreamResponse(
+                yield ChatbotAppStreamResponse.construct(
                     conversation_id=self._conversation.id,
                     message_id=self._message.id,
                     created_at=int(self._message.created_at.timestamp()),
@@ -225,6 +231,9 @@ class EasyUIBasedGenerateTaskPipeline(BasedGenerateTaskPipeline, MessageCycleMan
                 # Save message
                 self._save_message()
 
+                if isinstance(event, QueueMessageEndEvent) and not output_moderation_answer:
+                    self._save_response_cache()
+
                 yield self._message_end_to_stream_response()
             elif isinstance(event, QueueRetrieverResourcesEvent):
                 self._handle_retriever_resources(event)
@@ -232,6 +241,8 @@ class EasyUIBasedGenerateTaskPipeline(BasedGenerateTaskPipeline, MessageCycleMan
                 annotation = self._handle_annotation_reply(event)
                 if annotation:
                     self._task_state.llm_result.message.content = annotation.content
+            elif isinstance(event, QueueResponseCacheHitEvent):
+                self._task_state.metadata['response_cache_hit'] = True
             elif isinstance(event, QueueAgentThoughtEvent):
                 yield self._agent_thought_to_stream_response(event)
             elif isinstance(event, QueueMessageFileEvent):
@@ -310,6 +321,32 @@ class EasyUIBasedGenerateTaskPipeline(BasedGenerateTaskPipeline, MessageCycleMan
             extras=self._application_generate_entity.extras
         )
 
+    def _save_response_cache(self) -> None:
+        """
+        Save answer to the response cache in a new thread, so the query embedding doesn't delay the message end.
+        Replies of annotations, the cache and direct outputs are skipped.
+        :return:
+        """
+        if 'annotation_reply' in self._task_state.metadata or self._task_state.metadata.get('response_cache_hit'):
+            return
+
+        llm_result = self._task_state.llm_result
+        # direct outputs, like moderation answers, carry no usage
+        if not llm_result.usage.total_tokens:
+            return
+
+        thread = Thread(target=self._save_response_cache_worker, kwargs={
+            'flask_app': current_app._get_current_object(),
+            'answer': llm_result.message.content
+        })
+
+        thread.start()
+
+    def _save_response_cache_worker(self, flask_app: Flask, answer: str) -> None:
+        with flask_app.app_context():
+            ResponseCacheFeature().save(self._application_generate_entity, answer)
+            db.session.close()
+
     def _handle_stop(self, event: QueueStopEvent) -> None:
         """
         Handle stop.
@@ -371,7 +408,7 @@ class EasyUIBasedGenerateTaskPipeline(BasedGenerateTaskPipeline, MessageCycleMan
         :param message_id: message id
         :return:
         """
-        return AgentMessageStreamResponse(
+        return AgentMessageStreamResponse.construct(
             task_id=self._application_generate_entity.task_id,
             id=message_id,
             answer=answer
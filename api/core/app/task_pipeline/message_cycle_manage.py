@@ -187,7 +187,7 @@ class MessageCycleManage:
         :param message_id: message id
         :return:
         """
-        return MessageStreamResponse(
+        return MessageStreamResponse.construct(
             task_id=self._application_generate_entity.task_id,
             id=message_id,
             answer=answer
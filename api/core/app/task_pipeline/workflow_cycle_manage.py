@@ -21,13 +21,13 @@ from core.app.entities.task_entities import (
     WorkflowStartStreamResponse,
     WorkflowTaskState,
 )
+from core.app.task_pipeline.workflow_run_writer import WorkflowRunWriter
 from core.file.file_obj import FileVar
 from core.model_runtime.utils.encoders import jsonable_encoder
 from core.tools.tool_manager import ToolManager
 from core.workflow.entities.node_entities import NodeRunMetadataKey, NodeType, SystemVariable
 from core.workflow.nodes.tool.entities import ToolNodeData
 from core.workflow.workflow_engine_manager import WorkflowEngineManager
-from extensions.ext_database import db
 from models.account import Account
 from models.model import EndUser
 from models.workflow import (
@@ -48,6 +48,7 @@ class WorkflowCycleManage:
     _user: Union[Account, EndUser]
     _task_state: Union[AdvancedChatTaskState, WorkflowTaskState]
     _workflow_system_variables: dict[SystemVariable, Any]
+    _workflow_run_writer: WorkflowRunWriter
 
     def _init_workflow_run(self, workflow: Workflow,
                            triggered_from: WorkflowRunTriggeredFrom,
@@ -63,11 +64,10 @@ class WorkflowCycleManage:
         :param system_inputs: system inputs, like: query, files
         :return:
         """
-        max_sequence = db.session.query(db.func.max(WorkflowRun.sequence_number)) \
-                           .filter(WorkflowRun.tenant_id == workflow.tenant_id) \
-                           .filter(WorkflowRun.app_id == workflow.app_id) \
-                           .scalar() or 0
-        new_sequence_number = max_sequence + 1
+        new_sequence_number = WorkflowRunWriter.allocate_sequence_number(
+            tenant_id=workflow.tenant_id,
+            app_id=workflow.app_id
+        )
 
         inputs = {**user_inputs}
         for key, value in (system_inputs or {}).items():
@@ -89,17 +89,16 @@ class WorkflowCycleManage:
             graph=workflow.graph,
             inputs=json.dumps(inputs),
             status=WorkflowRunStatus.RUNNING.value,
+            elapsed_time=0,
+            total_tokens=0,
+            total_steps=0,
             created_by_role=(CreatedByRole.ACCOUNT.value
                              if isinstance(user, Account) else CreatedByRole.END_USER.value),
             created_by=user.id
         )
 
-        db.session.add(workflow_run)
-        db.session.commit()
-        db.session.refresh(workflow_run)
-        db.session.close()
-
-        return workflow_run
+        # persisted with the first flush of the run
+        return self._workflow_run_writer.add(workflow_run)
 
     def _workflow_run_success(self, workflow_run: WorkflowRun,
                               start_at: float,
@@ -122,9 +121,7 @@ class WorkflowCycleManage:
         workflow_run.total_steps = total_steps
         workflow_run.finished_at = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        db.session.commit()
-        db.session.refresh(workflow_run)
-        db.session.close()
+        self._workflow_run_writer.mark_dirty(workflow_run)
 
         return workflow_run
 
@@ -151,9 +148,7 @@ class WorkflowCycleManage:
         workflow_run.total_steps = total_steps
         workflow_run.finished_at = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        db.session.commit()
-        db.session.refresh(workflow_run)
-        db.session.close()
+        self._workflow_run_writer.mark_dirty(workflow_run)
 
         return workflow_run
 
@@ -186,16 +181,12 @@ class WorkflowCycleManage:
             node_type=node_type.value,
             title=node_title,
             status=WorkflowNodeExecutionStatus.RUNNING.value,
+            elapsed_time=0,
             created_by_role=workflow_run.created_by_role,
             created_by=workflow_run.created_by
         )
 
-        db.session.add(workflow_node_execution)
-        db.session.commit()
-        db.session.refresh(workflow_node_execution)
-        db.session.close()
-
-        return workflow_node_execution
+        return self._workflow_run_writer.add(workflow_node_execution)
 
     def _workflow_node_execution_success(self, workflow_node_execution: WorkflowNodeExecution,
                                          start_at: float,
@@ -225,9 +216,7 @@ class WorkflowCycleManage:
             if execution_metadata else None
         workflow_node_execution.finished_at = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        db.session.commit()
-        db.session.refresh(workflow_node_execution)
-        db.session.close()
+        self._workflow_run_writer.mark_dirty(workflow_node_execution)
 
         return workflow_node_execution
 
@@ -256,9 +245,7 @@ class WorkflowCycleManage:
         workflow_node_execution.process_data = json.dumps(process_data) if process_data else None
         workflow_node_execution.outputs = json.dumps(outputs) if outputs else None
 
-        db.session.commit()
-        db.session.refresh(workflow_node_execution)
-        db.session.close()
+        self._workflow_run_writer.mark_dirty(workflow_node_execution)
 
         return workflow_node_execution
 
@@ -410,12 +397,10 @@ class WorkflowCycleManage:
 
         self._task_state.workflow_run_id = workflow_run.id
 
-        db.session.close()
-
         return workflow_run
 
     def _handle_node_start(self, event: QueueNodeStartedEvent) -> WorkflowNodeExecution:
-        workflow_run = db.session.query(WorkflowRun).filter(WorkflowRun.id == self._task_state.workflow_run_id).first()
+        workflow_run = self._workflow_run_writer.get(self._task_state.workflow_run_id)
         workflow_node_execution = self._init_node_execution_from_workflow_run(
             workflow_run=workflow_run,
             node_id=event.node_id,
@@ -436,14 +421,13 @@ class WorkflowCycleManage:
 
         self._task_state.total_steps += 1
 
-        db.session.close()
+        self._workflow_run_writer.flush_if_due()
 
         return workflow_node_execution
 
     def _handle_node_finished(self, event: QueueNodeSucceededEvent | QueueNodeFailedEvent) -> WorkflowNodeExecution:
         current_node_execution = self._task_state.ran_node_execution_infos[event.node_id]
-        workflow_node_execution = db.session.query(WorkflowNodeExecution).filter(
-            WorkflowNodeExecution.id == current_node_execution.workflow_node_execution_id).first()
+        workflow_node_execution = self._workflow_run_writer.get(current_node_execution.workflow_node_execution_id)
         if isinstance(event, QueueNodeSucceededEvent):
             workflow_node_execution = self._workflow_node_execution_success(
                 workflow_node_execution=workflow_node_execution,
@@ -472,14 +456,13 @@ class WorkflowCycleManage:
                 outputs=event.outputs
             )
 
-        db.session.close()
+        self._workflow_run_writer.flush_if_due()
 
         return workflow_node_execution
 
     def _handle_workflow_finished(self, event: QueueStopEvent | QueueWorkflowSucceededEvent | QueueWorkflowFailedEvent) \
             -> Optional[WorkflowRun]:
-        workflow_run = db.session.query(WorkflowRun).filter(
-            WorkflowRun.id == self._task_state.workflow_run_id).first()
+        workflow_run = self._workflow_run_writer.get(self._task_state.workflow_run_id)
         if not workflow_run:
             return None
 
@@ -495,8 +478,8 @@ class WorkflowCycleManage:
 
             latest_node_execution_info = self._task_state.latest_node_execution_info
             if latest_node_execution_info:
-                workflow_node_execution = db.session.query(WorkflowNodeExecution).filter(
-                    WorkflowNodeExecution.id == latest_node_execution_info.workflow_node_execution_id).first()
+                workflow_node_execution = self._workflow_run_writer.get(
+                    latest_node_execution_info.workflow_node_execution_id)
                 if (workflow_node_execution
                         and workflow_node_execution.status == WorkflowNodeExecutionStatus.RUNNING.value):
                     self._workflow_node_execution_failed(
@@ -515,8 +498,8 @@ class WorkflowCycleManage:
             )
         else:
             if self._task_state.latest_node_execution_info:
-                workflow_node_execution = db.session.query(WorkflowNodeExecution).filter(
-                    WorkflowNodeExecution.id == self._task_state.latest_node_execution_info.workflow_node_execution_id).first()
+                workflow_node_execution = self._workflow_run_writer.get(
+                    self._task_state.latest_node_execution_info.workflow_node_execution_id)
                 outputs = workflow_node_execution.outputs
             else:
                 outputs = None
@@ -531,7 +514,7 @@ class WorkflowCycleManage:
 
         self._task_state.workflow_run_id = workflow_run.id
 
-        db.session.close()
+        self._workflow_run_writer.flush()
 
         return workflow_run
 
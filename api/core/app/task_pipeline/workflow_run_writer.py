@@ -0,0 +1,148 @@
+import time
+import uuid
+from collections.abc import Generator
+from datetime import datetime, timezone
+from typing import Optional, TypeVar, Union
+
+from flask import current_app
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from extensions.ext_database import db
+from models.workflow import WorkflowNodeExecution, WorkflowRun, WorkflowRunSequence
+
+T = TypeVar('T', WorkflowRun, WorkflowNodeExecution)
+
+
+class WorkflowRunWriter:
+    """
+    Write-behind persistence of a workflow run and its node executions.
+
+    Records are kept in memory during the run, so stream events don't wait for the database.
+    Changed records are written in one transaction per flush, new records in a batched insert
+    and the others in a batched update by primary key, when the run finishes, when the flush interval elapsed
+    or when the stream is closed. Ids and created times are assigned in memory.
+    """
+
+    def __init__(self) -> None:
+        self._flush_interval = current_app.config['WORKFLOW_PERSISTENCE_FLUSH_INTERVAL']
+        self._records: dict[str, Union[WorkflowRun, WorkflowNodeExecution]] = {}
+        self._persisted_ids: set[str] = set()
+        # ordered, a run is inserted before its node executions
+        self._dirty_ids: dict[str, None] = {}
+        self._last_flush_at = time.monotonic()
+
+    def add(self, record: T) -> T:
+        """
+        Add new record
+        :param record: workflow run or node execution
+        :return:
+        """
+        if not record.id:
+            record.id = str(uuid.uuid4())
+        if not record.created_at:
+            record.created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        self._records[record.id] = record
+        self._dirty_ids[record.id] = None
+
+        return record
+
+    def get(self, record_id: Optional[str]) -> Optional[Union[WorkflowRun, WorkflowNodeExecution]]:
+        """
+        Get record of the run by id
+        :param record_id: record id
+        :return:
+        """
+        return self._records.get(record_id)
+
+    def mark_dirty(self, record: Union[WorkflowRun, WorkflowNodeExecution]) -> None:
+        """
+        Mark record as changed
+        :param record: workflow run or node execution
+        :return:
+        """
+        self._dirty_ids[record.id] = None
+
+    def flush_if_due(self) -> None:
+        """
+        Flush changed records if the flush interval elapsed since the last flush
+        :return:
+        """
+        if time.monotonic() - self._last_flush_at >= self._flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Flush changed records
+        :return:
+        """
+        self._last_flush_at = time.monotonic()
+        if not self._dirty_ids:
+            return
+
+        inserts: dict[type, list[dict]] = {}
+        updates: dict[type, list[dict]] = {}
+        for record_id in self._dirty_ids:
+            record = self._records[record_id]
+            mappings = updates if record_id in self._persisted_ids else inserts
+            mappings.setdefault(type(record), []).append(self._to_mapping(record))
+
+        for model, rows in inserts.items():
+            db.session.bulk_insert_mappings(model, rows)
+        for model, rows in updates.items():
+            db.session.bulk_update_mappings(model, rows)
+        db.session.commit()
+
+        self._persisted_ids.update(self._dirty_ids)
+        self._dirty_ids.clear()
+
+    def flush_on_close(self, generator: Generator) -> Generator:
+        """
+        Flush changed records when the generator exits, e.g. after an error or a client disconnect
+        :param generator: stream response generator
+        :return:
+        """
+        try:
+            yield from generator
+        finally:
+            self.flush()
+
+    @classmethod
+    def allocate_sequence_number(cls, tenant_id: str, app_id: str) -> int:
+        """
+        Allocate sequence number of a new workflow run of app by incrementing the sequence row of app,
+        which is created from the max sequence number of the app once.
+        Numbers don't depend on the runs flushed so far, so they are unique while runs are in flight
+        :param tenant_id: workspace id
+        :param app_id: app id
+        :return:
+        """
+        sequence_number = db.session.execute(
+            update(WorkflowRunSequence)
+            .where(WorkflowRunSequence.app_id == app_id)
+            .values(sequence_number=WorkflowRunSequence.sequence_number + 1)
+            .returning(WorkflowRunSequence.sequence_number)
+        ).scalar()
+
+        if sequence_number is None:
+            max_sequence = select(func.coalesce(func.max(WorkflowRun.sequence_number), 0)) \
+                .where(WorkflowRun.tenant_id == tenant_id, WorkflowRun.app_id == app_id) \
+                .scalar_subquery()
+            sequence_number = db.session.execute(
+                insert(WorkflowRunSequence)
+                .values(app_id=app_id, sequence_number=max_sequence + 1)
+                .on_conflict_do_update(
+                    constraint='workflow_run_sequence_pkey',
+                    set_={'sequence_number': WorkflowRunSequence.sequence_number + 1}
+                )
+                .returning(WorkflowRunSequence.sequence_number)
+            ).scalar()
+
+        db.session.commit()
+
+        return sequence_number
+
+    @staticmethod
+    def _to_mapping(record: Union[WorkflowRun, WorkflowNodeExecution]) -> dict:
+        return {attr.key: getattr(record, attr.key) for attr in inspect(type(record)).column_attrs}
@@ -41,14 +41,22 @@ class DatasetIndexToolCallbackHandler:
 
     def on_tool_end(self, documents: list[Document]) -> None:
         """Handle tool end."""
+        # group index node ids by dataset, so hit counts are added with one update per dataset
+        index_node_ids_by_dataset = {}
         for document in documents:
+            dataset_id = document.metadata.get('dataset_id')
+            index_node_ids_by_dataset.setdefault(dataset_id, []).append(document.metadata['doc_id'])
+
+        if not index_node_ids_by_dataset:
+            return
+
+        for dataset_id, index_node_ids in index_node_ids_by_dataset.items():
             query = db.session.query(DocumentSegment).filter(
-                DocumentSegment.index_node_id == document.metadata['doc_id']
+                DocumentSegment.index_node_id.in_(index_node_ids)
             )
 
-            # if 'dataset_id' in document.metadata:
-            if 'dataset_id' in document.metadata:
-                query = query.filter(DocumentSegment.dataset_id == document.metadata['dataset_id'])
+            if dataset_id:
+                query = query.filter(DocumentSegment.dataset_id == dataset_id)
 
             # add hit count to document segment
             query.update(
@@ -56,7 +64,7 @@ class DatasetIndexToolCallbackHandler:
                 synchronize_session=False
             )
 
-            db.session.commit()
+        db.session.commit()
 
     def return_retriever_resource_info(self, resource: list):
         """Handle return_retriever_resource_info."""
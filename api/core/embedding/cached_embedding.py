@@ -1,10 +1,14 @@
-import base64
 import logging
+import threading
+import time
 from typing import Optional, cast
 
 import numpy as np
+from flask import current_app
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
+from core.helper.lru_cache import LRUCache
 from core.model_manager import ModelInstance
 from core.model_runtime.entities.model_entities import ModelPropertyKey
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
@@ -18,6 +22,8 @@ logger = logging.getLogger(__name__)
 
 
 class CacheEmbedding(Embeddings):
+    CACHE_QUERY_BATCH_SIZE = 500
+
     def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
         self._model_instance = model_instance
         self._user = user
@@ -25,58 +31,47 @@ class CacheEmbedding(Embeddings):
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         """Embed search docs in batches of 10."""
         # use doc embedding cache or store if not exists
+        text_hashes = [helper.generate_text_hash(text) for text in texts]
+        cached_embeddings = self.get_cached_embeddings(list(set(text_hashes)))
+
         text_embeddings = [None for _ in range(len(texts))]
         embedding_queue_indices = []
-        for i, text in enumerate(texts):
-            hash = helper.generate_text_hash(text)
-            embedding = db.session.query(Embedding).filter_by(model_name=self._model_instance.model,
-                                                              hash=hash,
-                                                              provider_name=self._model_instance.provider).first()
-            if embedding:
-                text_embeddings[i] = embedding.get_embedding()
+        # texts with the same hash are only embedded once
+        embedding_queue_hashes = {}
+        for i, hash in enumerate(text_hashes):
+            if hash in cached_embeddings:
+                text_embeddings[i] = cached_embeddings[hash].tolist()
             else:
                 embedding_queue_indices.append(i)
+                embedding_queue_hashes.setdefault(hash, i)
         # TODO(chiyu): fix it
-        if embedding_queue_indices:
-            embedding_queue_texts = [texts[i] for i in embedding_queue_indices]
-            embedding_queue_embeddings = []
+        if embedding_queue_hashes:
+            embedding_queue_texts = [texts[i] for i in embedding_queue_hashes.values()]
+            embedding_queue_embeddings = {}
             try:
-                model_type_instance = cast(TextEmbeddingModel, self._model_instance.model_type_instance)
-                model_schema = model_type_instance.get_model_schema(self._model_instance.model,
-                                                                    self._model_instance.credentials)
-                max_chunks = model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS] \
-                    if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties else 1
+                max_chunks = self.get_max_chunks()
+                queue_hashes = list(embedding_queue_hashes.keys())
                 for i in range(0, len(embedding_queue_texts), max_chunks):
                     batch_texts = embedding_queue_texts[i:i + max_chunks]
+                    batch_hashes = queue_hashes[i:i + max_chunks]
 
                     embedding_result = self._model_instance.invoke_text_embedding(
                         texts=batch_texts,
                         user=self._user
                     )
 
-                    for vector in embedding_result.embeddings:
+                    for hash, vector in zip(batch_hashes, embedding_result.embeddings):
                         try:
-                            normalized_embedding = (vector / np.linalg.norm(vector)).tolist()
-                            embedding_queue_embeddings.append(normalized_embedding)
-                        except IntegrityError:
-                            db.session.rollback()
+                            embedding_queue_embeddings[hash] = vector / np.linalg.norm(vector)
                         except Exception as e:
                             logging.exception('Failed transform embedding: ', e)
-                cache_embeddings = []
-                try:
-                    for i, embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
-                        text_embeddings[i] = embedding
-                        hash = helper.generate_text_hash(texts[i])
-                        if hash not in cache_embeddings:
-                            embedding_cache = Embedding(model_name=self._model_instance.model,
-                                                        hash=hash,
-                                                        provider_name=self._model_instance.provider)
-                            embedding_cache.set_embedding(embedding)
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(hash)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
+
+                for i in embedding_queue_indices:
+                    embedding = embedding_queue_embeddings.get(text_hashes[i])
+                    if embedding is not None:
+                        text_embeddings[i] = embedding.tolist()
+
+                self.save_cached_embeddings(embedding_queue_embeddings)
             except Exception as ex:
                 db.session.rollback()
                 logger.error('Failed to embed documents: ', ex)
@@ -84,15 +79,68 @@ class CacheEmbedding(Embeddings):
 
         return text_embeddings
 
+    def get_max_chunks(self) -> int:
+        """
+        Get max number of texts the model embeds in one request
+        :return:
+        """
+        model_type_instance = cast(TextEmbeddingModel, self._model_instance.model_type_instance)
+        model_schema = model_type_instance.get_model_schema(self._model_instance.model,
+                                                            self._model_instance.credentials)
+        return model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS] \
+            if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties else 1
+
+    def get_cached_embeddings(self, hashes: list[str]) -> dict[str, np.ndarray]:
+        """
+        Get cached embeddings of text hashes, with one query per batch
+        :param hashes: text hashes
+        :return: embeddings by text hash
+        """
+        cached_embeddings = {}
+        for i in range(0, len(hashes), self.CACHE_QUERY_BATCH_SIZE):
+            rows = db.session.query(Embedding.hash, Embedding.embedding).filter(
+                Embedding.model_name == self._model_instance.model,
+                Embedding.provider_name == self._model_instance.provider,
+                Embedding.hash.in_(hashes[i:i + self.CACHE_QUERY_BATCH_SIZE])
+            ).all()
+            for hash, embedding in rows:
+                cached_embeddings[hash] = Embedding.decode_embedding(embedding)
+
+        return cached_embeddings
+
+    def save_cached_embeddings(self, embeddings: dict[str, np.ndarray]) -> None:
+        """
+        Save embeddings to cache, embeddings cached by others meanwhile are kept
+        :param embeddings: embeddings by text hash
+        :return:
+        """
+        if not embeddings:
+            return
+
+        rows = [{
+            'model_name': self._model_instance.model,
+            'hash': hash,
+            'provider_name': self._model_instance.provider,
+            'embedding': Embedding.encode_embedding(embedding)
+        } for hash, embedding in embeddings.items()]
+        try:
+            for i in range(0, len(rows), self.CACHE_QUERY_BATCH_SIZE):
+                db.session.execute(
+                    insert(Embedding).values(rows[i:i + self.CACHE_QUERY_BATCH_SIZE])
+                    .on_conflict_do_nothing(constraint='embedding_hash_idx')
+                )
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
     def embed_query(self, text: str) -> list[float]:
         """Embed query text."""
-        # use doc embedding cache or store if not exists
+        # use query embedding cache or store if not exists
         hash = helper.generate_text_hash(text)
-        embedding_cache_key = f'{self._model_instance.provider}_{self._model_instance.model}_{hash}'
-        embedding = redis_client.get(embedding_cache_key)
-        if embedding:
-            redis_client.expire(embedding_cache_key, 600)
-            return list(np.frombuffer(base64.b64decode(embedding), dtype="float"))
+        embedding = QueryEmbeddingCache.get(self._model_instance.provider, self._model_instance.model, hash)
+        if embedding is not None:
+            return embedding.tolist()
+
         try:
             embedding_result = self._model_instance.invoke_text_embedding(
                 texts=[text],
@@ -100,23 +148,107 @@ class CacheEmbedding(Embeddings):
             )
 
             embedding_results = embedding_result.embeddings[0]
-            embedding_results = (embedding_results / np.linalg.norm(embedding_results)).tolist()
+            embedding_results = embedding_results / np.linalg.norm(embedding_results)
         except Exception as ex:
             raise ex
 
+        QueryEmbeddingCache.set(self._model_instance.provider, self._model_instance.model, hash, embedding_results)
+
+        return embedding_results.tolist()
+
+
+class QueryEmbeddingCache:
+    """
+    Two tier cache of query embeddings,
+    a bounded in-process LRU of float32 vectors in front of redis, which keeps the vectors as binary values.
+    """
+    _cache: Optional[LRUCache] = None
+    _model_ttls: Optional[dict[str, int]] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, provider: str, model: str, hash: str) -> Optional[np.ndarray]:
+        """
+        Get cached query embedding
+        :param provider: provider name
+        :param model: model name
+        :param hash: query text hash
+        :return: read-only float32 vector
+        """
+        cache_key = cls._get_cache_key(provider, model, hash)
+        ttl = cls._get_ttl(provider, model)
+        with cls._lock:
+            cached = cls._get_local_cache().get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+
+        embedding = None
         try:
-            # encode embedding to base64
-            embedding_vector = np.array(embedding_results)
-            vector_bytes = embedding_vector.tobytes()
-            # Transform to Base64
-            encoded_vector = base64.b64encode(vector_bytes)
-            # Transform to string
-            encoded_str = encoded_vector.decode("utf-8")
-            redis_client.setex(embedding_cache_key, 600, encoded_str)
+            # refresh ttl in the same round trip
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.get(cache_key)
+            pipeline.expire(cache_key, ttl)
+            value, _ = pipeline.execute()
+            # values cached before are base64 strings, ignore them
+            if value and value.startswith(Embedding.EMBEDDING_MAGIC):
+                embedding = Embedding.decode_embedding(value)
+        except Exception:
+            logging.exception('Failed to get embedding from redis')
 
-        except IntegrityError:
-            db.session.rollback()
-        except:
+        if embedding is not None:
+            with cls._lock:
+                cls._get_local_cache().put(cache_key, (time.monotonic() + ttl, embedding))
+
+        return embedding
+
+    @classmethod
+    def set(cls, provider: str, model: str, hash: str, embedding: np.ndarray) -> None:
+        """
+        Set query embedding to cache
+        :param provider: provider name
+        :param model: model name
+        :param hash: query text hash
+        :param embedding: embedding vector
+        :return:
+        """
+        cache_key = cls._get_cache_key(provider, model, hash)
+        ttl = cls._get_ttl(provider, model)
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        with cls._lock:
+            cls._get_local_cache().put(cache_key, (time.monotonic() + ttl, embedding))
+
+        try:
+            redis_client.setex(cache_key, ttl, Embedding.encode_embedding(embedding))
+        except Exception:
             logging.exception('Failed to add embedding to redis')
 
-        return embedding_results
+    @classmethod
+    def _get_cache_key(cls, provider: str, model: str, hash: str) -> str:
+        return f'{provider}_{model}_{hash}'
+
+    @classmethod
+    def _get_local_cache(cls) -> LRUCache:
+        if cls._cache is None:
+            cls._cache = LRUCache(current_app.config['EMBEDDING_QUERY_CACHE_SIZE'])
+
+        return cls._cache
+
+    @classmethod
+    def _get_ttl(cls, provider: str, model: str) -> int:
+        """
+        Get cache ttl of model, models can be configured like: openai:text-embedding-3-small=3600
+        :param provider: provider name
+        :param model: model name
+        :return: ttl in seconds
+        """
+        if cls._model_ttls is None:
+            model_ttls = {}
+            for item in (current_app.config['EMBEDDING_QUERY_CACHE_MODEL_TTLS'] or '').split(','):
+                model_name, _, ttl = item.strip().rpartition('=')
+                if model_name and ttl:
+                    model_ttls[model_name] = int(ttl)
+
+            cls._model_ttls = model_ttls
+
+        return cls._model_ttls.get(f'{provider}:{model}', current_app.config['EMBEDDING_QUERY_CACHE_TTL'])
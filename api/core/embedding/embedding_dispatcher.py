@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional
+
+import numpy as np
+from flask import current_app
+
+from core.embedding.cached_embedding import CacheEmbedding
+from core.model_manager import ModelInstance
+from core.model_runtime.errors.invoke import InvokeRateLimitError
+from libs import helper
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingDispatcher:
+    """
+    Embedding dispatcher of an indexing job.
+
+    Texts are deduplicated by hash across the whole job and looked up in the embedding cache in bulk.
+    The missing ones are sent to the provider in concurrent batches, limited per provider in this process,
+    and batches shrink when the provider reports rate limits.
+    Embeddings are yielded as batches complete, so vector store writes start before the whole job is embedded.
+    """
+    MAX_RETRIES = 5
+    RETRY_BACKOFF_SECONDS = 1.0
+
+    _provider_semaphores: dict[str, threading.BoundedSemaphore] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model_instance: ModelInstance, user: Optional[str] = None) -> None:
+        self._model_instance = model_instance
+        self._user = user
+        self._cache_embedding = CacheEmbedding(model_instance, user)
+        self._max_concurrency = current_app.config['EMBEDDING_MAX_CONCURRENCY']
+
+    def embed_documents(self, texts: list[str]) -> Iterator[dict[int, list[float]]]:
+        """
+        Embed texts
+        :param texts: texts
+        :return: iterator of embeddings by text index, in the order batches complete
+        """
+        text_indices: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            text_indices.setdefault(helper.generate_text_hash(text), []).append(i)
+
+        cached_embeddings = self._cache_embedding.get_cached_embeddings(list(text_indices.keys()))
+        if cached_embeddings:
+            yield self._get_text_embeddings(text_indices, cached_embeddings)
+
+        queue_hashes = [hash for hash in text_indices if hash not in cached_embeddings]
+        if not queue_hashes:
+            return
+
+        batch_size = self._cache_embedding.get_max_chunks()
+        # batches to send, as (text hashes, attempts)
+        batches = deque((queue_hashes[i:i + batch_size], 0) for i in range(0, len(queue_hashes), batch_size))
+
+        flask_app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+            futures: dict[Future, tuple[list[str], int]] = {}
+            while batches or futures:
+                while batches and len(futures) < self._max_concurrency:
+                    batch_hashes, attempts = batches.popleft()
+                    future = executor.submit(
+                        self._invoke_text_embedding,
+                        flask_app,
+                        [texts[text_indices[hash][0]] for hash in batch_hashes],
+                        self.RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1)) if attempts else 0
+                    )
+                    futures[future] = (batch_hashes, attempts)
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_hashes, attempts = futures.pop(future)
+                    try:
+                        vectors = future.result()
+                    except InvokeRateLimitError:
+                        if attempts >= self.MAX_RETRIES:
+                            raise
+
+                        # retry with smaller batches, and send later batches smaller as well
+                        batch_size = max(1, min(batch_size, len(batch_hashes) // 2))
+                        logger.warning(f'Embedding rate limited by {self._model_instance.provider}, '
+                                       f'retry with batch size {batch_size}')
+                        batches.appendleft((batch_hashes, attempts + 1))
+                        batches = deque(
+                            (split_hashes, batch_attempts)
+                            for hashes, batch_attempts in batches
+                            for split_hashes in (hashes[i:i + batch_size] for i in range(0, len(hashes), batch_size))
+                        )
+                        continue
+
+                    embeddings = {
+                        hash: vector / np.linalg.norm(vector) for hash, vector in zip(batch_hashes, vectors)
+                    }
+                    self._cache_embedding.save_cached_embeddings(embeddings)
+
+                    yield self._get_text_embeddings(text_indices, embeddings)
+
+    def _invoke_text_embedding(self, flask_app, texts: list[str], delay: float) -> list[list[float]]:
+        """
+        Invoke text embedding in a worker thread, within the provider concurrency limit
+        :param flask_app: flask app
+        :param texts: texts
+        :param delay: seconds to wait before invoking, for retries
+        :return: embeddings
+        """
+        if delay:
+            time.sleep(delay)
+
+        with flask_app.app_context(), self._get_provider_semaphore():
+            embedding_result = self._model_instance.invoke_text_embedding(
+                texts=texts,
+                user=self._user
+            )
+
+        return embedding_result.embeddings
+
+    def _get_provider_semaphore(self) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._provider_semaphores.get(self._model_instance.provider)
+            if not semaphore:
+                semaphore = threading.BoundedSemaphore(self._max_concurrency)
+                self._provider_semaphores[self._model_instance.provider] = semaphore
+
+        return semaphore
+
+    @staticmethod
+    def _get_text_embeddings(text_indices: dict[str, list[int]],
+                             embeddings: dict[str, np.ndarray]) -> dict[int, list[float]]:
+        text_embeddings = {}
+        for hash, embedding in embeddings.items():
+            embedding = embedding.tolist()
+            for i in text_indices[hash]:
+                text_embeddings[i] = embedding
+
+        return text_embeddings
@@ -11,6 +11,7 @@ from core.entities.model_entities import ModelStatus, ModelWithProviderEntity, S
 from core.entities.provider_entities import CustomConfiguration, SystemConfiguration, SystemConfigurationStatus
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
 from core.model_runtime.entities.model_entities import FetchFrom, ModelType
 from core.model_runtime.entities.provider_entities import (
     ConfigurateMethod,
@@ -83,10 +84,10 @@ class ProviderConfiguration(BaseModel):
             if self.custom_configuration.models:
                 for model_configuration in self.custom_configuration.models:
                     if model_configuration.model_type == model_type and model_configuration.model == model:
-                        return model_configuration.credentials
+                        return model_configuration.credentials.copy()
 
             if self.custom_configuration.provider:
-                return self.custom_configuration.provider.credentials
+                return self.custom_configuration.provider.credentials.copy()
             else:
                 return None
 
@@ -127,7 +128,7 @@ class ProviderConfiguration(BaseModel):
 
         credentials = self.custom_configuration.provider.credentials
         if not obfuscated:
-            return credentials
+            return credentials.copy()
 
         # Obfuscate credentials
         return self._obfuscated_credentials(
@@ -224,6 +225,8 @@ class ProviderConfiguration(BaseModel):
 
         provider_model_credentials_cache.delete()
 
+        ProviderConfigurationsCache.invalidate(self.tenant_id)
+
         self.switch_preferred_provider_type(ProviderType.CUSTOM)
 
     def delete_custom_credentials(self) -> None:
@@ -254,6 +257,8 @@ class ProviderConfiguration(BaseModel):
 
             provider_model_credentials_cache.delete()
 
+            ProviderConfigurationsCache.invalidate(self.tenant_id)
+
     def get_custom_model_credentials(self, model_type: ModelType, model: str, obfuscated: bool = False) \
             -> Optional[dict]:
         """
@@ -271,7 +276,7 @@ class ProviderConfiguration(BaseModel):
             if model_configuration.model_type == model_type and model_configuration.model == model:
                 credentials = model_configuration.credentials
                 if not obfuscated:
-                    return credentials
+                    return credentials.copy()
 
                 # Obfuscate credentials
                 return self._obfuscated_credentials(
@@ -373,6 +378,8 @@ class ProviderConfiguration(BaseModel):
 
         provider_model_credentials_cache.delete()
 
+        ProviderConfigurationsCache.invalidate(self.tenant_id)
+
     def delete_custom_model_credentials(self, model_type: ModelType, model: str) -> None:
         """
         Delete custom model credentials.
@@ -402,6 +409,8 @@ class ProviderConfiguration(BaseModel):
 
             provider_model_credentials_cache.delete()
 
+            ProviderConfigurationsCache.invalidate(self.tenant_id)
+
     def get_provider_instance(self) -> ModelProvider:
         """
         Get provider instance.
@@ -453,6 +462,8 @@ class ProviderConfiguration(BaseModel):
 
         db.session.commit()
 
+        ProviderConfigurationsCache.invalidate(self.tenant_id)
+
     def _extract_secret_variables(self, credential_form_schemas: list[CredentialFormSchema]) -> list[str]:
         """
         Extract secret input form variables.
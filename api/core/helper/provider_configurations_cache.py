@@ -0,0 +1,53 @@
+from typing import TYPE_CHECKING, Optional
+
+from core.helper.pubsub_invalidation import VersionedCache
+
+if TYPE_CHECKING:
+    from core.entities.provider_configuration import ProviderConfigurations
+
+
+class ProviderConfigurationsCache:
+    """
+    Per-tenant in-process cache of provider configurations, shared by the requests of a process.
+
+    Invalidations of a tenant are published to all processes through redis pubsub,
+    configurations built before an invalidation of the tenant are not cached.
+    Entries also expire after PROVIDER_CONFIGURATIONS_CACHE_TTL, which bounds staleness when an invalidation
+    is missed, e.g. provider records changed outside the app.
+    """
+    CHANNEL = 'provider_configurations_invalidated'
+
+    _cache = VersionedCache(
+        channel=CHANNEL,
+        size_config_key='PROVIDER_CONFIGURATIONS_CACHE_SIZE',
+        ttl_config_key='PROVIDER_CONFIGURATIONS_CACHE_TTL'
+    )
+
+    @classmethod
+    def get(cls, tenant_id: str) -> tuple[Optional['ProviderConfigurations'], tuple[int, int]]:
+        """
+        Get cached provider configurations of tenant
+        :param tenant_id: workspace id
+        :return: cached configurations or None, and the current version of the tenant to set a new entry with
+        """
+        return cls._cache.get(tenant_id)
+
+    @classmethod
+    def set(cls, tenant_id: str, version: tuple[int, int], provider_configurations: 'ProviderConfigurations') -> None:
+        """
+        Cache provider configurations of tenant, unless the tenant was invalidated since the version
+        :param tenant_id: workspace id
+        :param version: version of the tenant before the configurations were built
+        :param provider_configurations: provider configurations
+        :return:
+        """
+        cls._cache.set(tenant_id, version, provider_configurations)
+
+    @classmethod
+    def invalidate(cls, tenant_id: str) -> None:
+        """
+        Invalidate cached provider configurations of tenant in all processes
+        :param tenant_id: workspace id
+        :return:
+        """
+        cls._cache.invalidate(tenant_id)
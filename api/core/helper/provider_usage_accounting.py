@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import Flask, current_app
+
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.provider import Provider, ProviderQuotaType, ProviderType
+
+logger = logging.getLogger(__name__)
+
+# add the usage to the pending deltas, and to the quota used counter if it's loaded
+DEDUCT_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return redis.call('INCRBY', KEYS[2], ARGV[2])
+end
+return false
+"""
+
+# load the quota used counter from the persisted quota used and the deltas not flushed yet
+LOAD_SCRIPT = """
+local quota_used = redis.call('GET', KEYS[1])
+if quota_used then
+    return tonumber(quota_used)
+end
+quota_used = tonumber(ARGV[2])
+    + tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or 0)
+    + tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or 0)
+redis.call('SET', KEYS[1], quota_used, 'EX', ARGV[3])
+return quota_used
+"""
+
+
+class ProviderUsageAccounting:
+    """
+    Accounting of system provider quota usage and provider last used time in redis,
+    flushed to the providers table periodically as one update per provider row,
+    instead of an update and commit per message on the hot rows of a tenant.
+
+    Pending quota deltas and last used times are kept in redis hashes, the last used time is coalesced.
+    Quota is enforced against a counter of the quota used, loaded from the persisted quota used
+    plus the pending deltas when provider configurations are built, and incremented with each deduction.
+    Cached provider configurations of the tenant are invalidated when the quota gets exhausted.
+
+    Usage is flushed by the scheduled flush task, and in the background by the process accounting usage
+    once per flush interval across processes, so it's flushed in deployments without celery beat too.
+    Usage not flushed yet is lost if redis loses the keys, so redis must persist them and must not evict them.
+    """
+    PENDING_QUOTA_KEY = 'provider_usage:pending_quota_used'
+    FLUSHING_QUOTA_KEY = 'provider_usage:flushing_quota_used'
+    PENDING_LAST_USED_KEY = 'provider_usage:pending_last_used'
+    FLUSHING_LAST_USED_KEY = 'provider_usage:flushing_last_used'
+    FLUSH_LOCK_KEY = 'provider_usage:flush_lock'
+    FLUSH_DUE_KEY = 'provider_usage:flush_due'
+
+    @classmethod
+    def deduct_quota(cls, tenant_id: str, provider_name: str, quota_type: ProviderQuotaType,
+                     quota_limit: int, used_quota: int) -> None:
+        """
+        Deduct system provider quota
+        :param tenant_id: workspace id
+        :param provider_name: provider name
+        :param quota_type: quota type
+        :param quota_limit: quota limit
+        :param used_quota: used quota
+        :return:
+        """
+        field = cls._get_quota_field(tenant_id, provider_name, quota_type)
+        quota_used = redis_client.eval(
+            DEDUCT_SCRIPT, 2,
+            cls.PENDING_QUOTA_KEY, cls._get_counter_key(field),
+            field, used_quota
+        )
+
+        # counter not loaded, e.g. expired or flushed, is loaded when the configurations are rebuilt
+        if quota_used is None or quota_used >= quota_limit:
+            ProviderConfigurationsCache.invalidate(tenant_id)
+
+        cls._flush_if_due()
+
+    @classmethod
+    def get_quota_used(cls, tenant_id: str, provider_name: str, quota_type: ProviderQuotaType,
+                       persisted_quota_used: int) -> int:
+        """
+        Get quota used of system provider, including usage not flushed yet
+        :param tenant_id: workspace id
+        :param provider_name: provider name
+        :param quota_type: quota type
+        :param persisted_quota_used: quota used of the provider record
+        :return:
+        """
+        field = cls._get_quota_field(tenant_id, provider_name, quota_type)
+        try:
+            return int(redis_client.eval(
+                LOAD_SCRIPT, 3,
+                cls._get_counter_key(field), cls.PENDING_QUOTA_KEY, cls.FLUSHING_QUOTA_KEY,
+                field, persisted_quota_used, current_app.config['PROVIDER_QUOTA_COUNTER_TTL']
+            ))
+        except Exception:
+            logger.exception('Failed to load provider quota used counter')
+            return persisted_quota_used
+
+    @classmethod
+    def update_last_used(cls, tenant_id: str, provider_name: str) -> None:
+        """
+        Update last used time of provider
+        :param tenant_id: workspace id
+        :param provider_name: provider name
+        :return:
+        """
+        redis_client.hset(cls.PENDING_LAST_USED_KEY, f'{tenant_id}:{provider_name}', int(time.time()))
+
+        cls._flush_if_due()
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Flush pending usage to the providers table,
+        usage left by a failed flush is flushed first
+        :return: number of flushed entries
+        """
+        with redis_client.lock(cls.FLUSH_LOCK_KEY, timeout=600):
+            for pending_key, flushing_key in [(cls.PENDING_QUOTA_KEY, cls.FLUSHING_QUOTA_KEY),
+                                              (cls.PENDING_LAST_USED_KEY, cls.FLUSHING_LAST_USED_KEY)]:
+                if not redis_client.exists(flushing_key) and redis_client.exists(pending_key):
+                    redis_client.rename(pending_key, flushing_key)
+
+            quota_deltas = redis_client.hgetall(cls.FLUSHING_QUOTA_KEY)
+            last_used_times = redis_client.hgetall(cls.FLUSHING_LAST_USED_KEY)
+
+            quota_deltas = {field.decode(): int(delta) for field, delta in quota_deltas.items()}
+            for field, delta in quota_deltas.items():
+                tenant_id, provider_name, quota_type = field.split(':', 2)
+                db.session.query(Provider).filter(
+                    Provider.tenant_id == tenant_id,
+                    Provider.provider_name == provider_name,
+                    Provider.provider_type == ProviderType.SYSTEM.value,
+                    Provider.quota_type == quota_type,
+                    Provider.quota_limit > Provider.quota_used
+                ).update({'quota_used': Provider.quota_used + delta}, synchronize_session=False)
+
+            for field, last_used_at in last_used_times.items():
+                tenant_id, provider_name = field.decode().split(':', 1)
+                db.session.query(Provider).filter(
+                    Provider.tenant_id == tenant_id,
+                    Provider.provider_name == provider_name
+                ).update({'last_used': datetime.fromtimestamp(int(last_used_at), timezone.utc).replace(tzinfo=None)}, synchronize_session=False)
+
+            db.session.commit()
+
+            # counters are reloaded from the flushed quota used
+            pipeline = redis_client.pipeline()
+            pipeline.delete(cls.FLUSHING_QUOTA_KEY, cls.FLUSHING_LAST_USED_KEY)
+            for field in quota_deltas:
+                pipeline.delete(cls._get_counter_key(field))
+            pipeline.execute()
+
+        return len(quota_deltas) + len(last_used_times)
+
+    @classmethod
+    def _flush_if_due(cls) -> None:
+        """
+        Flush pending usage in a background thread, if no process did within the flush interval
+        :return:
+        """
+        if not redis_client.set(cls.FLUSH_DUE_KEY, 1, nx=True, ex=current_app.config['PROVIDER_USAGE_FLUSH_INTERVAL']):
+            return
+
+        threading.Thread(
+            target=cls._flush_in_background,
+            args=(current_app._get_current_object(),),
+            name='provider-usage-flush',
+            daemon=True
+        ).start()
+
+    @classmethod
+    def _flush_in_background(cls, flask_app: Flask) -> None:
+        with flask_app.app_context():
+            try:
+                cls.flush()
+            except Exception:
+                logger.exception('Failed to flush provider usage')
+
+    @staticmethod
+    def _get_quota_field(tenant_id: str, provider_name: str, quota_type: ProviderQuotaType) -> str:
+        return f'{tenant_id}:{provider_name}:{quota_type.value}'
+
+    @staticmethod
+    def _get_counter_key(field: str) -> str:
+        return f'provider_usage:quota_used:{field}'
+
@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+
+from flask import current_app
+
+from core.helper.lru_cache import LRUCache
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class PubSubSubscriber:
+    """
+    Process-wide subscriber of redis pubsub channels, one thread and connection for all channels.
+
+    Messages of a channel are passed to its message handler. The subscribed handler of a channel is called
+    each time the channel is (re)subscribed, as messages published while not subscribed are lost.
+    Channels added while listening are subscribed within the poll timeout.
+    """
+    POLL_TIMEOUT = 1
+    RESUBSCRIBE_INTERVAL = 5
+
+    _handlers: dict[str, tuple[Callable[[str], None], Optional[Callable[[], None]]]] = {}
+    _lock = threading.Lock()
+    _subscriber: Optional[threading.Thread] = None
+
+    @classmethod
+    def subscribe(cls, channel: str,
+                  on_message: Callable[[str], None],
+                  on_subscribed: Optional[Callable[[], None]] = None) -> None:
+        """
+        Subscribe to channel, the first handlers of a channel are kept
+        :param channel: channel
+        :param on_message: handler of the decoded message data
+        :param on_subscribed: handler called when the channel is (re)subscribed
+        :return:
+        """
+        # the subscriber of a parent process doesn't survive forking, e.g. into celery workers
+        if channel in cls._handlers and cls._subscriber is not None and cls._subscriber.is_alive():
+            return
+
+        with cls._lock:
+            cls._handlers.setdefault(channel, (on_message, on_subscribed))
+            if cls._subscriber is None or not cls._subscriber.is_alive():
+                cls._subscriber = threading.Thread(
+                    target=cls._listen,
+                    name='pubsub-subscriber',
+                    daemon=True
+                )
+                cls._subscriber.start()
+
+    @classmethod
+    def _listen(cls) -> None:
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                subscribed: set[str] = set()
+                while True:
+                    with cls._lock:
+                        handlers = dict(cls._handlers)
+
+                    channels = handlers.keys() - subscribed
+                    if channels:
+                        pubsub.subscribe(*channels)
+                        subscribed.update(channels)
+                        for channel in channels:
+                            on_subscribed = handlers[channel][1]
+                            if on_subscribed:
+                                on_subscribed()
+
+                    message = pubsub.get_message(timeout=cls.POLL_TIMEOUT)
+                    if message and message['type'] == 'message':
+                        on_message = handlers[message['channel'].decode()][0]
+                        on_message(message['data'].decode())
+            except Exception:
+                logger.exception('Pubsub subscriber failed, resubscribing')
+                time.sleep(cls.RESUBSCRIBE_INTERVAL)
+
+
+class VersionedCache:
+    """
+    In-process cache of values by key, shared by the requests of a process,
+    invalidated in all processes through redis pubsub.
+
+    Each key has a local version, bumped by invalidations. Values built before an invalidation of the key
+    are not cached. All entries are dropped when the channel is (re)subscribed, as invalidations may have been missed.
+    Entries also expire after a ttl, which bounds staleness when an invalidation is missed,
+    e.g. records changed outside the app.
+    """
+
+    def __init__(self, channel: str, size_config_key: str, ttl_config_key: str) -> None:
+        """
+        :param channel: invalidation channel
+        :param size_config_key: config key of the max number of entries
+        :param ttl_config_key: config key of the ttl of entries in seconds
+        """
+        self.channel = channel
+        self._size_config_key = size_config_key
+        self._ttl_config_key = ttl_config_key
+        self._cache: Optional[LRUCache] = None
+        self._versions: dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> tuple[Any, tuple[int, int]]:
+        """
+        Get cached value of key
+        :param key: key
+        :param default: returned if the key is not cached
+        :return: cached value or default, and the current version of the key to set a new value with
+        """
+        PubSubSubscriber.subscribe(self.channel, self._invalidate_local, self._clear_local)
+
+        with self._lock:
+            version = self._get_version(key)
+            cached = self._get_local_cache().get(key)
+
+        if cached and cached[0] == version and cached[1] > time.monotonic():
+            return cached[2], version
+
+        return default, version
+
+    def set(self, key: str, version: tuple[int, int], value: Any) -> None:
+        """
+        Cache value of key, unless the key was invalidated since the version
+        :param key: key
+        :param version: version of the key before the value was built
+        :param value: value
+        :return:
+        """
+        expires_at = time.monotonic() + current_app.config[self._ttl_config_key]
+        with self._lock:
+            if self._get_version(key) == version:
+                self._get_local_cache().put(key, (version, expires_at, value))
+
+    def invalidate(self, key: str) -> None:
+        """
+        Invalidate cached value of key in all processes
+        :param key: key
+        :return:
+        """
+        self._invalidate_local(key)
+
+        try:
+            redis_client.publish(self.channel, key)
+        except Exception:
+            logger.exception(f'Failed to publish invalidation to {self.channel}')
+
+    def _invalidate_local(self, key: str) -> None:
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            if self._cache is not None:
+                self._cache.put(key, None)
+
+    def _clear_local(self) -> None:
+        with self._lock:
+            self._epoch += 1
+
+    def _get_version(self, key: str) -> tuple[int, int]:
+        return self._epoch, self._versions.get(key, 0)
+
+    def _get_local_cache(self) -> LRUCache:
+        if self._cache is None:
+            self._cache = LRUCache(current_app.config[self._size_config_key])
+
+        return self._cache
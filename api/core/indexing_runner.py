@@ -13,6 +13,7 @@ from flask_login import current_user
 from sqlalchemy.orm.exc import ObjectDeletedError
 
 from core.docstore.dataset_docstore import DatasetDocumentStore
+from core.embedding.embedding_dispatcher import EmbeddingDispatcher
 from core.errors.error import ProviderTokenNotInitError
 from core.llm_generator.llm_generator import LLMGenerator
 from core.model_manager import ModelInstance, ModelManager
@@ -677,14 +678,23 @@ class IndexingRunner:
                                                        dataset.id, dataset_document.id, documents))
         create_keyword_thread.start()
         if dataset.indexing_technique == 'high_quality':
+            embedding_dispatcher = EmbeddingDispatcher(embedding_model_instance)
             with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
                 futures = []
-                for i in range(0, len(documents), chunk_size):
-                    chunk_documents = documents[i:i + chunk_size]
-                    futures.append(executor.submit(self._process_chunk, current_app._get_current_object(), index_processor,
-                                                   chunk_documents, dataset,
-                                                   dataset_document, embedding_model_instance,
-                                                   embedding_model_type_instance))
+                # write chunks to the vector store as soon as their embeddings are available
+                for text_embeddings in embedding_dispatcher.embed_documents(
+                        [document.page_content for document in documents]):
+                    self._check_document_paused_status(dataset_document.id)
+
+                    indices = sorted(text_embeddings.keys())
+                    for i in range(0, len(indices), chunk_size):
+                        chunk_indices = indices[i:i + chunk_size]
+                        futures.append(executor.submit(self._process_chunk, current_app._get_current_object(),
+                                                       index_processor,
+                                                       [documents[index] for index in chunk_indices], dataset,
+                                                       dataset_document, embedding_model_instance,
+                                                       embedding_model_type_instance,
+                                                       [text_embeddings[index] for index in chunk_indices]))
 
                 for future in futures:
                     tokens += future.result()
@@ -725,7 +735,7 @@ class IndexingRunner:
                 db.session.commit()
 
     def _process_chunk(self, flask_app, index_processor, chunk_documents, dataset, dataset_document,
-                       embedding_model_instance, embedding_model_type_instance):
+                       embedding_model_instance, embedding_model_type_instance, chunk_embeddings=None):
         with flask_app.app_context():
             # check document is paused
             self._check_document_paused_status(dataset_document.id)
@@ -742,7 +752,7 @@ class IndexingRunner:
                 )
 
             # load index
-            index_processor.load(dataset, chunk_documents, with_keywords=False)
+            index_processor.load(dataset, chunk_documents, with_keywords=False, embeddings=chunk_embeddings)
 
             document_ids = [document.metadata['doc_id'] for document in chunk_documents]
             db.session.query(DocumentSegment).filter(
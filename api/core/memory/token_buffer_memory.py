@@ -1,3 +1,7 @@
+import logging
+from bisect import bisect_left
+from itertools import accumulate
+
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
 from core.file.message_file_parser import MessageFileParser
 from core.model_manager import ModelInstance
@@ -11,11 +15,15 @@ from core.model_runtime.entities.message_entities import (
 )
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.model_providers import model_provider_factory
+from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from models.model import AppMode, Conversation, Message
 
 
 class TokenBufferMemory:
+    MESSAGE_TOKENS_CACHE_TTL = 86400
+
     def __init__(self, conversation: Conversation, model_instance: ModelInstance) -> None:
         self.conversation = conversation
         self.model_instance = model_instance
@@ -42,6 +50,8 @@ class TokenBufferMemory:
         )
 
         prompt_messages = []
+        # id of the message each prompt message comes from
+        prompt_message_ids = []
         for message in messages:
             files = message.message_files
             if files:
@@ -73,6 +83,7 @@ class TokenBufferMemory:
                 prompt_messages.append(UserPromptMessage(content=message.query))
 
             prompt_messages.append(AssistantPromptMessage(content=message.answer))
+            prompt_message_ids.extend([message.id, message.id])
 
         if not prompt_messages:
             return []
@@ -88,9 +99,25 @@ class TokenBufferMemory:
         )
 
         if curr_message_tokens > max_token_limit:
-            pruned_memory = []
+            message_tokens = self._get_prompt_message_tokens(model_type_instance, prompt_messages, prompt_message_ids)
+
+            # pruning a message doesn't save the per request overhead counted in its single message tokens
+            request_overhead = max(0, (sum(message_tokens) - curr_message_tokens) / (len(message_tokens) - 1)) \
+                if len(message_tokens) > 1 else 0
+
+            # prune the oldest messages, until the remaining tokens are within the limit
+            pruned_tokens = list(accumulate(max(0, tokens - request_overhead) for tokens in message_tokens))
+            pruned_count = bisect_left(pruned_tokens, curr_message_tokens - max_token_limit) + 1
+            prompt_messages = prompt_messages[pruned_count:]
+
+            # single message tokens are estimates, keep pruning until the counted tokens are within the limit
+            curr_message_tokens = model_type_instance.get_num_tokens(
+                self.model_instance.model,
+                self.model_instance.credentials,
+                prompt_messages
+            ) if prompt_messages else 0
             while curr_message_tokens > max_token_limit and prompt_messages:
-                pruned_memory.append(prompt_messages.pop(0))
+                prompt_messages.pop(0)
                 curr_message_tokens = model_type_instance.get_num_tokens(
                     self.model_instance.model,
                     self.model_instance.credentials,
@@ -99,6 +126,57 @@ class TokenBufferMemory:
 
         return prompt_messages
 
+    def _get_prompt_message_tokens(self, model_type_instance: LargeLanguageModel,
+                                   prompt_messages: list[PromptMessage],
+                                   prompt_message_ids: list[str]) -> list[int]:
+        """
+        Get tokens of each prompt message, counts are cached by message id as messages don't change once answered.
+        :param model_type_instance: model type instance
+        :param prompt_messages: prompt messages, in pairs of user and assistant message of each message
+        :param prompt_message_ids: message id of each prompt message
+        :return:
+        """
+        message_ids = prompt_message_ids[::2]
+        cache_keys = [
+            f'message_tokens:{self.model_instance.provider}:{self.model_instance.model}:{message_id}'
+            for message_id in message_ids
+        ]
+
+        try:
+            cached_tokens = redis_client.mget(cache_keys)
+        except Exception:
+            logging.exception('Failed to get message tokens from redis')
+            cached_tokens = [None] * len(cache_keys)
+
+        message_tokens = []
+        new_cached_tokens = {}
+        for i, cached in enumerate(cached_tokens):
+            if cached:
+                message_tokens.extend(int(tokens) for tokens in cached.decode().split(','))
+                continue
+
+            tokens = [
+                model_type_instance.get_num_tokens(
+                    self.model_instance.model,
+                    self.model_instance.credentials,
+                    [prompt_message]
+                )
+                for prompt_message in prompt_messages[i * 2:i * 2 + 2]
+            ]
+            message_tokens.extend(tokens)
+            new_cached_tokens[cache_keys[i]] = ','.join(str(count) for count in tokens)
+
+        if new_cached_tokens:
+            try:
+                pipeline = redis_client.pipeline(transaction=False)
+                for cache_key, tokens in new_cached_tokens.items():
+                    pipeline.setex(cache_key, self.MESSAGE_TOKENS_CACHE_TTL, tokens)
+                pipeline.execute()
+            except Exception:
+                logging.exception('Failed to save message tokens to redis')
+
+        return message_tokens
+
     def get_history_prompt_text(self, human_prefix: str = "Human",
                                 ai_prefix: str = "Assistant",
                                 max_token_limit: int = 2000,
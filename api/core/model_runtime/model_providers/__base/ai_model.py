@@ -315,4 +315,13 @@ class AIModel(ABC):
         :param text: plain text of prompt. You need to convert the original message to plain text
         :return: number of tokens
         """
-        return GPT2Tokenizer.get_num_tokens(text)
\ No newline at end of file
+        return GPT2Tokenizer.get_num_tokens(text)
+
+    def _get_num_tokens_by_gpt2_batch(self, texts: list[str]) -> list[int]:
+        """
+        Get number of tokens of each text by gpt2, in one batch
+
+        :param texts: plain texts
+        :return: number of tokens of each text
+        """
+        return GPT2Tokenizer.get_num_tokens_batch(texts)
\ No newline at end of file
@@ -2,7 +2,7 @@ from os.path import abspath, dirname, join
 from threading import Lock
 from typing import Any
 
-from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer
+from core.model_runtime.model_providers.__base.tokenizers.tokenizer_registry import TokenizerRegistry
 
 _tokenizer = None
 _lock = Lock()
@@ -13,21 +13,29 @@ class GPT2Tokenizer:
         """
             use gpt2 tokenizer to get num tokens
         """
-        _tokenizer = GPT2Tokenizer.get_encoder()
-        tokens = _tokenizer.encode(text, verbose=False)
-        return len(tokens)
-    
+        return TokenizerRegistry.get('gpt2').get_num_tokens(text)
+
     @staticmethod
     def get_num_tokens(text: str) -> int:
         return GPT2Tokenizer._get_num_tokens_by_gpt2(text)
-    
+
+    @staticmethod
+    def get_num_tokens_batch(texts: list[str]) -> list[int]:
+        return TokenizerRegistry.get('gpt2').get_num_tokens_batch(texts)
+
     @staticmethod
     def get_encoder() -> Any:
+        """
+            get the transformers gpt2 tokenizer, token counting uses the fast tokenizer of TokenizerRegistry
+        """
         global _tokenizer, _lock
-        with _lock:
-            if _tokenizer is None:
-                base_path = abspath(__file__)
-                gpt2_tokenizer_path = join(dirname(base_path), 'gpt2')
-                _tokenizer = TransformerGPT2Tokenizer.from_pretrained(gpt2_tokenizer_path)
+        if _tokenizer is None:
+            with _lock:
+                if _tokenizer is None:
+                    from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer
+
+                    base_path = abspath(__file__)
+                    gpt2_tokenizer_path = join(dirname(base_path), 'gpt2')
+                    _tokenizer = TransformerGPT2Tokenizer.from_pretrained(gpt2_tokenizer_path)
 
-            return _tokenizer
\ No newline at end of file
+        return _tokenizer
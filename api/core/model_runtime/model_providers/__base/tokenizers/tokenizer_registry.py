@@ -0,0 +1,201 @@
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from functools import lru_cache
+from os.path import abspath, dirname, join
+from threading import Lock
+from typing import Optional
+
+
+class BaseTokenizer(ABC):
+    """
+    Tokenizer used to count tokens.
+    Counts of short texts are kept in an LRU, as the same prompts, messages and chunks are counted repeatedly.
+    """
+    CACHE_SIZE = 8192
+    CACHE_MAX_TEXT_LENGTH = 4096
+
+    def __init__(self) -> None:
+        self._get_cached_num_tokens = lru_cache(maxsize=self.CACHE_SIZE)(self._get_num_tokens)
+
+    def get_num_tokens(self, text: str) -> int:
+        """
+        Get number of tokens of text
+        :param text: text
+        :return:
+        """
+        if not text:
+            return 0
+
+        if len(text) > self.CACHE_MAX_TEXT_LENGTH:
+            return self._get_num_tokens(text)
+
+        return self._get_cached_num_tokens(text)
+
+    def get_num_tokens_batch(self, texts: list[str]) -> list[int]:
+        """
+        Get number of tokens of texts, long texts are encoded in one batch
+        :param texts: texts
+        :return: number of tokens of each text
+        """
+        num_tokens = [0] * len(texts)
+        long_text_indices = []
+        for i, text in enumerate(texts):
+            if len(text) > self.CACHE_MAX_TEXT_LENGTH:
+                long_text_indices.append(i)
+            elif text:
+                num_tokens[i] = self._get_cached_num_tokens(text)
+
+        if long_text_indices:
+            long_text_num_tokens = self._get_num_tokens_batch([texts[i] for i in long_text_indices])
+            for i, count in zip(long_text_indices, long_text_num_tokens):
+                num_tokens[i] = count
+
+        return num_tokens
+
+    @abstractmethod
+    def _get_num_tokens(self, text: str) -> int:
+        raise NotImplementedError
+
+    def _get_num_tokens_batch(self, texts: list[str]) -> list[int]:
+        return [self._get_num_tokens(text) for text in texts]
+
+
+class GPT2FastTokenizer(BaseTokenizer):
+    """
+    GPT2 byte level BPE tokenizer on the native `tokenizers` backend, built from the bundled gpt2 vocab and merges.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+
+        gpt2_tokenizer_path = join(dirname(abspath(__file__)), 'gpt2')
+        tokenizer = Tokenizer(models.BPE.from_file(
+            join(gpt2_tokenizer_path, 'vocab.json'),
+            join(gpt2_tokenizer_path, 'merges.txt')
+        ))
+        tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+        tokenizer.decoder = decoders.ByteLevel()
+        # same as the transformers gpt2 tokenizer, which keeps the special token as one token
+        tokenizer.add_special_tokens(['<|endoftext|>'])
+        self._tokenizer = tokenizer
+
+    def _get_num_tokens(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def _get_num_tokens_batch(self, texts: list[str]) -> list[int]:
+        return [len(encoding.ids) for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+
+class TiktokenTokenizer(BaseTokenizer):
+    """
+    Tokenizer of a tiktoken encoding, like cl100k_base.
+    """
+
+    def __init__(self, encoding_name: str) -> None:
+        super().__init__()
+        import tiktoken
+
+        self._encoding = tiktoken.get_encoding(encoding_name)
+
+    def encode(self, text: str) -> list[int]:
+        """
+        Encode text, special tokens in the text are encoded as plain text
+        :param text: text
+        :return: token ids
+        """
+        return self._encoding.encode(text, disallowed_special=())
+
+    def _get_num_tokens(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def _get_num_tokens_batch(self, texts: list[str]) -> list[int]:
+        return [len(tokens) for tokens in self._encoding.encode_batch(texts, disallowed_special=())]
+
+
+class TokenizerRegistry:
+    """
+    Registry of tokenizers by model family.
+    Tokenizers are created on first use and shared afterwards, getting a created tokenizer takes no lock.
+    """
+    _factories: dict[str, Callable[[], BaseTokenizer]] = {}
+    _tokenizers: dict[str, BaseTokenizer] = {}
+    _lock = Lock()
+
+    @classmethod
+    def register(cls, name: str, factory: Callable[[], BaseTokenizer]) -> None:
+        """
+        Register tokenizer factory
+        :param name: model family name, like: gpt2, cl100k_base
+        :param factory: tokenizer factory
+        :return:
+        """
+        with cls._lock:
+            cls._factories[name] = factory
+            cls._tokenizers.pop(name, None)
+
+    @classmethod
+    def unregister(cls, name: str) -> None:
+        """
+        Unregister tokenizer factory and drop its created tokenizer
+        :param name: model family name
+        :return:
+        """
+        with cls._lock:
+            cls._factories.pop(name, None)
+            cls._tokenizers.pop(name, None)
+
+    @classmethod
+    def get(cls, name: str) -> BaseTokenizer:
+        """
+        Get tokenizer
+        :param name: model family name
+        :return:
+        """
+        tokenizer = cls._tokenizers.get(name)
+        if tokenizer is None:
+            with cls._lock:
+                tokenizer = cls._tokenizers.get(name)
+                if tokenizer is None:
+                    factory = cls._factories.get(name)
+                    if not factory:
+                        raise ValueError(f'Tokenizer {name} is not registered')
+
+                    tokenizer = factory()
+                    cls._tokenizers[name] = tokenizer
+
+        return tokenizer
+
+    @classmethod
+    def get_tiktoken_tokenizer(cls, model: str) -> TiktokenTokenizer:
+        """
+        Get tokenizer of the tiktoken encoding of model, cl100k_base for unknown models
+        :param model: model name, like: gpt-4, text-embedding-ada-002
+        :return:
+        """
+        from tiktoken.model import encoding_name_for_model
+
+        try:
+            encoding_name = encoding_name_for_model(model)
+        except KeyError:
+            encoding_name = 'cl100k_base'
+
+        if encoding_name not in cls._factories:
+            with cls._lock:
+                cls._factories.setdefault(encoding_name, lambda: TiktokenTokenizer(encoding_name))
+
+        return cls.get(encoding_name)
+
+    @classmethod
+    def get_num_tokens(cls, text: str, name: Optional[str] = None) -> int:
+        """
+        Get number of tokens of text
+        :param text: text
+        :param name: model family name, gpt2 by default
+        :return:
+        """
+        return cls.get(name or 'gpt2').get_num_tokens(text)
+
+
+TokenizerRegistry.register('gpt2', GPT2FastTokenizer)
+TokenizerRegistry.register('cl100k_base', lambda: TiktokenTokenizer('cl100k_base'))
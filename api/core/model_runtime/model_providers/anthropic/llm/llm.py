@@ -42,6 +42,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.utils.http_client_pool import HttpClientPool
 
 ANTHROPIC_BLOCK_MODE_PROMPT = """You should always follow the instructions and output a valid {{block}} object.
 The structure of the {{block}} object you can found in the instructions, use {"answer": "$your_answer"} as the default structure
@@ -99,7 +100,7 @@ class AnthropicLargeLanguageModel(LargeLanguageModel):
             model_parameters['max_tokens'] = model_parameters.pop('max_tokens_to_sample')
 
         # init model client
-        client = Anthropic(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         extra_model_kwargs = {}
         if stop:
@@ -386,6 +387,19 @@ class AnthropicLargeLanguageModel(LargeLanguageModel):
 
         return credentials_kwargs
 
+    def _get_client(self, credentials_kwargs: dict) -> Anthropic:
+        """
+        Get shared client of credentials, which keeps connections alive across invocations
+
+        :param credentials_kwargs: credentials kwargs
+        :return:
+        """
+        return HttpClientPool.get_client(
+            provider='anthropic',
+            client_kwargs=credentials_kwargs,
+            factory=lambda http_client: Anthropic(**credentials_kwargs, http_client=http_client)
+        )
+
     def _convert_prompt_messages(self, prompt_messages: list[PromptMessage]) -> tuple[str, list[dict]]:
         """
         Convert prompt messages to dict list and system
@@ -1,5 +1,6 @@
 import openai
 from httpx import Timeout
+from openai import AzureOpenAI
 
 from core.model_runtime.errors.invoke import (
     InvokeAuthorizationError,
@@ -10,6 +11,7 @@ from core.model_runtime.errors.invoke import (
     InvokeServerUnavailableError,
 )
 from core.model_runtime.model_providers.azure_openai._constant import AZURE_OPENAI_API_VERSION
+from core.model_runtime.utils.http_client_pool import HttpClientPool
 
 
 class _CommonAzureOpenAI:
@@ -26,6 +28,20 @@ class _CommonAzureOpenAI:
 
         return credentials_kwargs
 
+    @staticmethod
+    def _get_client(credentials_kwargs: dict) -> AzureOpenAI:
+        """
+        Get shared client of credentials, which keeps connections alive across invocations
+
+        :param credentials_kwargs: credentials kwargs
+        :return:
+        """
+        return HttpClientPool.get_client(
+            provider='azure_openai',
+            client_kwargs=credentials_kwargs,
+            factory=lambda http_client: AzureOpenAI(**credentials_kwargs, http_client=http_client)
+        )
+
     @property
     def _invoke_error_mapping(self) -> dict[type[InvokeError], list[type[Exception]]]:
         return {
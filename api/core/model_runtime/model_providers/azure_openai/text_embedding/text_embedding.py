@@ -4,13 +4,13 @@ import time
 from typing import Optional, Union
 
 import numpy as np
-import tiktoken
 from openai import AzureOpenAI
 
 from core.model_runtime.entities.model_entities import AIModelEntity, PriceType
 from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage, TextEmbeddingResult
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
+from core.model_runtime.model_providers.__base.tokenizers.tokenizer_registry import TokenizerRegistry
 from core.model_runtime.model_providers.azure_openai._common import _CommonAzureOpenAI
 from core.model_runtime.model_providers.azure_openai._constant import EMBEDDING_BASE_MODELS, AzureBaseModel
 
@@ -22,7 +22,7 @@ class AzureOpenAITextEmbeddingModel(_CommonAzureOpenAI, TextEmbeddingModel):
             -> TextEmbeddingResult:
         base_model_name = credentials['base_model_name']
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = AzureOpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         extra_model_kwargs = {}
         if user:
@@ -38,15 +38,10 @@ class AzureOpenAITextEmbeddingModel(_CommonAzureOpenAI, TextEmbeddingModel):
         indices = []
         used_tokens = 0
 
-        try:
-            enc = tiktoken.encoding_for_model(base_model_name)
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
+        tokenizer = TokenizerRegistry.get_tiktoken_tokenizer(base_model_name)
 
         for i, text in enumerate(texts):
-            token = enc.encode(
-                text
-            )
+            token = tokenizer.encode(text)
             for j in range(0, len(token), context_size):
                 tokens += [token[j: j + context_size]]
                 indices += [i]
@@ -104,18 +99,9 @@ class AzureOpenAITextEmbeddingModel(_CommonAzureOpenAI, TextEmbeddingModel):
         if len(texts) == 0:
             return 0
 
-        try:
-            enc = tiktoken.encoding_for_model(credentials['base_model_name'])
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
-
-        total_num_tokens = 0
-        for text in texts:
-            # calculate the number of tokens in the encoded text
-            tokenized_text = enc.encode(text)
-            total_num_tokens += len(tokenized_text)
+        tokenizer = TokenizerRegistry.get_tiktoken_tokenizer(credentials['base_model_name'])
 
-        return total_num_tokens
+        return sum(tokenizer.get_num_tokens_batch(texts))
 
     def validate_credentials(self, model: str, credentials: dict) -> None:
         if 'openai_api_base' not in credentials:
@@ -112,10 +112,7 @@ class BedrockTextEmbeddingModel(TextEmbeddingModel):
         :param texts: texts to embed
         :return:
         """
-        num_tokens = 0
-        for text in texts:
-            num_tokens += self._get_num_tokens_by_gpt2(text)
-        return num_tokens
+        return sum(self._get_num_tokens_by_gpt2_batch(texts))
 
     def validate_credentials(self, model: str, credentials: dict) -> None:
         """
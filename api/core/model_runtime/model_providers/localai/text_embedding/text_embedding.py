@@ -109,11 +109,7 @@ class LocalAITextEmbeddingModel(TextEmbeddingModel):
         :param texts: texts to embed
         :return:
         """
-        num_tokens = 0
-        for text in texts:
-            # use GPT2Tokenizer to get num tokens
-            num_tokens += self._get_num_tokens_by_gpt2(text)
-        return num_tokens
+        return sum(self._get_num_tokens_by_gpt2_batch(texts))
     
     def _get_customizable_model_schema(self, model: str, credentials: dict) -> AIModelEntity | None:
         """
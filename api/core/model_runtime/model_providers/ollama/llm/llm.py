@@ -41,6 +41,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.utils.http_client_pool import HttpClientPool
 
 logger = logging.getLogger(__name__)
 
@@ -197,7 +198,7 @@ class OllamaLargeLanguageModel(LargeLanguageModel):
                     data['images'] = images
 
         # send a post request to validate the credentials
-        response = requests.post(
+        response = HttpClientPool.get_session('ollama', endpoint_url).post(
             endpoint_url,
             headers=headers,
             json=data,
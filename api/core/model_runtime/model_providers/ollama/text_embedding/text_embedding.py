@@ -28,6 +28,7 @@ from core.model_runtime.errors.invoke import (
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
+from core.model_runtime.utils.http_client_pool import HttpClientPool
 
 logger = logging.getLogger(__name__)
 
@@ -88,7 +89,7 @@ class OllamaEmbeddingModel(TextEmbeddingModel):
             }
 
             # Make the request to the OpenAI API
-            response = requests.post(
+            response = HttpClientPool.get_session('ollama', endpoint_url).post(
                 endpoint_url,
                 headers=headers,
                 data=json.dumps(payload),
@@ -127,7 +128,7 @@ class OllamaEmbeddingModel(TextEmbeddingModel):
         :param texts: texts to embed
         :return:
         """
-        return sum(self._get_num_tokens_by_gpt2(text) for text in texts)
+        return sum(self._get_num_tokens_by_gpt2_batch(texts))
 
     def validate_credentials(self, model: str, credentials: dict) -> None:
         """
@@ -1,5 +1,6 @@
 import openai
 from httpx import Timeout
+from openai import OpenAI
 
 from core.model_runtime.errors.invoke import (
     InvokeAuthorizationError,
@@ -9,6 +10,7 @@ from core.model_runtime.errors.invoke import (
     InvokeRateLimitError,
     InvokeServerUnavailableError,
 )
+from core.model_runtime.utils.http_client_pool import HttpClientPool
 
 
 class _CommonOpenAI:
@@ -34,6 +36,19 @@ class _CommonOpenAI:
 
         return credentials_kwargs
 
+    def _get_client(self, credentials_kwargs: dict) -> OpenAI:
+        """
+        Get shared client of credentials, which keeps connections alive across invocations
+
+        :param credentials_kwargs: credentials kwargs
+        :return:
+        """
+        return HttpClientPool.get_client(
+            provider='openai',
+            client_kwargs=credentials_kwargs,
+            factory=lambda http_client: OpenAI(**credentials_kwargs, http_client=http_client)
+        )
+
     @property
     def _invoke_error_mapping(self) -> dict[type[InvokeError], list[type[Exception]]]:
         """
@@ -2,12 +2,12 @@ import logging
 from collections.abc import Generator
 from typing import Optional, Union, cast
 
-import tiktoken
 from openai import OpenAI, Stream
 from openai.types import Completion
 from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessageToolCall
 from openai.types.chat.chat_completion_chunk import ChoiceDeltaFunctionCall, ChoiceDeltaToolCall
 from openai.types.chat.chat_completion_message import FunctionCall
+from tiktoken.model import encoding_name_for_model
 
 from core.model_runtime.callbacks.base_callback import Callback
 from core.model_runtime.entities.llm_entities import LLMMode, LLMResult, LLMResultChunk, LLMResultChunkDelta
@@ -25,6 +25,7 @@ from core.model_runtime.entities.message_entities import (
 from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom, I18nObject, ModelType, PriceConfig
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.model_runtime.model_providers.__base.tokenizers.tokenizer_registry import BaseTokenizer, TokenizerRegistry
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
 logger = logging.getLogger(__name__)
@@ -307,7 +308,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
 
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         # get all remote models
         remote_models = client.models.list()
@@ -368,7 +369,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         extra_model_kwargs = {}
 
@@ -520,7 +521,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         response_format = model_parameters.get("response_format")
         if response_format:
@@ -859,15 +860,11 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         :param tools: tools for tool calling
         :return: number of tokens
         """
-        try:
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
-            encoding = tiktoken.get_encoding("cl100k_base")
-
-        num_tokens = len(encoding.encode(text))
+        tokenizer = TokenizerRegistry.get_tiktoken_tokenizer(model)
+        num_tokens = tokenizer.get_num_tokens(text)
 
         if tools:
-            num_tokens += self._num_tokens_for_tools(encoding, tools)
+            num_tokens += self._num_tokens_for_tools(tokenizer, tools)
 
         return num_tokens
 
@@ -881,11 +878,11 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
             model = model.split(':')[1]
 
         try:
-            encoding = tiktoken.encoding_for_model(model)
+            encoding_name_for_model(model)
         except KeyError:
             logger.warning("Warning: model not found. Using cl100k_base encoding.")
             model = "cl100k_base"
-            encoding = tiktoken.get_encoding(model)
+        tokenizer = TokenizerRegistry.get_tiktoken_tokenizer(model)
 
         if model.startswith("gpt-3.5-turbo-0301"):
             # every message follows <im_start>{role/name}\n{content}<im_end>\n
@@ -923,16 +920,16 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
                 if key == "tool_calls":
                     for tool_call in value:
                         for t_key, t_value in tool_call.items():
-                            num_tokens += len(encoding.encode(t_key))
+                            num_tokens += tokenizer.get_num_tokens(t_key)
                             if t_key == "function":
                                 for f_key, f_value in t_value.items():
-                                    num_tokens += len(encoding.encode(f_key))
-                                    num_tokens += len(encoding.encode(f_value))
+                                    num_tokens += tokenizer.get_num_tokens(f_key)
+                                    num_tokens += tokenizer.get_num_tokens(f_value)
                             else:
-                                num_tokens += len(encoding.encode(t_key))
-                                num_tokens += len(encoding.encode(t_value))
+                                num_tokens += tokenizer.get_num_tokens(t_key)
+                                num_tokens += tokenizer.get_num_tokens(t_value)
                 else:
-                    num_tokens += len(encoding.encode(str(value)))
+                    num_tokens += tokenizer.get_num_tokens(str(value))
 
                 if key == "name":
                     num_tokens += tokens_per_name
@@ -941,53 +938,53 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         num_tokens += 3
 
         if tools:
-            num_tokens += self._num_tokens_for_tools(encoding, tools)
+            num_tokens += self._num_tokens_for_tools(tokenizer, tools)
 
         return num_tokens
 
-    def _num_tokens_for_tools(self, encoding: tiktoken.Encoding, tools: list[PromptMessageTool]) -> int:
+    def _num_tokens_for_tools(self, tokenizer: BaseTokenizer, tools: list[PromptMessageTool]) -> int:
         """
         Calculate num tokens for tool calling with tiktoken package.
 
-        :param encoding: encoding
+        :param tokenizer: tokenizer
         :param tools: tools for tool calling
         :return: number of tokens
         """
         num_tokens = 0
         for tool in tools:
-            num_tokens += len(encoding.encode('type'))
-            num_tokens += len(encoding.encode('function'))
+            num_tokens += tokenizer.get_num_tokens('type')
+            num_tokens += tokenizer.get_num_tokens('function')
 
             # calculate num tokens for function object
-            num_tokens += len(encoding.encode('name'))
-            num_tokens += len(encoding.encode(tool.name))
-            num_tokens += len(encoding.encode('description'))
-            num_tokens += len(encoding.encode(tool.description))
+            num_tokens += tokenizer.get_num_tokens('name')
+            num_tokens += tokenizer.get_num_tokens(tool.name)
+            num_tokens += tokenizer.get_num_tokens('description')
+            num_tokens += tokenizer.get_num_tokens(tool.description)
             parameters = tool.parameters
-            num_tokens += len(encoding.encode('parameters'))
+            num_tokens += tokenizer.get_num_tokens('parameters')
             if 'title' in parameters:
-                num_tokens += len(encoding.encode('title'))
-                num_tokens += len(encoding.encode(parameters.get("title")))
-            num_tokens += len(encoding.encode('type'))
-            num_tokens += len(encoding.encode(parameters.get("type")))
+                num_tokens += tokenizer.get_num_tokens('title')
+                num_tokens += tokenizer.get_num_tokens(parameters.get("title"))
+            num_tokens += tokenizer.get_num_tokens('type')
+            num_tokens += tokenizer.get_num_tokens(parameters.get("type"))
             if 'properties' in parameters:
-                num_tokens += len(encoding.encode('properties'))
+                num_tokens += tokenizer.get_num_tokens('properties')
                 for key, value in parameters.get('properties').items():
-                    num_tokens += len(encoding.encode(key))
+                    num_tokens += tokenizer.get_num_tokens(key)
                     for field_key, field_value in value.items():
-                        num_tokens += len(encoding.encode(field_key))
+                        num_tokens += tokenizer.get_num_tokens(field_key)
                         if field_key == 'enum':
                             for enum_field in field_value:
                                 num_tokens += 3
-                                num_tokens += len(encoding.encode(enum_field))
+                                num_tokens += tokenizer.get_num_tokens(enum_field)
                         else:
-                            num_tokens += len(encoding.encode(field_key))
-                            num_tokens += len(encoding.encode(str(field_value)))
+                            num_tokens += tokenizer.get_num_tokens(field_key)
+                            num_tokens += tokenizer.get_num_tokens(str(field_value))
             if 'required' in parameters:
-                num_tokens += len(encoding.encode('required'))
+                num_tokens += tokenizer.get_num_tokens('required')
                 for required_field in parameters['required']:
                     num_tokens += 3
-                    num_tokens += len(encoding.encode(required_field))
+                    num_tokens += tokenizer.get_num_tokens(required_field)
 
         return num_tokens
 
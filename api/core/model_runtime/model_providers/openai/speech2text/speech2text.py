@@ -1,7 +1,5 @@
 from typing import IO, Optional
 
-from openai import OpenAI
-
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.speech2text_model import Speech2TextModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
@@ -55,7 +53,7 @@ class OpenAISpeech2TextModel(_CommonOpenAI, Speech2TextModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         response = client.audio.transcriptions.create(model=model, file=file)
 
@@ -3,13 +3,13 @@ import time
 from typing import Optional, Union
 
 import numpy as np
-import tiktoken
 from openai import OpenAI
 
 from core.model_runtime.entities.model_entities import PriceType
 from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage, TextEmbeddingResult
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
+from core.model_runtime.model_providers.__base.tokenizers.tokenizer_registry import TokenizerRegistry
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
 
@@ -33,7 +33,7 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = self._get_client(credentials_kwargs)
 
         extra_model_kwargs = {}
         if user:
@@ -50,15 +50,10 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         indices = []
         used_tokens = 0
 
-        try:
-            enc = tiktoken.encoding_for_model(model)
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
+        tokenizer = TokenizerRegistry.get_tiktoken_tokenizer(model)
 
         for i, text in enumerate(texts):
-            token = enc.encode(
-                text
-            )
+            token = tokenizer.encode(text)
             for j in range(0, len(token), context_size):
                 tokens += [token[j: j + context_size]]
                 indices += [i]
@@ -125,18 +120,9 @@ class OpenAITextEmbeddingModel(_CommonOpenAI, TextEmbeddingModel):
         if len(texts) == 0:
             return 0
 
-        try:
-            enc = tiktoken.encoding_for_model(model)
-        except KeyError:
-            enc = tiktoken.get_encoding("cl100k_base")
-
-        total_num_tokens = 0
-        for text in texts:
-            # calculate the number of tokens in the encoded text
-            tokenized_text = enc.encode(text)
-            total_num_tokens += len(tokenized_text)
+        tokenizer = TokenizerRegistry.get_tiktoken_tokenizer(model)
 
-        return total_num_tokens
+        return sum(tokenizer.get_num_tokens_batch(texts))
 
     def validate_credentials(self, model: str, credentials: dict) -> None:
         """
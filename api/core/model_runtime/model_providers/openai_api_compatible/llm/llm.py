@@ -37,6 +37,7 @@ from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.model_providers.openai_api_compatible._common import _CommonOAI_API_Compat
 from core.model_runtime.utils import helper
+from core.model_runtime.utils.http_client_pool import HttpClientPool
 
 logger = logging.getLogger(__name__)
 
@@ -332,7 +333,7 @@ class OAIAPICompatLargeLanguageModel(_CommonOAI_API_Compat, LargeLanguageModel):
         if user:
             data["user"] = user
 
-        response = requests.post(
+        response = HttpClientPool.get_session('openai_api_compatible', endpoint_url).post(
             endpoint_url,
             headers=headers,
             json=data,
@@ -20,6 +20,7 @@ from core.model_runtime.entities.text_embedding_entities import EmbeddingUsage,
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.model_runtime.model_providers.openai_api_compatible._common import _CommonOAI_API_Compat
+from core.model_runtime.utils.http_client_pool import HttpClientPool
 
 
 class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
@@ -95,7 +96,7 @@ class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
             }
 
             # Make the request to the OpenAI API
-            response = requests.post(
+            response = HttpClientPool.get_session('openai_api_compatible', endpoint_url).post(
                 endpoint_url,
                 headers=headers,
                 data=json.dumps(payload),
@@ -136,7 +137,7 @@ class OAICompatEmbeddingModel(_CommonOAI_API_Compat, TextEmbeddingModel):
         :param texts: texts to embed
         :return:
         """
-        return sum(self._get_num_tokens_by_gpt2(text) for text in texts)
+        return sum(self._get_num_tokens_by_gpt2_batch(texts))
 
     def validate_credentials(self, model: str, credentials: dict) -> None:
         """
@@ -2,14 +2,13 @@ from collections.abc import Generator
 from typing import Optional, Union
 from urllib.parse import urlparse
 
-import tiktoken
-
 from core.model_runtime.entities.llm_entities import LLMResult
 from core.model_runtime.entities.message_entities import (
     PromptMessage,
     PromptMessageTool,
     SystemPromptMessage,
 )
+from core.model_runtime.model_providers.__base.tokenizers.tokenizer_registry import TokenizerRegistry
 from core.model_runtime.model_providers.openai.llm.llm import OpenAILargeLanguageModel
 
 
@@ -46,11 +45,11 @@ class YiLargeLanguageModel(OpenAILargeLanguageModel):
         :param tools: tools for tool calling
         :return: number of tokens
         """
-        encoding = tiktoken.get_encoding("cl100k_base")
-        num_tokens = len(encoding.encode(text))
+        tokenizer = TokenizerRegistry.get('cl100k_base')
+        num_tokens = tokenizer.get_num_tokens(text)
 
         if tools:
-            num_tokens += self._num_tokens_for_tools(encoding, tools)
+            num_tokens += self._num_tokens_for_tools(tokenizer, tools)
 
         return num_tokens
 
@@ -61,7 +60,7 @@ class YiLargeLanguageModel(OpenAILargeLanguageModel):
 
         Official documentation: https://github.com/openai/openai-cookbook/blob/
         main/examples/How_to_format_inputs_to_ChatGPT_models.ipynb"""
-        encoding = tiktoken.get_encoding("cl100k_base")
+        tokenizer = TokenizerRegistry.get('cl100k_base')
         tokens_per_message = 3
         tokens_per_name = 1
 
@@ -86,16 +85,16 @@ class YiLargeLanguageModel(OpenAILargeLanguageModel):
                 if key == "tool_calls":
                     for tool_call in value:
                         for t_key, t_value in tool_call.items():
-                            num_tokens += len(encoding.encode(t_key))
+                            num_tokens += tokenizer.get_num_tokens(t_key)
                             if t_key == "function":
                                 for f_key, f_value in t_value.items():
-                                    num_tokens += len(encoding.encode(f_key))
-                                    num_tokens += len(encoding.encode(f_value))
+                                    num_tokens += tokenizer.get_num_tokens(f_key)
+                                    num_tokens += tokenizer.get_num_tokens(f_value)
                             else:
-                                num_tokens += len(encoding.encode(t_key))
-                                num_tokens += len(encoding.encode(t_value))
+                                num_tokens += tokenizer.get_num_tokens(t_key)
+                                num_tokens += tokenizer.get_num_tokens(t_value)
                 else:
-                    num_tokens += len(encoding.encode(str(value)))
+                    num_tokens += tokenizer.get_num_tokens(str(value))
 
                 if key == "name":
                     num_tokens += tokens_per_name
@@ -104,7 +103,7 @@ class YiLargeLanguageModel(OpenAILargeLanguageModel):
         num_tokens += 3
 
         if tools:
-            num_tokens += self._num_tokens_for_tools(encoding, tools)
+            num_tokens += self._num_tokens_for_tools(tokenizer, tools)
 
         return num_tokens
 
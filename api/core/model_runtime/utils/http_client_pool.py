@@ -0,0 +1,125 @@
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, TypeVar
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+T = TypeVar('T')
+
+
+class HttpClientPool:
+    """
+    Process-wide pool of long-lived model provider clients with keep-alive connection pools,
+    keyed by provider and a fingerprint of the client kwargs, like api key and base url,
+    so invocations reuse connections instead of a new connection and TLS handshake per call.
+
+    Clients are evicted when unused for the idle timeout, e.g. after credentials change,
+    or least recently used first when the pool is full.
+    Evicted clients aren't closed, as requests in flight may still use them,
+    their connections are released when they are garbage collected.
+    """
+    MAX_CLIENTS = int(os.environ.get('PROVIDER_HTTP_MAX_CLIENTS', 256))
+    MAX_CONNECTIONS = int(os.environ.get('PROVIDER_HTTP_MAX_CONNECTIONS', 100))
+    MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS', 20))
+    KEEPALIVE_EXPIRY = float(os.environ.get('PROVIDER_HTTP_KEEPALIVE_EXPIRY', 30))
+    CLIENT_IDLE_TIMEOUT = float(os.environ.get('PROVIDER_HTTP_CLIENT_IDLE_TIMEOUT', 600))
+    # http/2 needs the h2 package
+    HTTP2_ENABLED = (os.environ.get('PROVIDER_HTTP2_ENABLED', 'true').lower() == 'true'
+                     and importlib.util.find_spec('h2') is not None)
+
+    _clients: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, provider: str, client_kwargs: dict, factory: Callable[[httpx.Client], T]) -> T:
+        """
+        Get shared provider client, create it if not exists
+
+        :param provider: provider name
+        :param client_kwargs: client kwargs, like: api key, base url and timeout
+        :param factory: creates the client with the given pooled http client
+        :return:
+        """
+        key = (provider, cls.fingerprint(client_kwargs))
+        return cls._get_or_create(key, lambda: factory(cls._create_http_client()))
+
+    @classmethod
+    def get_session(cls, provider: str, url: str) -> requests.Session:
+        """
+        Get shared requests session of provider endpoint host,
+        cookies are not kept, as the session is shared by all credentials of the host
+
+        :param provider: provider name
+        :param url: endpoint url
+        :return:
+        """
+        parsed_url = urlparse(url)
+        key = (provider, 'session', f'{parsed_url.scheme}://{parsed_url.netloc}')
+        return cls._get_or_create(key, cls._create_session)
+
+    @staticmethod
+    def fingerprint(kwargs: dict) -> str:
+        """
+        Fingerprint of client kwargs, credentials are only kept hashed
+
+        :param kwargs: client kwargs
+        :return:
+        """
+        return hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def _get_or_create(cls, key: tuple, factory: Callable[[], T]) -> T:
+        now = time.monotonic()
+        with cls._lock:
+            cached = cls._clients.get(key)
+            if cached:
+                client = cached[1]
+                cls._clients.move_to_end(key)
+            else:
+                client = factory()
+
+            cls._clients[key] = (now, client)
+            cls._evict(now)
+
+        return client
+
+    @classmethod
+    def _evict(cls, now: float) -> None:
+        # least recently used first
+        while cls._clients:
+            key, (last_used_at, _) = next(iter(cls._clients.items()))
+            if len(cls._clients) <= cls.MAX_CLIENTS and now - last_used_at <= cls.CLIENT_IDLE_TIMEOUT:
+                break
+
+            cls._clients.pop(key)
+
+    @classmethod
+    def _create_http_client(cls) -> httpx.Client:
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=cls.MAX_CONNECTIONS,
+                max_keepalive_connections=cls.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=cls.KEEPALIVE_EXPIRY
+            ),
+            http2=cls.HTTP2_ENABLED,
+            follow_redirects=True
+        )
+
+    @classmethod
+    def _create_session(cls) -> requests.Session:
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_maxsize=cls.MAX_KEEPALIVE_CONNECTIONS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
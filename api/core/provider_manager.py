@@ -16,6 +16,8 @@ from core.entities.provider_entities import (
 )
 from core.helper import encrypter
 from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
+from core.helper.provider_usage_accounting import ProviderUsageAccounting
 from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.entities.provider_entities import (
     CredentialFormSchema,
@@ -77,6 +79,23 @@ class ProviderManager:
         - Get provider instance
         - Switch selection priority
 
+        Configurations are cached per tenant in process, until invalidated by changes of credentials,
+        preferred provider types or quotas.
+
+        :param tenant_id:
+        :return:
+        """
+        provider_configurations, version = ProviderConfigurationsCache.get(tenant_id)
+        if provider_configurations is None:
+            provider_configurations = self._build_configurations(tenant_id)
+            ProviderConfigurationsCache.set(tenant_id, version, provider_configurations)
+
+        return provider_configurations
+
+    def _build_configurations(self, tenant_id: str) -> ProviderConfigurations:
+        """
+        Build model provider configurations from provider records of the workspace.
+
         :param tenant_id:
         :return:
         """
@@ -641,12 +660,22 @@ class ProviderManager:
             else:
                 provider_record = quota_type_to_provider_records_dict[provider_quota.quota_type]
 
+                # usage is accounted in redis and flushed to the provider record periodically
+                quota_used = provider_record.quota_used
+                if provider_record.quota_limit != -1:
+                    quota_used = ProviderUsageAccounting.get_quota_used(
+                        tenant_id=tenant_id,
+                        provider_name=provider_record.provider_name,
+                        quota_type=provider_quota.quota_type,
+                        persisted_quota_used=provider_record.quota_used
+                    )
+
                 quota_configuration = QuotaConfiguration(
                     quota_type=provider_quota.quota_type,
                     quota_unit=provider_hosting_configuration.quota_unit,
-                    quota_used=provider_record.quota_used,
+                    quota_used=quota_used,
                     quota_limit=provider_record.quota_limit,
-                    is_valid=provider_record.quota_limit > provider_record.quota_used or provider_record.quota_limit == -1,
+                    is_valid=provider_record.quota_limit > quota_used or provider_record.quota_limit == -1,
                     restrict_models=provider_quota.restrict_models
                 )
 
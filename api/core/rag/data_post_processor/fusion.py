@@ -0,0 +1,87 @@
+from typing import Optional
+
+from core.rag.models.document import Document
+
+
+class FusionRunner:
+    """
+    Fuse ranked result lists of several searches into one list deduplicated by doc_id.
+
+    - rrf: reciprocal rank fusion, sum of 1 / (k + rank) over the lists, uses ranks only,
+      so the scores of different searches need not be comparable. Document scores are kept.
+    - weighted: weighted sum of min-max normalized scores, lists without scores are scored by rank.
+      Document scores are set to the fused score.
+    """
+    METHODS = ['rrf', 'weighted']
+
+    def __init__(self, method: str = 'rrf', rrf_k: int = 60, weights: Optional[list[float]] = None) -> None:
+        if method not in self.METHODS:
+            raise ValueError(f'Fusion method {method} is not supported.')
+
+        self.method = method
+        self.rrf_k = rrf_k
+        self.weights = weights
+
+    def run(self, documents_lists: list[list[Document]], top_n: Optional[int] = None) -> list[Document]:
+        """
+        Run fusion
+        :param documents_lists: ranked documents of each search
+        :param top_n: top n
+        :return: fused documents
+        """
+        weights = self.weights or [1.0] * len(documents_lists)
+
+        scores: dict[str, float] = {}
+        documents: dict[str, Document] = {}
+        for documents_list, weight in zip(documents_lists, weights):
+            if self.method == 'rrf':
+                list_scores = [1 / (self.rrf_k + rank + 1) for rank in range(len(documents_list))]
+            else:
+                list_scores = self._normalize_scores(documents_list)
+
+            seen_doc_ids = set()
+            for document, score in zip(documents_list, list_scores):
+                doc_id = document.metadata['doc_id']
+                # a document listed twice by the same search counts once
+                if doc_id in seen_doc_ids:
+                    continue
+                seen_doc_ids.add(doc_id)
+
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * score
+                if doc_id not in documents:
+                    documents[doc_id] = document
+                elif self.method == 'rrf' and self._get_score(document) > self._get_score(documents[doc_id]):
+                    documents[doc_id] = document
+
+        doc_ids = sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)[:top_n]
+
+        fused_documents = []
+        for doc_id in doc_ids:
+            document = documents[doc_id]
+            if self.method == 'weighted':
+                document = Document(
+                    page_content=document.page_content,
+                    metadata={**document.metadata, 'score': scores[doc_id]}
+                )
+            fused_documents.append(document)
+
+        return fused_documents
+
+    def _normalize_scores(self, documents: list[Document]) -> list[float]:
+        if not documents:
+            return []
+
+        if any(document.metadata.get('score') is None for document in documents):
+            return [(len(documents) - rank) / len(documents) for rank in range(len(documents))]
+
+        scores = [document.metadata['score'] for document in documents]
+        min_score, max_score = min(scores), max(scores)
+        if max_score == min_score:
+            return [1.0] * len(scores)
+
+        return [(score - min_score) / (max_score - min_score) for score in scores]
+
+    @staticmethod
+    def _get_score(document: Document) -> float:
+        score = document.metadata.get('score')
+        return score if score is not None else float('-inf')
@@ -1,9 +1,9 @@
-import json
+import math
 from collections import defaultdict
-from typing import Any, Optional
+from typing import Any
 
-from flask import current_app
 from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert
 
 from core.rag.datasource.keyword.jieba.jieba_keyword_table_handler import JiebaKeywordTableHandler
 from core.rag.datasource.keyword.keyword_base import BaseKeyword
@@ -11,98 +11,97 @@ from core.rag.models.document import Document
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
-from models.dataset import Dataset, DatasetKeywordTable, DocumentSegment
+from models.dataset import Dataset, DatasetKeywordPosting, DocumentSegment
 
 
 class KeywordTableConfig(BaseModel):
     max_keywords_per_chunk: int = 10
+    max_keyword_length: int = 255
 
 
 class Jieba(BaseKeyword):
+    """
+    Jieba keyword index.
+
+    Keywords are stored as an inverted index with one posting row per keyword and segment
+    (dataset_keyword_postings), so indexing and deleting segments only touch the rows of those segments,
+    and search only loads the posting lists of the query keywords.
+    Legacy json keyword tables are moved into postings by the migrate-keyword-postings command.
+    """
+    INSERT_BATCH_SIZE = 1000
+
     def __init__(self, dataset: Dataset):
         super().__init__(dataset)
         self._config = KeywordTableConfig()
 
     def create(self, texts: list[Document], **kwargs) -> BaseKeyword:
-        lock_name = 'keyword_indexing_lock_{}'.format(self.dataset.id)
-        with redis_client.lock(lock_name, timeout=600):
-            keyword_table_handler = JiebaKeywordTableHandler()
-            keyword_table = self._get_dataset_keyword_table()
-            for text in texts:
-                keywords = keyword_table_handler.extract_keywords(text.page_content, self._config.max_keywords_per_chunk)
-                self._update_segment_keywords(self.dataset.id, text.metadata['doc_id'], list(keywords))
-                keyword_table = self._add_text_to_keyword_table(keyword_table, text.metadata['doc_id'], list(keywords))
-
-            self._save_dataset_keyword_table(keyword_table)
+        self.add_texts(texts, **kwargs)
 
-            return self
+        return self
 
     def add_texts(self, texts: list[Document], **kwargs):
-        lock_name = 'keyword_indexing_lock_{}'.format(self.dataset.id)
-        with redis_client.lock(lock_name, timeout=600):
-            keyword_table_handler = JiebaKeywordTableHandler()
-
-            keyword_table = self._get_dataset_keyword_table()
-            keywords_list = kwargs.get('keywords_list', None)
-            for i in range(len(texts)):
-                text = texts[i]
-                if keywords_list:
-                    keywords = keywords_list[i]
-                    if not keywords:
-                        keywords = keyword_table_handler.extract_keywords(text.page_content,
-                                                                          self._config.max_keywords_per_chunk)
-                else:
-                    keywords = keyword_table_handler.extract_keywords(text.page_content, self._config.max_keywords_per_chunk)
-                self._update_segment_keywords(self.dataset.id, text.metadata['doc_id'], list(keywords))
-                keyword_table = self._add_text_to_keyword_table(keyword_table, text.metadata['doc_id'], list(keywords))
-
-            self._save_dataset_keyword_table(keyword_table)
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords_list = kwargs.get('keywords_list', None)
+        node_keywords = {}
+        for i in range(len(texts)):
+            text = texts[i]
+            keywords = keywords_list[i] if keywords_list else None
+            if not keywords:
+                keywords = keyword_table_handler.extract_keywords(text.page_content,
+                                                                  self._config.max_keywords_per_chunk)
+
+            node_keywords[text.metadata['doc_id']] = list(keywords)
+
+        self._update_segments_keywords(node_keywords)
+        self._save_postings(node_keywords)
 
     def text_exists(self, id: str) -> bool:
-        keyword_table = self._get_dataset_keyword_table()
-        return id in set.union(*keyword_table.values())
+        return db.session.query(
+            db.session.query(DatasetKeywordPosting).filter(
+                DatasetKeywordPosting.dataset_id == self.dataset.id,
+                DatasetKeywordPosting.index_node_id == id
+            ).exists()
+        ).scalar()
 
     def delete_by_ids(self, ids: list[str]) -> None:
-        lock_name = 'keyword_indexing_lock_{}'.format(self.dataset.id)
-        with redis_client.lock(lock_name, timeout=600):
-            keyword_table = self._get_dataset_keyword_table()
-            keyword_table = self._delete_ids_from_keyword_table(keyword_table, ids)
+        if not ids:
+            return
 
-            self._save_dataset_keyword_table(keyword_table)
+        db.session.query(DatasetKeywordPosting).filter(
+            DatasetKeywordPosting.dataset_id == self.dataset.id,
+            DatasetKeywordPosting.index_node_id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.session.commit()
 
     def delete_by_document_id(self, document_id: str):
-        lock_name = 'keyword_indexing_lock_{}'.format(self.dataset.id)
-        with redis_client.lock(lock_name, timeout=600):
-            # get segment ids by document_id
-            segments = db.session.query(DocumentSegment).filter(
-                DocumentSegment.dataset_id == self.dataset.id,
-                DocumentSegment.document_id == document_id
-            ).all()
+        # get segment ids by document_id
+        segment_node_ids = db.session.query(DocumentSegment.index_node_id).filter(
+            DocumentSegment.dataset_id == self.dataset.id,
+            DocumentSegment.document_id == document_id
+        ).all()
 
-            ids = [segment.index_node_id for segment in segments]
-
-            keyword_table = self._get_dataset_keyword_table()
-            keyword_table = self._delete_ids_from_keyword_table(keyword_table, ids)
-
-            self._save_dataset_keyword_table(keyword_table)
+        self.delete_by_ids([node_id for node_id, in segment_node_ids if node_id])
 
     def search(
             self, query: str,
             **kwargs: Any
     ) -> list[Document]:
-        keyword_table = self._get_dataset_keyword_table()
-
         k = kwargs.get('top_k', 4)
 
-        sorted_chunk_indices = self._retrieve_ids_by_query(keyword_table, query, k)
+        sorted_chunk_indices = [node_id for node_id, _ in self.search_ids(query, k)]
+        if not sorted_chunk_indices:
+            return []
+
+        # hydrate all hit segments with one query
+        segments = db.session.query(DocumentSegment).filter(
+            DocumentSegment.dataset_id == self.dataset.id,
+            DocumentSegment.index_node_id.in_(sorted_chunk_indices)
+        ).all()
+        segment_map = {segment.index_node_id: segment for segment in segments}
 
         documents = []
         for chunk_index in sorted_chunk_indices:
-            segment = db.session.query(DocumentSegment).filter(
-                DocumentSegment.dataset_id == self.dataset.id,
-                DocumentSegment.index_node_id == chunk_index
-            ).first()
-
+            segment = segment_map.get(chunk_index)
             if segment:
                 documents.append(Document(
                     page_content=segment.content,
@@ -116,149 +115,176 @@ class Jieba(BaseKeyword):
 
         return documents
 
+    def search_ids(self, query: str, k: int = 4) -> list[tuple[str, float]]:
+        """
+        Search index node ids by query, ranked by BM25 score
+        :param query: query
+        :param k: top k
+        :return: list of (index node id, score)
+        """
+        keyword_table_handler = JiebaKeywordTableHandler()
+        keywords = {self._normalize_keyword(keyword) for keyword in keyword_table_handler.extract_keywords(query)}
+        if not keywords:
+            return []
+
+        postings = db.session.query(DatasetKeywordPosting.keyword, DatasetKeywordPosting.index_node_id).filter(
+            DatasetKeywordPosting.dataset_id == self.dataset.id,
+            DatasetKeywordPosting.keyword.in_(keywords)
+        ).all()
+        if not postings:
+            return []
+
+        posting_lists: dict[str, set[str]] = defaultdict(set)
+        for keyword, node_id in postings:
+            posting_lists[keyword].add(node_id)
+
+        total_count = db.session.query(db.func.count(DocumentSegment.id)).filter(
+            DocumentSegment.dataset_id == self.dataset.id
+        ).scalar()
+
+        scores = self._bm25_scores(posting_lists, total_count)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
     def delete(self) -> None:
         lock_name = 'keyword_indexing_lock_{}'.format(self.dataset.id)
         with redis_client.lock(lock_name, timeout=600):
-            dataset_keyword_table = self.dataset.dataset_keyword_table
-            if dataset_keyword_table:
-                db.session.delete(dataset_keyword_table)
-                db.session.commit()
-                if dataset_keyword_table.data_source_type != 'database':
-                    file_key = 'keyword_files/' + self.dataset.tenant_id + '/' + self.dataset.id + '.txt'
-                    storage.delete(file_key)
-
-    def _save_dataset_keyword_table(self, keyword_table):
-        keyword_table_dict = {
-            '__type__': 'keyword_table',
-            '__data__': {
-                "index_id": self.dataset.id,
-                "summary": None,
-                "table": keyword_table
-            }
-        }
-        dataset_keyword_table = self.dataset.dataset_keyword_table
-        keyword_data_source_type = dataset_keyword_table.data_source_type
-        if keyword_data_source_type == 'database':
-            dataset_keyword_table.keyword_table = json.dumps(keyword_table_dict, cls=SetEncoder)
+            self._delete_legacy_keyword_table()
+            db.session.query(DatasetKeywordPosting).filter(
+                DatasetKeywordPosting.dataset_id == self.dataset.id
+            ).delete(synchronize_session=False)
             db.session.commit()
-        else:
-            file_key = 'keyword_files/' + self.dataset.tenant_id + '/' + self.dataset.id + '.txt'
-            if storage.exists(file_key):
-                storage.delete(file_key)
-            storage.save(file_key, json.dumps(keyword_table_dict, cls=SetEncoder).encode('utf-8'))
 
-    def _get_dataset_keyword_table(self) -> Optional[dict]:
-        dataset_keyword_table = self.dataset.dataset_keyword_table
-        if dataset_keyword_table:
-            keyword_table_dict = dataset_keyword_table.keyword_table_dict
-            if keyword_table_dict:
-                return keyword_table_dict['__data__']['table']
-        else:
-            keyword_data_source_type = current_app.config['KEYWORD_DATA_SOURCE_TYPE']
-            dataset_keyword_table = DatasetKeywordTable(
-                dataset_id=self.dataset.id,
-                keyword_table='',
-                data_source_type=keyword_data_source_type,
+    @staticmethod
+    def _bm25_scores(posting_lists: dict[str, set[str]], total_count: int) -> dict[str, float]:
+        """
+        Score index nodes by BM25.
+        Keywords are a capped set per chunk, so term frequency is binary and chunk length is almost constant,
+        which reduces BM25 to the sum of the idf of the matched keywords.
+        :param posting_lists: index node ids by keyword
+        :param total_count: number of indexed chunks of the dataset
+        :return: scores by index node id
+        """
+        total_count = max(total_count, max(len(node_ids) for node_ids in posting_lists.values()))
+        scores: dict[str, float] = defaultdict(float)
+        for node_ids in posting_lists.values():
+            document_frequency = len(node_ids)
+            idf = math.log(1 + (total_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            for node_id in node_ids:
+                scores[node_id] += idf
+
+        return scores
+
+    def _normalize_keyword(self, keyword: str) -> str:
+        return keyword[:self._config.max_keyword_length]
+
+    def _save_postings(self, node_keywords: dict[str, list[str]]) -> None:
+        """
+        Replace postings of index nodes
+        :param node_keywords: keywords by index node id
+        :return:
+        """
+        if not node_keywords:
+            return
+
+        db.session.query(DatasetKeywordPosting).filter(
+            DatasetKeywordPosting.dataset_id == self.dataset.id,
+            DatasetKeywordPosting.index_node_id.in_(list(node_keywords.keys()))
+        ).delete(synchronize_session=False)
+        self._insert_postings(node_keywords)
+        db.session.commit()
+
+    def _insert_postings(self, node_keywords: dict[str, Any]) -> None:
+        postings = []
+        for node_id, keywords in node_keywords.items():
+            for keyword in {self._normalize_keyword(keyword) for keyword in keywords if keyword}:
+                postings.append({
+                    'dataset_id': self.dataset.id,
+                    'keyword': keyword,
+                    'index_node_id': node_id
+                })
+
+        # postings of the same node saved concurrently are not duplicated
+        for i in range(0, len(postings), self.INSERT_BATCH_SIZE):
+            db.session.execute(
+                insert(DatasetKeywordPosting)
+                .values(postings[i:i + self.INSERT_BATCH_SIZE])
+                .on_conflict_do_nothing(constraint='dataset_keyword_posting_unique')
             )
-            if keyword_data_source_type == 'database':
-                dataset_keyword_table.keyword_table = json.dumps({
-                    '__type__': 'keyword_table',
-                    '__data__': {
-                        "index_id": self.dataset.id,
-                        "summary": None,
-                        "table": {}
-                    }
-                }, cls=SetEncoder)
-            db.session.add(dataset_keyword_table)
-            db.session.commit()
 
-        return {}
+    def _update_segments_keywords(self, node_keywords: dict[str, list[str]]) -> None:
+        if not node_keywords:
+            return
 
-    def _add_text_to_keyword_table(self, keyword_table: dict, id: str, keywords: list[str]) -> dict:
-        for keyword in keywords:
-            if keyword not in keyword_table:
-                keyword_table[keyword] = set()
-            keyword_table[keyword].add(id)
-        return keyword_table
+        document_segments = db.session.query(DocumentSegment).filter(
+            DocumentSegment.dataset_id == self.dataset.id,
+            DocumentSegment.index_node_id.in_(list(node_keywords.keys()))
+        ).all()
+        for document_segment in document_segments:
+            document_segment.keywords = node_keywords[document_segment.index_node_id]
 
-    def _delete_ids_from_keyword_table(self, keyword_table: dict, ids: list[str]) -> dict:
-        # get set of ids that correspond to node
-        node_idxs_to_delete = set(ids)
+        db.session.commit()
 
-        # delete node_idxs from keyword to node idxs mapping
-        keywords_to_delete = set()
-        for keyword, node_idxs in keyword_table.items():
-            if node_idxs_to_delete.intersection(node_idxs):
-                keyword_table[keyword] = node_idxs.difference(
-                    node_idxs_to_delete
-                )
-                if not keyword_table[keyword]:
-                    keywords_to_delete.add(keyword)
+    def migrate_legacy_keyword_table(self) -> int:
+        """
+        Move the legacy json keyword table of the dataset, if any, into postings.
+        :return: number of migrated index nodes
+        """
+        lock_name = 'keyword_indexing_lock_{}'.format(self.dataset.id)
+        with redis_client.lock(lock_name, timeout=600):
+            dataset_keyword_table = self.dataset.dataset_keyword_table
+            if not dataset_keyword_table:
+                return 0
 
-        for keyword in keywords_to_delete:
-            del keyword_table[keyword]
+            keyword_table_dict = dataset_keyword_table.keyword_table_dict
+            keyword_table = keyword_table_dict['__data__']['table'] if keyword_table_dict else {}
+
+            node_keywords = defaultdict(set)
+            for keyword, node_ids in keyword_table.items():
+                for node_id in node_ids:
+                    node_keywords[node_id].add(keyword)
+
+            # postings written after the table was loaded win over the legacy ones
+            existing_node_ids = {node_id for node_id, in db.session.query(
+                DatasetKeywordPosting.index_node_id
+            ).filter(DatasetKeywordPosting.dataset_id == self.dataset.id).distinct().all()}
+            node_keywords = {
+                node_id: keywords
+                for node_id, keywords in node_keywords.items() if node_id not in existing_node_ids
+            }
+            self._insert_postings(node_keywords)
+            self._delete_legacy_keyword_table()
 
-        return keyword_table
+        return len(node_keywords)
 
-    def _retrieve_ids_by_query(self, keyword_table: dict, query: str, k: int = 4):
-        keyword_table_handler = JiebaKeywordTableHandler()
-        keywords = keyword_table_handler.extract_keywords(query)
-
-        # go through text chunks in order of most matching keywords
-        chunk_indices_count: dict[str, int] = defaultdict(int)
-        keywords = [keyword for keyword in keywords if keyword in set(keyword_table.keys())]
-        for keyword in keywords:
-            for node_id in keyword_table[keyword]:
-                chunk_indices_count[node_id] += 1
-
-        sorted_chunk_indices = sorted(
-            list(chunk_indices_count.keys()),
-            key=lambda x: chunk_indices_count[x],
-            reverse=True,
-        )
-
-        return sorted_chunk_indices[: k]
-
-    def _update_segment_keywords(self, dataset_id: str, node_id: str, keywords: list[str]):
-        document_segment = db.session.query(DocumentSegment).filter(
-            DocumentSegment.dataset_id == dataset_id,
-            DocumentSegment.index_node_id == node_id
-        ).first()
-        if document_segment:
-            document_segment.keywords = keywords
-            db.session.add(document_segment)
+    def _delete_legacy_keyword_table(self) -> None:
+        dataset_keyword_table = self.dataset.dataset_keyword_table
+        if dataset_keyword_table:
+            db.session.delete(dataset_keyword_table)
             db.session.commit()
+            if dataset_keyword_table.data_source_type != 'database':
+                file_key = 'keyword_files/' + self.dataset.tenant_id + '/' + self.dataset.id + '.txt'
+                storage.delete(file_key)
 
     def create_segment_keywords(self, node_id: str, keywords: list[str]):
-        keyword_table = self._get_dataset_keyword_table()
-        self._update_segment_keywords(self.dataset.id, node_id, keywords)
-        keyword_table = self._add_text_to_keyword_table(keyword_table, node_id, keywords)
-        self._save_dataset_keyword_table(keyword_table)
+        self._update_segments_keywords({node_id: keywords})
+        self.update_segment_keywords_index(node_id, keywords)
 
     def multi_create_segment_keywords(self, pre_segment_data_list: list):
         keyword_table_handler = JiebaKeywordTableHandler()
-        keyword_table = self._get_dataset_keyword_table()
+        node_keywords = {}
         for pre_segment_data in pre_segment_data_list:
             segment = pre_segment_data['segment']
             if pre_segment_data['keywords']:
                 segment.keywords = pre_segment_data['keywords']
-                keyword_table = self._add_text_to_keyword_table(keyword_table, segment.index_node_id,
-                                                                pre_segment_data['keywords'])
             else:
                 keywords = keyword_table_handler.extract_keywords(segment.content,
                                                                   self._config.max_keywords_per_chunk)
                 segment.keywords = list(keywords)
-                keyword_table = self._add_text_to_keyword_table(keyword_table, segment.index_node_id, list(keywords))
-        self._save_dataset_keyword_table(keyword_table)
 
-    def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
-        keyword_table = self._get_dataset_keyword_table()
-        keyword_table = self._add_text_to_keyword_table(keyword_table, node_id, keywords)
-        self._save_dataset_keyword_table(keyword_table)
+            node_keywords[segment.index_node_id] = segment.keywords
 
+        self._save_postings(node_keywords)
 
-class SetEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, set):
-            return list(obj)
-        return super().default(obj)
+    def update_segment_keywords_index(self, node_id: str, keywords: list[str]):
+        self._save_postings({node_id: keywords})
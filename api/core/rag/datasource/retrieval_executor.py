@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Optional
+
+from flask import Flask, current_app
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalExecutor:
+    """
+    Process-wide bounded executor of retrieval tasks, like the searches of a dataset
+    and the datasets of a multi dataset query.
+
+    A task only goes to the pool if a worker is free, otherwise it runs in the calling thread,
+    which bounds the number of threads and slows down callers when the pool is busy.
+    Nested fan-out can't deadlock, as no submitted task ever waits in a queue.
+    Tasks which don't complete before the deadline are abandoned, their results are discarded,
+    tasks left to the calling thread aren't started after the deadline.
+    """
+    _executor: Optional[ThreadPoolExecutor] = None
+    _semaphore: Optional[threading.BoundedSemaphore] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def run(cls, tasks: list[tuple[str, Callable[..., Any], dict]], timeout: Optional[float] = None) -> list[Any]:
+        """
+        Run tasks concurrently
+        :param tasks: tasks of (name, function, kwargs), the function runs in an app context
+        :param timeout: seconds to wait for all tasks, RETRIEVAL_TIMEOUT by default
+        :return: results in the order of tasks, None for failed or timed out tasks
+        """
+        if timeout is None:
+            timeout = current_app.config['RETRIEVAL_TIMEOUT']
+        deadline = time.monotonic() + timeout
+
+        flask_app = current_app._get_current_object()
+        executor, semaphore = cls._get_executor(flask_app)
+
+        results = [None] * len(tasks)
+        futures: dict[Future, int] = {}
+        inline_task_indices = []
+        for i, (name, func, kwargs) in enumerate(tasks):
+            if not cls._submit(executor, semaphore, flask_app, futures, i, tasks[i]):
+                inline_task_indices.append(i)
+
+        # no free worker, run in the calling thread, which is already in an app context,
+        # unless a worker got free meanwhile or the deadline passed
+        for i in inline_task_indices:
+            name, func, kwargs = tasks[i]
+            if time.monotonic() >= deadline:
+                logger.warning(f'Retrieval {name} timed out after {timeout}s, not started')
+            elif not cls._submit(executor, semaphore, flask_app, futures, i, tasks[i]):
+                results[i] = cls._run_task(None, name, func, kwargs)
+
+        wait(futures, timeout=max(deadline - time.monotonic(), 0))
+        # results of tasks done by now are kept, even if the deadline passed
+        for future, i in futures.items():
+            if not future.done():
+                future.cancel()
+                logger.warning(f'Retrieval {tasks[i][0]} timed out after {timeout}s')
+            elif not future.cancelled() and future.exception() is not None:
+                logger.error(f'Retrieval {tasks[i][0]} failed', exc_info=future.exception())
+            elif not future.cancelled():
+                results[i] = future.result()
+
+        return results
+
+    @classmethod
+    def _submit(cls, executor: ThreadPoolExecutor, semaphore: threading.BoundedSemaphore, flask_app: Flask,
+                futures: dict[Future, int], index: int, task: tuple[str, Callable[..., Any], dict]) -> bool:
+        """
+        Submit task to the pool if a worker is free
+        :return: whether the task is submitted
+        """
+        if not semaphore.acquire(blocking=False):
+            return False
+
+        name, func, kwargs = task
+        future = executor.submit(cls._run_task, flask_app, name, func, kwargs)
+        future.add_done_callback(lambda _: semaphore.release())
+        futures[future] = index
+
+        return True
+
+    @classmethod
+    def _get_executor(cls, flask_app: Flask) -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    max_workers = flask_app.config['RETRIEVAL_MAX_WORKERS']
+                    cls._semaphore = threading.BoundedSemaphore(max_workers)
+                    cls._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='retrieval')
+
+        return cls._executor, cls._semaphore
+
+    @staticmethod
+    def _run_task(flask_app: Optional[Flask], name: str, func: Callable[..., Any], kwargs: dict) -> Any:
+        start_at = time.perf_counter()
+        try:
+            with flask_app.app_context() if flask_app else nullcontext():
+                return func(**kwargs)
+        except Exception:
+            logger.exception(f'Retrieval {name} failed')
+            return None
+        finally:
+            logger.info(f'Retrieval {name} took {time.perf_counter() - start_at:.3f}s')
@@ -1,14 +1,17 @@
 import logging
-import threading
 from typing import Optional
 
-from flask import Flask, current_app
+from flask import current_app
 
 from core.rag.data_post_processor.data_post_processor import DataPostProcessor
+from core.rag.data_post_processor.fusion import FusionRunner
 from core.rag.datasource.keyword.keyword_factory import Keyword
+from core.rag.datasource.retrieval_executor import RetrievalExecutor
 from core.rag.datasource.vdb.vector_factory import Vector
+from core.rag.models.document import Document
 from extensions.ext_database import db
-from models.dataset import Dataset
+from models.dataset import Dataset, DocumentSegment
+from models.dataset import Document as DatasetDocument
 
 logger = logging.getLogger(__name__)
 
@@ -34,150 +37,224 @@ class RetrievalService:
         ).first()
         if not dataset or dataset.available_document_count == 0 or dataset.available_segment_count == 0:
             return []
-        all_documents = []
-        threads = []
+        # hybrid search fetches more results from each search, fused after both complete
+        is_hybrid_search = retrival_method == 'hybrid_search'
+        search_top_k = top_k * current_app.config['HYBRID_SEARCH_OVERSAMPLE_FACTOR'] if is_hybrid_search else top_k
+        tasks = []
         # retrieval_model source with keyword
         if retrival_method == 'keyword_search':
-            keyword_thread = threading.Thread(target=RetrievalService.keyword_search, kwargs={
-                'flask_app': current_app._get_current_object(),
-                'dataset_id': dataset_id,
+            tasks.append((f'keyword_search:{dataset_id}', cls.keyword_search, {
+                'dataset': dataset,
                 'query': query,
-                'top_k': top_k,
-                'all_documents': all_documents
-            })
-            threads.append(keyword_thread)
-            keyword_thread.start()
+                'top_k': top_k
+            }))
         # retrieval_model source with semantic
-        if retrival_method == 'semantic_search' or retrival_method == 'hybrid_search':
-            embedding_thread = threading.Thread(target=RetrievalService.embedding_search, kwargs={
-                'flask_app': current_app._get_current_object(),
-                'dataset_id': dataset_id,
+        if retrival_method == 'semantic_search' or is_hybrid_search:
+            tasks.append((f'embedding_search:{dataset_id}', cls.embedding_search, {
+                'dataset': dataset,
                 'query': query,
-                'top_k': top_k,
+                'top_k': search_top_k,
                 'score_threshold': score_threshold,
                 'reranking_model': reranking_model,
-                'all_documents': all_documents,
                 'retrival_method': retrival_method
-            })
-            threads.append(embedding_thread)
-            embedding_thread.start()
+            }))
 
         # retrieval source with full text
-        if retrival_method == 'full_text_search' or retrival_method == 'hybrid_search':
-            full_text_index_thread = threading.Thread(target=RetrievalService.full_text_index_search, kwargs={
-                'flask_app': current_app._get_current_object(),
-                'dataset_id': dataset_id,
+        if retrival_method == 'full_text_search' or is_hybrid_search:
+            tasks.append((f'full_text_search:{dataset_id}', cls.full_text_index_search, {
+                'dataset': dataset,
                 'query': query,
                 'retrival_method': retrival_method,
                 'score_threshold': score_threshold,
-                'top_k': top_k,     # TODO(chiyu): should be larger, cannot be the same as reranker topk
-                'reranking_model': reranking_model,
-                'all_documents': all_documents
-            })
-            threads.append(full_text_index_thread)
-            full_text_index_thread.start()
-
-        for thread in threads:
-            thread.join()
-
-        # TODO(chiyu): recover after fix rerank concurrent bug
-        # if retrival_method == 'hybrid_search':
-        #     data_post_processor = DataPostProcessor(str(dataset.tenant_id), reranking_model, False)
-        #     all_documents = data_post_processor.invoke(
-        #         query=query,
-        #         documents=all_documents,
-        #         score_threshold=score_threshold,
-        #         top_n=top_k
-        #     )
+                'top_k': search_top_k,
+                'reranking_model': reranking_model
+            }))
+
+        documents_lists = [documents or [] for documents in RetrievalExecutor.run(tasks)]
+        all_documents = [document for documents in documents_lists for document in documents]
+
+        if is_hybrid_search:
+            all_documents = cls.fuse_hybrid_search_documents(
+                tenant_id=dataset.tenant_id,
+                query=query,
+                documents_lists=documents_lists,
+                top_k=top_k,
+                score_threshold=score_threshold,
+                reranking_model=reranking_model
+            )
         logger.info(f"Final retrieved results for dataset {dataset_id}: {len(all_documents)}")
-        # for doc in all_documents:
-        #     logger.info(doc)
         return all_documents
 
     @classmethod
-    def keyword_search(cls, flask_app: Flask, dataset_id: str, query: str,
-                       top_k: int, all_documents: list):
-        with flask_app.app_context():
-            dataset = db.session.query(Dataset).filter(
-                Dataset.id == dataset_id
-            ).first()
-
-            keyword = Keyword(
-                dataset=dataset
-            )
+    def fuse_hybrid_search_documents(cls, tenant_id: str, query: str, documents_lists: list[list[Document]],
+                                     top_k: int, score_threshold: Optional[float] = None,
+                                     reranking_model: Optional[dict] = None) -> list[Document]:
+        """
+        Fuse semantic and full text search results, deduplicated by doc_id,
+        only the fused candidates are reranked if a reranking model is set
+        :param tenant_id: tenant id
+        :param query: search query
+        :param documents_lists: semantic search documents, full text search documents
+        :param top_k: top k
+        :param score_threshold: rerank score threshold
+        :param reranking_model: reranking model
+        :return:
+        """
+        config = current_app.config
+        semantic_weight = config['HYBRID_SEARCH_SEMANTIC_WEIGHT']
+        fusion_runner = FusionRunner(
+            method=config['HYBRID_SEARCH_FUSION_METHOD'],
+            rrf_k=config['HYBRID_SEARCH_RRF_K'],
+            weights=[semantic_weight, 1 - semantic_weight]
+        )
 
-            documents = keyword.search(
-                query,
-                top_k=top_k
-            )
-            all_documents.extend(documents)
+        if not reranking_model:
+            return fusion_runner.run(documents_lists, top_n=top_k)
+
+        documents = fusion_runner.run(documents_lists, top_n=top_k * config['HYBRID_SEARCH_OVERSAMPLE_FACTOR'])
+        data_post_processor = DataPostProcessor(str(tenant_id), reranking_model, False)
+        return data_post_processor.invoke(
+            query=query,
+            documents=documents,
+            score_threshold=score_threshold,
+            top_n=top_k
+        )[:top_k]
 
     @classmethod
-    def embedding_search(cls, flask_app: Flask, dataset_id: str, query: str,
-                         top_k: int, score_threshold: Optional[float], reranking_model: Optional[dict],
-                         all_documents: list, retrival_method: str):
-        with flask_app.app_context():
-            dataset = db.session.query(Dataset).filter(
-                Dataset.id == dataset_id
-            ).first()
-
-            vector = Vector(
-                dataset=dataset
-            )
+    def keyword_search(cls, dataset: Dataset, query: str, top_k: int) -> list[Document]:
+        dataset = cls._merge_dataset(dataset)
 
-            documents = vector.search_by_vector(
-                query,
-                search_type='similarity_score_threshold',
-                top_k=top_k,
+        keyword = Keyword(
+            dataset=dataset
+        )
+
+        return keyword.search(
+            query,
+            top_k=top_k
+        )
+
+    @classmethod
+    def embedding_search(cls, dataset: Dataset, query: str, top_k: int, score_threshold: Optional[float],
+                         reranking_model: Optional[dict], retrival_method: str) -> list[Document]:
+        dataset = cls._merge_dataset(dataset)
+
+        vector = Vector(
+            dataset=dataset
+        )
+
+        documents = vector.search_by_vector(
+            query,
+            search_type='similarity_score_threshold',
+            top_k=top_k,
+            score_threshold=score_threshold,
+            filter={
+                'group_id': [dataset.id]
+            }
+        )
+        logger.info(f"Embedding search for dataset {dataset.id}: {len(documents)}")
+
+        if documents and reranking_model and retrival_method == 'semantic_search':
+            data_post_processor = DataPostProcessor(str(dataset.tenant_id), reranking_model, False)
+            return data_post_processor.invoke(
+                query=query,
+                documents=documents,
                 score_threshold=score_threshold,
-                filter={
-                    'group_id': [dataset.id]
-                }
+                top_n=len(documents)
             )
 
-            if documents:
-                if reranking_model and retrival_method == 'semantic_search':
-                    data_post_processor = DataPostProcessor(str(dataset.tenant_id), reranking_model, False)
-                    all_documents.extend(data_post_processor.invoke(
-                        query=query,
-                        documents=documents,
-                        score_threshold=score_threshold,
-                        top_n=len(documents)
-                    ))
-                else:
-                    all_documents.extend(documents)
-            logger.info(f"Embedding search for dataset {dataset_id}: {len(documents)}")
-            # for idx, document in enumerate(documents):
-            #     logging.info(f"Embedding search for dataset {dataset_id}, doc {idx}: {document.metadata['score']}, {document.page_content}, {document.metadata['doc_id']}")
+        return documents
 
     @classmethod
-    def full_text_index_search(cls, flask_app: Flask, dataset_id: str, query: str,
-                               top_k: int, score_threshold: Optional[float], reranking_model: Optional[dict],
-                               all_documents: list, retrival_method: str):
-        with flask_app.app_context():
-            dataset = db.session.query(Dataset).filter(
-                Dataset.id == dataset_id
-            ).first()
-
-            vector_processor = Vector(
-                dataset=dataset,
-            )
+    def full_text_index_search(cls, dataset: Dataset, query: str, top_k: int, score_threshold: Optional[float],
+                               reranking_model: Optional[dict], retrival_method: str) -> list[Document]:
+        dataset = cls._merge_dataset(dataset)
+
+        vector_processor = Vector(
+            dataset=dataset,
+        )
 
-            documents = vector_processor.search_by_full_text(
-                query,
-                top_k=top_k
+        documents = vector_processor.search_by_full_text(
+            query,
+            top_k=top_k
+        )
+        logger.info(f"Text search for dataset {dataset.id}: {len(documents)}")
+
+        if documents and reranking_model and retrival_method == 'full_text_search':
+            data_post_processor = DataPostProcessor(str(dataset.tenant_id), reranking_model, False)
+            return data_post_processor.invoke(
+                query=query,
+                documents=documents,
+                score_threshold=score_threshold,
+                top_n=len(documents)
             )
-            if documents:
-                if reranking_model and retrival_method == 'full_text_search':
-                    data_post_processor = DataPostProcessor(str(dataset.tenant_id), reranking_model, False)
-                    all_documents.extend(data_post_processor.invoke(
-                        query=query,
-                        documents=documents,
-                        score_threshold=score_threshold,
-                        top_n=len(documents)
-                    ))
-                else:
-                    all_documents.extend(documents)
-            logger.info(f"Text search for dataset {dataset_id}: {len(documents)}")
-            # for idx, document in enumerate(documents):
-            #     logger.info(f"Text search for dataset {dataset_id}, doc {idx}: {document.page_content}, {document.metadata['doc_id']}")
+
+        return documents
+
+    @classmethod
+    def fetch_segments(cls, dataset_ids: list[str], documents: list[Document]) -> list[DocumentSegment]:
+        """
+        Fetch available segments of retrieved documents with one query
+        :param dataset_ids: dataset ids
+        :param documents: retrieved documents
+        :return: segments in the order of documents
+        """
+        index_node_ids = [document.metadata['doc_id'] for document in documents]
+        if not dataset_ids or not index_node_ids:
+            return []
+
+        segments = db.session.query(DocumentSegment).filter(
+            DocumentSegment.dataset_id.in_(dataset_ids),
+            DocumentSegment.completed_at.isnot(None),
+            DocumentSegment.status == 'completed',
+            DocumentSegment.enabled == True,
+            DocumentSegment.index_node_id.in_(index_node_ids)
+        ).all()
+
+        index_node_id_to_position = {id: position for position, id in enumerate(index_node_ids)}
+        return sorted(segments,
+                      key=lambda segment: index_node_id_to_position.get(segment.index_node_id, float('inf')))
+
+    @classmethod
+    def fetch_segment_sources(cls, segments: list[DocumentSegment]) \
+            -> tuple[dict[str, Dataset], dict[str, DatasetDocument]]:
+        """
+        Fetch datasets and available documents of segments with one query each
+        :param segments: segments
+        :return: datasets by id, documents by id
+        """
+        if not segments:
+            return {}, {}
+
+        dataset_ids = {segment.dataset_id for segment in segments}
+        datasets = db.session.query(Dataset).filter(Dataset.id.in_(dataset_ids)).all()
+
+        return {dataset.id: dataset for dataset in datasets}, cls.fetch_segment_documents(segments)
+
+    @classmethod
+    def fetch_segment_documents(cls, segments: list[DocumentSegment]) -> dict[str, DatasetDocument]:
+        """
+        Fetch available documents of segments with one query, for callers that already have the datasets
+        :param segments: segments
+        :return: documents by id
+        """
+        if not segments:
+            return {}
+
+        document_ids = {segment.document_id for segment in segments}
+        documents = db.session.query(DatasetDocument).filter(
+            DatasetDocument.id.in_(document_ids),
+            DatasetDocument.enabled == True,
+            DatasetDocument.archived == False,
+        ).all()
+
+        return {document.id: document for document in documents}
+
+    @classmethod
+    def _merge_dataset(cls, dataset: Dataset) -> Dataset:
+        """
+        Attach the dataset loaded by the calling thread to the session of the current app context
+        without querying it again
+        :param dataset: dataset
+        :return:
+        """
+        return db.session.merge(dataset, load=False)
@@ -7,6 +7,7 @@ from pymilvus import MilvusClient, MilvusException, connections
 
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_pool import VectorClientPool
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 
@@ -50,7 +51,10 @@ class MilvusVector(BaseVector):
     def __init__(self, collection_name: str, config: MilvusConfig):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = self._init_client(config)
+        self._client = VectorClientPool.get_client(
+            ('milvus', config.host, config.port, config.user, config.password, config.secure, config.database),
+            lambda: self._init_client(config)
+        )
         self._consistency_level = 'Session'
         self._fields = []
 
@@ -110,12 +114,7 @@ class MilvusVector(BaseVector):
             return None
 
     def delete_by_metadata_field(self, key: str, value: str):
-        alias = uuid4().hex
-        if self._client_config.secure:
-            uri = "https://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-        else:
-            uri = "http://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-        connections.connect(alias=alias, uri=uri, user=self._client_config.user, password=self._client_config.password)
+        alias = self._get_connection_alias()
 
         from pymilvus import utility
         if utility.has_collection(self._collection_name, using=alias):
@@ -125,12 +124,7 @@ class MilvusVector(BaseVector):
                 self._client.delete(collection_name=self._collection_name, pks=ids)
 
     def delete_by_ids(self, ids: list[str]) -> None:
-        alias = uuid4().hex
-        if self._client_config.secure:
-            uri = "https://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-        else:
-            uri = "http://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-        connections.connect(alias=alias, uri=uri, user=self._client_config.user, password=self._client_config.password)
+        alias = self._get_connection_alias()
 
         from pymilvus import utility
         if utility.has_collection(self._collection_name, using=alias):
@@ -143,26 +137,17 @@ class MilvusVector(BaseVector):
                 self._client.delete(collection_name=self._collection_name, pks=ids)
 
     def delete(self) -> None:
-        alias = uuid4().hex
-        if self._client_config.secure:
-            uri = "https://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-        else:
-            uri = "http://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-        connections.connect(alias=alias, uri=uri, user=self._client_config.user, password=self._client_config.password,
-                            db_name=self._client_config.database)
+        alias = self._get_connection_alias()
 
         from pymilvus import utility
         if utility.has_collection(self._collection_name, using=alias):
             utility.drop_collection(self._collection_name, None, using=alias)
 
+        redis_client.delete('vector_indexing_{}'.format(self._collection_name))
+        VectorClientPool.remove_collection_exist(self._collection_name)
+
     def text_exists(self, id: str) -> bool:
-        alias = uuid4().hex
-        if self._client_config.secure:
-            uri = "https://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-        else:
-            uri = "http://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-        connections.connect(alias=alias, uri=uri, user=self._client_config.user, password=self._client_config.password,
-                            db_name=self._client_config.database)
+        alias = self._get_connection_alias()
 
         from pymilvus import utility
         if not utility.has_collection(self._collection_name, using=alias):
@@ -174,6 +159,22 @@ class MilvusVector(BaseVector):
 
         return len(result) > 0
 
+    def exists_many(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+
+        alias = self._get_connection_alias()
+
+        from pymilvus import utility
+        if not utility.has_collection(self._collection_name, using=alias):
+            return set()
+
+        result = self._client.query(collection_name=self._collection_name,
+                                    filter=f'metadata["doc_id"] in {ids}',
+                                    output_fields=[Field.METADATA_KEY.value])
+
+        return {item[Field.METADATA_KEY.value]['doc_id'] for item in result}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
 
         # Set search parameters.
@@ -201,20 +202,18 @@ class MilvusVector(BaseVector):
     def create_collection(
             self, embeddings: list, metadatas: Optional[list[dict]] = None, index_params: Optional[dict] = None
     ):
+        if VectorClientPool.is_collection_exist(self._collection_name):
+            return
+
         lock_name = 'vector_indexing_lock_{}'.format(self._collection_name)
         with redis_client.lock(lock_name, timeout=20):
             collection_exist_cache_key = 'vector_indexing_{}'.format(self._collection_name)
             if redis_client.get(collection_exist_cache_key):
+                VectorClientPool.set_collection_exist(self._collection_name)
                 return
             # Grab the existing collection if it exists
             from pymilvus import utility
-            alias = uuid4().hex
-            if self._client_config.secure:
-                uri = "https://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-            else:
-                uri = "http://" + str(self._client_config.host) + ":" + str(self._client_config.port)
-            connections.connect(alias=alias, uri=uri, user=self._client_config.user,
-                                password=self._client_config.password, db_name=self._client_config.database)
+            alias = self._get_connection_alias()
             if not utility.has_collection(self._collection_name, using=alias):
                 from pymilvus import CollectionSchema, DataType, FieldSchema
                 from pymilvus.orm.types import infer_dtype_bydata
@@ -254,6 +253,32 @@ class MilvusVector(BaseVector):
                                                            schema=schema, index_param=index_params,
                                                            consistency_level=self._consistency_level)
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
+            VectorClientPool.set_collection_exist(self._collection_name)
+
+    def _get_connection_alias(self) -> str:
+        """
+        Get the alias of the shared orm connection, used by pymilvus utility
+        :return:
+        """
+        config = self._client_config
+        return VectorClientPool.get_client(
+            ('milvus_connection', config.host, config.port, config.user, config.password, config.secure,
+             config.database),
+            lambda: self._connect(config),
+            health_check=lambda alias: connections.has_connection(alias)
+        )
+
+    @staticmethod
+    def _connect(config: MilvusConfig) -> str:
+        alias = uuid4().hex
+        if config.secure:
+            uri = "https://" + str(config.host) + ":" + str(config.port)
+        else:
+            uri = "http://" + str(config.host) + ":" + str(config.port)
+        connections.connect(alias=alias, uri=uri, user=config.user, password=config.password,
+                            db_name=config.database)
+        return alias
+
     def _init_client(self, config) -> MilvusClient:
         if config.secure:
             uri = "https://" + str(config.host) + ":" + str(config.port)
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from core.rag.datasource.vdb.pgvecto_rs.collection import CollectionORM
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_pool import VectorClientPool
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 
@@ -46,12 +47,25 @@ class PGVectoRS(BaseVector):
         super().__init__(collection_name)
         self._client_config = config
         self._url = f"postgresql+psycopg2://{config.user}:{config.password}@{config.host}:{config.port}/{config.database}"
-        self._client = create_engine(self._url)
-        with Session(self._client) as session:
+        self._client = VectorClientPool.get_client(('pgvecto_rs', self._url), lambda: self._init_client(self._url))
+        self._fields = []
+        self._table = VectorClientPool.get_client(
+            ('pgvecto_rs_table', self._url, collection_name, dim),
+            lambda: self._init_table(collection_name, dim)
+        )
+        self._distance_op = "<=>"
+
+    @staticmethod
+    def _init_client(url: str):
+        client = create_engine(url, pool_pre_ping=True)
+        with Session(client) as session:
             session.execute(text("CREATE EXTENSION IF NOT EXISTS vectors"))
             session.commit()
-        self._fields = []
 
+        return client
+
+    @staticmethod
+    def _init_table(collection_name: str, dim: int) -> type[CollectionORM]:
         class _Table(CollectionORM):
             __tablename__ = collection_name
             __table_args__ = {"extend_existing": True}  # noqa: RUF012
@@ -63,8 +77,7 @@ class PGVectoRS(BaseVector):
             meta: Mapped[dict] = mapped_column(postgresql.JSONB)
             vector: Mapped[ndarray] = mapped_column(Vector(dim))
 
-        self._table = _Table
-        self._distance_op = "<=>"
+        return _Table
 
     def get_type(self) -> str:
         return 'pgvecto-rs'
@@ -74,10 +87,14 @@ class PGVectoRS(BaseVector):
         self.add_texts(texts, embeddings)
 
     def create_collection(self, dimension: int):
+        if VectorClientPool.is_collection_exist(self._collection_name):
+            return
+
         lock_name = 'vector_indexing_lock_{}'.format(self._collection_name)
         with redis_client.lock(lock_name, timeout=20):
             collection_exist_cache_key = 'vector_indexing_{}'.format(self._collection_name)
             if redis_client.get(collection_exist_cache_key):
+                VectorClientPool.set_collection_exist(self._collection_name)
                 return
             index_name = f"{self._collection_name}_embedding_index"
             with Session(self._client) as session:
@@ -105,6 +122,7 @@ class PGVectoRS(BaseVector):
                 session.execute(index_statement)
                 session.commit()
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
+            VectorClientPool.set_collection_exist(self._collection_name)
 
     def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
         pks = []
@@ -154,24 +172,24 @@ class PGVectoRS(BaseVector):
                 session.commit()
 
     def delete_by_ids(self, ids: list[str]) -> None:
+        if not ids:
+            return
+
         with Session(self._client) as session:
-            select_statement = sql_text(
-                f"SELECT id FROM {self._collection_name} WHERE meta->>'doc_id' = ANY (:doc_ids); "
+            delete_statement = sql_text(
+                f"DELETE FROM {self._collection_name} WHERE meta->>'doc_id' = ANY (:doc_ids); "
             )
-            result = session.execute(select_statement, {'doc_ids': ids}).fetchall()
-        if result:
-            ids = [item[0] for item in result]
-            if ids:
-                with Session(self._client) as session:
-                    select_statement = sql_text(f"DELETE FROM {self._collection_name} WHERE id = ANY(:ids)")
-                    session.execute(select_statement, {'ids': ids})
-                    session.commit()
+            session.execute(delete_statement, {'doc_ids': ids})
+            session.commit()
 
     def delete(self) -> None:
         with Session(self._client) as session:
             session.execute(sql_text(f"DROP TABLE IF EXISTS {self._collection_name}"))
             session.commit()
 
+        redis_client.delete('vector_indexing_{}'.format(self._collection_name))
+        VectorClientPool.remove_collection_exist(self._collection_name)
+
     def text_exists(self, id: str) -> bool:
         with Session(self._client) as session:
             select_statement = sql_text(
@@ -180,6 +198,17 @@ class PGVectoRS(BaseVector):
             result = session.execute(select_statement).fetchall()
         return len(result) > 0
 
+    def exists_many(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+
+        with Session(self._client) as session:
+            select_statement = sql_text(
+                f"SELECT meta->>'doc_id' FROM {self._collection_name} WHERE meta->>'doc_id' = ANY (:doc_ids); "
+            )
+            result = session.execute(select_statement, {'doc_ids': ids}).fetchall()
+        return {item[0] for item in result}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         with Session(self._client) as session:
             stmt = (
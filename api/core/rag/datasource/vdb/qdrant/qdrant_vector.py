@@ -19,6 +19,7 @@ from qdrant_client.local.qdrant_local import QdrantLocal
 
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_pool import VectorClientPool
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 
@@ -64,7 +65,12 @@ class QdrantVector(BaseVector):
     def __init__(self, collection_name: str, group_id: str, config: QdrantConfig, distance_func: str = 'Cosine'):
         super().__init__(collection_name)
         self._client_config = config
-        self._client = qdrant_client.QdrantClient(**self._client_config.to_qdrant_params())
+        client_params = self._client_config.to_qdrant_params()
+        self._client = VectorClientPool.get_client(
+            ('qdrant', *sorted(client_params.items())),
+            lambda: qdrant_client.QdrantClient(**client_params),
+            health_check=lambda client: client.get_collections() is not None
+        )
         self._distance_func = distance_func.upper()
         self._group_id = group_id
 
@@ -89,10 +95,14 @@ class QdrantVector(BaseVector):
             self.add_texts(texts, embeddings, **kwargs)
 
     def create_collection(self, collection_name: str, vector_size: int):
+        if VectorClientPool.is_collection_exist(self._collection_name):
+            return
+
         lock_name = 'vector_indexing_lock_{}'.format(collection_name)
         with redis_client.lock(lock_name, timeout=20):
             collection_exist_cache_key = 'vector_indexing_{}'.format(self._collection_name)
             if redis_client.get(collection_exist_cache_key):
+                VectorClientPool.set_collection_exist(self._collection_name)
                 return
             collection_name = collection_name or uuid.uuid4().hex
             all_collection_name = []
@@ -129,6 +139,7 @@ class QdrantVector(BaseVector):
                 self._client.create_payload_index(collection_name, Field.CONTENT_KEY.value,
                                                   field_schema=text_index_params)
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
+            VectorClientPool.set_collection_exist(self._collection_name)
 
     def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
         uuids = self._get_uuids(documents)
@@ -281,29 +292,31 @@ class QdrantVector(BaseVector):
         from qdrant_client.http import models
         from qdrant_client.http.exceptions import UnexpectedResponse
 
-        for node_id in ids:
-            try:
-                filter = models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="metadata.doc_id",
-                            match=models.MatchValue(value=node_id),
-                        ),
-                    ],
-                )
-                self._client.delete(
-                    collection_name=self._collection_name,
-                    points_selector=FilterSelector(
-                        filter=filter
+        if not ids:
+            return
+
+        try:
+            filter = models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="metadata.doc_id",
+                        match=models.MatchAny(any=ids),
                     ),
-                )
-            except UnexpectedResponse as e:
-                # Collection does not exist, so return
-                if e.status_code == 404:
-                    return
-                # Some other error occurred, so re-raise the exception
-                else:
-                    raise e
+                ],
+            )
+            self._client.delete(
+                collection_name=self._collection_name,
+                points_selector=FilterSelector(
+                    filter=filter
+                ),
+            )
+        except UnexpectedResponse as e:
+            # Collection does not exist, so return
+            if e.status_code == 404:
+                return
+            # Some other error occurred, so re-raise the exception
+            else:
+                raise e
 
     def text_exists(self, id: str) -> bool:
         all_collection_name = []
@@ -320,6 +333,23 @@ class QdrantVector(BaseVector):
 
         return len(response) > 0
 
+    def exists_many(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+
+        collections_response = self._client.get_collections()
+        if self._collection_name not in [collection.name for collection in collections_response.collections]:
+            return set()
+
+        response = self._client.retrieve(
+            collection_name=self._collection_name,
+            ids=ids,
+            with_payload=False,
+            with_vectors=False
+        )
+
+        return {str(point.id) for point in response}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         from qdrant_client.http import models
         filter = models.Filter(
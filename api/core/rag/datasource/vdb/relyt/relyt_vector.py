@@ -13,6 +13,7 @@ except ImportError:
     from sqlalchemy.ext.declarative import declarative_base
 
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_pool import VectorClientPool
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 
@@ -48,7 +49,10 @@ class RelytVector(BaseVector):
         self.embedding_dimension = 1536
         self._client_config = config
         self._url = f"postgresql+psycopg2://{config.user}:{config.password}@{config.host}:{config.port}/{config.database}"
-        self.client = create_engine(self._url)
+        self.client = VectorClientPool.get_client(
+            ('relyt', self._url),
+            lambda: create_engine(self._url, pool_pre_ping=True)
+        )
         self._fields = []
         self._group_id = group_id
 
@@ -63,10 +67,14 @@ class RelytVector(BaseVector):
         self.add_texts(texts, embeddings)
 
     def create_collection(self, dimension: int):
+        if VectorClientPool.is_collection_exist(self._collection_name):
+            return
+
         lock_name = 'vector_indexing_lock_{}'.format(self._collection_name)
         with redis_client.lock(lock_name, timeout=20):
             collection_exist_cache_key = 'vector_indexing_{}'.format(self._collection_name)
             if redis_client.get(collection_exist_cache_key):
+                VectorClientPool.set_collection_exist(self._collection_name)
                 return
             index_name = f"{self._collection_name}_embedding_index"
             with Session(self.client) as session:
@@ -96,6 +104,7 @@ class RelytVector(BaseVector):
                 session.execute(index_statement)
                 session.commit()
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
+            VectorClientPool.set_collection_exist(self._collection_name)
 
     def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
         from pgvecto_rs.sqlalchemy import Vector
@@ -200,22 +209,24 @@ class RelytVector(BaseVector):
             self.delete_by_uuids(ids)
 
     def delete_by_ids(self, ids: list[str]) -> None:
+        if not ids:
+            return
 
         with Session(self.client) as session:
-            ids_str = ','.join(f"'{doc_id}'" for doc_id in ids)
-            select_statement = sql_text(
-                f"""SELECT id FROM "{self._collection_name}" WHERE metadata->>'doc_id' in ({ids_str}); """
+            delete_statement = sql_text(
+                f"""DELETE FROM "{self._collection_name}" WHERE metadata->>'doc_id' = ANY (:doc_ids); """
             )
-            result = session.execute(select_statement).fetchall()
-        if result:
-            ids = [item[0] for item in result]
-            self.delete_by_uuids(ids)
+            session.execute(delete_statement, {'doc_ids': ids})
+            session.commit()
 
     def delete(self) -> None:
         with Session(self.client) as session:
             session.execute(sql_text(f"""DROP TABLE IF EXISTS "{self._collection_name}";"""))
             session.commit()
 
+        redis_client.delete('vector_indexing_{}'.format(self._collection_name))
+        VectorClientPool.remove_collection_exist(self._collection_name)
+
     def text_exists(self, id: str) -> bool:
         with Session(self.client) as session:
             select_statement = sql_text(
@@ -224,6 +235,18 @@ class RelytVector(BaseVector):
             result = session.execute(select_statement).fetchall()
         return len(result) > 0
 
+    def exists_many(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+
+        with Session(self.client) as session:
+            select_statement = sql_text(
+                f"""SELECT metadata->>'doc_id' FROM "{self._collection_name}" """
+                f"""WHERE metadata->>'doc_id' = ANY (:doc_ids); """
+            )
+            result = session.execute(select_statement, {'doc_ids': ids}).fetchall()
+        return {item[0] for item in result}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         results = self.similarity_search_with_score_by_vector(
             k=int(kwargs.get('top_k')),
@@ -23,6 +23,14 @@ class BaseVector(ABC):
     def text_exists(self, id: str) -> bool:
         raise NotImplementedError
 
+    def exists_many(self, ids: list[str]) -> set[str]:
+        """
+        Get ids of the texts which exist, backends override it with one bulk query
+        :param ids: text ids
+        :return: existing text ids
+        """
+        return {id for id in ids if self.text_exists(id)}
+
     @abstractmethod
     def delete_by_ids(self, ids: list[str]) -> None:
         raise NotImplementedError
@@ -56,13 +64,9 @@ class BaseVector(ABC):
         raise NotImplementedError
 
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
-        for text in texts:
-            doc_id = text.metadata['doc_id']
-            exists_duplicate_node = self.text_exists(doc_id)
-            if exists_duplicate_node:
-                texts.remove(text)
+        existing_ids = self.exists_many([text.metadata['doc_id'] for text in texts]) if texts else set()
 
-        return texts
+        return [text for text in texts if text.metadata['doc_id'] not in existing_ids]
 
     def _get_uuids(self, texts: list[Document]) -> list[str]:
         return [text.metadata['doc_id'] for text in texts]
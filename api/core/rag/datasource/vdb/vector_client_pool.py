@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+
+from core.helper.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class VectorClientPool:
+    """
+    Process-wide registry of long-lived vector store clients and connection pools,
+    keyed by vector store type and client config, so Vector instances share connections instead of
+    setting up a new client per request.
+
+    Also caches in process which collections are known to exist, in front of the redis collection flags.
+    """
+    HEALTH_CHECK_INTERVAL = 60
+    COLLECTION_EXIST_CACHE_TTL = 600
+    # clients like pgvecto_rs tables are created per collection, least recently used ones are dropped
+    MAX_CLIENTS = 256
+
+    _clients = LRUCache(MAX_CLIENTS)
+    _health_checked_at: dict[tuple, float] = {}
+    _client_locks: dict[tuple, threading.Lock] = {}
+    _existing_collections: dict[str, float] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, key: tuple, factory: Callable[[], Any],
+                   health_check: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Get shared client, create it if not exists or the health check fails.
+        Clients are created and health checked under a lock of their key,
+        so a slow vector store doesn't block getting clients of others
+        :param key: client key, like: ('qdrant', url, api_key)
+        :param factory: client factory
+        :param health_check: returns whether the client is healthy, run at most once per interval
+        :return:
+        """
+        with cls._lock:
+            client = cls._clients.get(key)
+            if client is not None and not cls._need_health_check(key):
+                return client
+
+            client_lock = cls._client_locks.setdefault(key, threading.Lock())
+
+        with client_lock:
+            with cls._lock:
+                client = cls._clients.get(key)
+                need_health_check = client is not None and cls._need_health_check(key)
+                if need_health_check:
+                    # others keep using the client meanwhile
+                    cls._health_checked_at[key] = time.monotonic()
+
+            if need_health_check and health_check and not cls._is_healthy(client, health_check):
+                logger.warning(f'Vector store client {key[0]} is unhealthy, recreate it')
+                client = None
+
+            if client is None:
+                client = factory()
+                with cls._lock:
+                    cls._clients.put(key, client)
+                    cls._health_checked_at[key] = time.monotonic()
+                    cls._prune_dropped_clients()
+
+        return client
+
+    @classmethod
+    def is_collection_exist(cls, collection_name: str) -> bool:
+        """
+        Whether the collection is known to exist in this process
+        :param collection_name: collection name
+        :return:
+        """
+        expires_at = cls._existing_collections.get(collection_name)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    @classmethod
+    def set_collection_exist(cls, collection_name: str) -> None:
+        cls._existing_collections[collection_name] = time.monotonic() + cls.COLLECTION_EXIST_CACHE_TTL
+
+    @classmethod
+    def remove_collection_exist(cls, collection_name: str) -> None:
+        cls._existing_collections.pop(collection_name, None)
+
+    @classmethod
+    def _prune_dropped_clients(cls) -> None:
+        if len(cls._health_checked_at) <= cls.MAX_CLIENTS:
+            return
+
+        cls._health_checked_at = {key: checked_at for key, checked_at in cls._health_checked_at.items()
+                                  if key in cls._clients.cache}
+        cls._client_locks = {key: lock for key, lock in cls._client_locks.items() if key in cls._clients.cache}
+
+    @classmethod
+    def _need_health_check(cls, key: tuple) -> bool:
+        return time.monotonic() - cls._health_checked_at.get(key, 0) > cls.HEALTH_CHECK_INTERVAL
+
+    @staticmethod
+    def _is_healthy(client: Any, health_check: Callable[[Any], bool]) -> bool:
+        try:
+            return health_check(client)
+        except Exception:
+            logger.exception('Vector store client health check failed')
+            return False
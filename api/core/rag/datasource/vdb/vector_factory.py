@@ -1,7 +1,9 @@
 import json
-from typing import Any
+from typing import Any, Optional
 
 from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
 
 from core.embedding.cached_embedding import CacheEmbedding
 from core.model_manager import ModelManager
@@ -14,6 +16,9 @@ from models.dataset import Dataset, DatasetCollectionBinding
 
 
 class Vector:
+    # embedding dimensions by (tenant id, provider, model), for datasets whose index struct has no dimension yet
+    _dimensions: dict[tuple[str, str, str], int] = {}
+
     def __init__(self, dataset: Dataset, attributes: list = None):
         if attributes is None:
             attributes = ['doc_id', 'dataset_id', 'document_id', 'doc_hash']
@@ -152,7 +157,7 @@ class Vector:
                     "vector_store": {"class_prefix": collection_name}
                 }
                 self._dataset.index_struct = json.dumps(index_struct_dict)
-            dim = len(self._embeddings.embed_query("pgvecto_rs"))
+            dim = self._get_dimension()
             return PGVectoRS(
                 collection_name=collection_name,
                 config=PgvectoRSConfig(
@@ -167,9 +172,12 @@ class Vector:
         else:
             raise ValueError(f"Vector store {config.get('VECTOR_STORE')} is not supported.")
 
-    def create(self, texts: list = None, **kwargs):
+    def create(self, texts: list = None, embeddings: Optional[list[list[float]]] = None, **kwargs):
         if texts:
-            embeddings = self._embeddings.embed_documents([document.page_content for document in texts])
+            if embeddings is None:
+                embeddings = self._embeddings.embed_documents([document.page_content for document in texts])
+            if embeddings:
+                self._record_dimension(len(embeddings[0]))
             self._vector_processor.create(
                 texts=texts,
                 embeddings=embeddings,
@@ -180,6 +188,8 @@ class Vector:
         if kwargs.get('duplicate_check', False):
             documents = self._filter_duplicate_texts(documents)
         embeddings = self._embeddings.embed_documents([document.page_content for document in documents])
+        if embeddings:
+            self._record_dimension(len(embeddings[0]))
         self._vector_processor.create(
             texts=documents,
             embeddings=embeddings,
@@ -189,6 +199,9 @@ class Vector:
     def text_exists(self, id: str) -> bool:
         return self._vector_processor.text_exists(id)
 
+    def exists_many(self, ids: list[str]) -> set[str]:
+        return self._vector_processor.exists_many(ids)
+
     def delete_by_ids(self, ids: list[str]) -> None:
         self._vector_processor.delete_by_ids(ids)
 
@@ -223,14 +236,50 @@ class Vector:
         )
         return CacheEmbedding(embedding_model)
 
+    def _get_dimension(self) -> int:
+        """
+        Get embedding dimension of the dataset.
+        It is recorded in the index struct when texts are indexed, datasets indexed before that
+        probe the embedding model once per model in this process.
+        :return:
+        """
+        index_struct_dict = self._dataset.index_struct_dict
+        if index_struct_dict and index_struct_dict['vector_store'].get('dimension'):
+            return index_struct_dict['vector_store']['dimension']
+
+        model_key = (self._dataset.tenant_id, self._dataset.embedding_model_provider, self._dataset.embedding_model)
+        dimension = self._dimensions.get(model_key)
+        if dimension is None:
+            dimension = len(self._embeddings.embed_query('dimension'))
+            self._dimensions[model_key] = dimension
+
+        return dimension
+
+    def _record_dimension(self, dimension: int) -> None:
+        """
+        Record embedding dimension in the index struct of the dataset.
+        It's written in a transaction of its own, as texts may be indexed in threads
+        which don't own the session of the dataset, and the dataset isn't marked as changed
+        :param dimension: embedding dimension
+        :return:
+        """
+        index_struct_dict = self._dataset.index_struct_dict
+        if index_struct_dict and index_struct_dict['vector_store'].get('dimension') != dimension:
+            index_struct_dict['vector_store']['dimension'] = dimension
+            index_struct = json.dumps(index_struct_dict)
+            with db.engine.begin() as connection:
+                connection.execute(
+                    update(Dataset).where(Dataset.id == self._dataset.id).values(index_struct=index_struct)
+                )
+            set_committed_value(self._dataset, 'index_struct', index_struct)
+        self._dimensions[
+            (self._dataset.tenant_id, self._dataset.embedding_model_provider, self._dataset.embedding_model)
+        ] = dimension
+
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
-        for text in texts:
-            doc_id = text.metadata['doc_id']
-            exists_duplicate_node = self.text_exists(doc_id)
-            if exists_duplicate_node:
-                texts.remove(text)
+        existing_ids = self.exists_many([text.metadata['doc_id'] for text in texts]) if texts else set()
 
-        return texts
+        return [text for text in texts if text.metadata['doc_id'] not in existing_ids]
 
     def __getattr__(self, name):
         if self._vector_processor is not None:
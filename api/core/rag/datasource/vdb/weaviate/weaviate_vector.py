@@ -4,9 +4,11 @@ from typing import Any, Optional
 import requests
 import weaviate
 from pydantic import BaseModel, root_validator
+from weaviate.batch import Batch
 
 from core.rag.datasource.vdb.field import Field
 from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_client_pool import VectorClientPool
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 from models.dataset import Dataset
@@ -28,7 +30,12 @@ class WeaviateVector(BaseVector):
 
     def __init__(self, collection_name: str, config: WeaviateConfig, attributes: list):
         super().__init__(collection_name)
-        self._client = self._init_client(config)
+        self._client_config = config
+        self._client = VectorClientPool.get_client(
+            ('weaviate', config.endpoint, config.api_key, config.batch_size),
+            lambda: self._init_client(config),
+            health_check=lambda client: client.is_ready()
+        )
         self._attributes = attributes
 
     def _init_client(self, config: WeaviateConfig) -> weaviate.Client:
@@ -86,16 +93,21 @@ class WeaviateVector(BaseVector):
         self.add_texts(texts, embeddings)
 
     def _create_collection(self):
+        if VectorClientPool.is_collection_exist(self._collection_name):
+            return
+
         lock_name = 'vector_indexing_lock_{}'.format(self._collection_name)
         with redis_client.lock(lock_name, timeout=20):
             collection_exist_cache_key = 'vector_indexing_{}'.format(self._collection_name)
             if redis_client.get(collection_exist_cache_key):
+                VectorClientPool.set_collection_exist(self._collection_name)
                 return
             schema = self._default_schema(self._collection_name)
             if not self._client.schema.contains(schema):
                 # create collection
                 self._client.schema.create_class(schema)
             redis_client.set(collection_exist_cache_key, 1, ex=3600)
+            VectorClientPool.set_collection_exist(self._collection_name)
 
     def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
         uuids = self._get_uuids(documents)
@@ -104,7 +116,13 @@ class WeaviateVector(BaseVector):
 
         ids = []
 
-        with self._client.batch as batch:
+        # the client is shared, use a batch of this call instead of the stateful client batch
+        batch = Batch(self._client._connection).configure(
+            batch_size=self._client_config.batch_size,
+            dynamic=True,
+            timeout_retries=3,
+        )
+        with batch:
             for i, text in enumerate(texts):
                 data_properties = {Field.TEXT_KEY.value: text}
                 if metadatas is not None:
@@ -142,6 +160,9 @@ class WeaviateVector(BaseVector):
         if self._client.schema.contains(schema):
             self._client.schema.delete_class(self._collection_name)
 
+        redis_client.delete('vector_indexing_{}'.format(self._collection_name))
+        VectorClientPool.remove_collection_exist(self._collection_name)
+
     def text_exists(self, id: str) -> bool:
         collection_name = self._collection_name
         schema = self._default_schema(self._collection_name)
@@ -164,16 +185,48 @@ class WeaviateVector(BaseVector):
 
         return True
 
+    def exists_many(self, ids: list[str]) -> set[str]:
+        collection_name = self._collection_name
+        schema = self._default_schema(self._collection_name)
+
+        # check whether the index already exists
+        if not ids or not self._client.schema.contains(schema):
+            return set()
+
+        existing_ids = set()
+        batch_size = self._client_config.batch_size
+        for i in range(0, len(ids), batch_size):
+            batch_ids = ids[i:i + batch_size]
+            result = self._client.query.get(collection_name, ["doc_id"]).with_where(
+                self._ids_where_filter("doc_id", batch_ids)
+            ).with_limit(len(batch_ids)).do()
+
+            if "errors" in result:
+                raise ValueError(f"Error during query: {result['errors']}")
+
+            existing_ids.update(entry["doc_id"] for entry in result["data"]["Get"][collection_name])
+
+        return existing_ids
+
     def delete_by_ids(self, ids: list[str]) -> None:
         # check whether the index already exists
         schema = self._default_schema(self._collection_name)
-        if self._client.schema.contains(schema):
-            for uuid in ids:
-                self._client.data_object.delete(
+        if ids and self._client.schema.contains(schema):
+            batch_size = self._client_config.batch_size
+            for i in range(0, len(ids), batch_size):
+                self._client.batch.delete_objects(
                     class_name=self._collection_name,
-                    uuid=uuid,
+                    where=self._ids_where_filter("id", ids[i:i + batch_size]),
+                    output='minimal'
                 )
 
+    @staticmethod
+    def _ids_where_filter(path: str, ids: list[str]) -> dict:
+        return {
+            "operator": "Or",
+            "operands": [{"path": [path], "operator": "Equal", "valueText": id} for id in ids]
+        }
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         """Look up similar documents by embedding vector in Weaviate."""
         collection_name = self._collection_name
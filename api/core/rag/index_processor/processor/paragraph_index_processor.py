@@ -10,6 +10,7 @@ from core.rag.extractor.entity.extract_setting import ExtractSetting
 from core.rag.extractor.extract_processor import ExtractProcessor
 from core.rag.index_processor.index_processor_base import BaseIndexProcessor
 from core.rag.models.document import Document
+from events.dataset_event import dataset_index_was_updated
 from libs import helper
 from models.dataset import Dataset
 
@@ -54,13 +55,15 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
             all_documents.extend(split_documents)
         return all_documents
 
-    def load(self, dataset: Dataset, documents: list[Document], with_keywords: bool = True):
+    def load(self, dataset: Dataset, documents: list[Document], with_keywords: bool = True,
+             embeddings: Optional[list[list[float]]] = None):
         if dataset.indexing_technique == 'high_quality':
             vector = Vector(dataset)
-            vector.create(documents)
+            vector.create(documents, embeddings=embeddings)
         if with_keywords:
             keyword = Keyword(dataset)
             keyword.create(documents)
+        dataset_index_was_updated.send(dataset)
 
     def clean(self, dataset: Dataset, node_ids: Optional[list[str]], with_keywords: bool = True):
         if dataset.indexing_technique == 'high_quality':
@@ -75,6 +78,7 @@ class ParagraphIndexProcessor(BaseIndexProcessor):
                 keyword.delete_by_ids(node_ids)
             else:
                 keyword.delete()
+        dataset_index_was_updated.send(dataset)
 
     def retrieve(self, retrival_method: str, query: str, dataset: Dataset, top_k: int,
                  score_threshold: float, reranking_model: dict) -> list[Document]:
@@ -17,6 +17,7 @@ from core.rag.extractor.entity.extract_setting import ExtractSetting
 from core.rag.extractor.extract_processor import ExtractProcessor
 from core.rag.index_processor.index_processor_base import BaseIndexProcessor
 from core.rag.models.document import Document
+from events.dataset_event import dataset_index_was_updated
 from libs import helper
 from models.dataset import Dataset
 
@@ -95,10 +96,12 @@ class QAIndexProcessor(BaseIndexProcessor):
             raise ValueError(str(e))
         return text_docs
 
-    def load(self, dataset: Dataset, documents: list[Document], with_keywords: bool = True):
+    def load(self, dataset: Dataset, documents: list[Document], with_keywords: bool = True,
+             embeddings: Optional[list[list[float]]] = None):
         if dataset.indexing_technique == 'high_quality':
             vector = Vector(dataset)
-            vector.create(documents)
+            vector.create(documents, embeddings=embeddings)
+        dataset_index_was_updated.send(dataset)
 
     def clean(self, dataset: Dataset, node_ids: Optional[list[str]], with_keywords: bool = True):
         vector = Vector(dataset)
@@ -106,6 +109,7 @@ class QAIndexProcessor(BaseIndexProcessor):
             vector.delete_by_ids(node_ids)
         else:
             vector.delete()
+        dataset_index_was_updated.send(dataset)
 
     def retrieve(self, retrival_method: str, query: str, dataset: Dataset, top_k: int,
                  score_threshold: float, reranking_model: dict):
@@ -1,7 +1,108 @@
-from typing import Optional
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, cast
 
+from flask import Flask, current_app
+
+from core.helper.lru_cache import LRUCache
 from core.model_manager import ModelInstance
+from core.model_runtime.entities.model_entities import ModelPropertyKey
+from core.model_runtime.model_providers.__base.rerank_model import RerankModel
 from core.rag.models.document import Document
+from extensions.ext_redis import redis_client
+from libs import helper
+
+logger = logging.getLogger(__name__)
+
+
+class RerankScoreCache:
+    """
+    Two tier cache of rerank scores by (model, query hash, document text hash),
+    a bounded in-process LRU in front of redis.
+    """
+    _cache: Optional[LRUCache] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_many(cls, provider: str, model: str, query_hash: str, doc_hashes: list[str]) -> dict[str, float]:
+        """
+        Get cached rerank scores
+        :param provider: provider name
+        :param model: model name
+        :param query_hash: query text hash
+        :param doc_hashes: document text hashes
+        :return: scores by document text hash
+        """
+        scores = {}
+        now = time.monotonic()
+        with cls._lock:
+            for doc_hash in doc_hashes:
+                cached = cls._get_local_cache().get(cls._get_cache_key(provider, model, query_hash, doc_hash))
+                if cached and cached[0] > now:
+                    scores[doc_hash] = cached[1]
+
+        missing_hashes = [doc_hash for doc_hash in doc_hashes if doc_hash not in scores]
+        if not missing_hashes:
+            return scores
+
+        try:
+            values = redis_client.mget([cls._get_cache_key(provider, model, query_hash, doc_hash)
+                                        for doc_hash in missing_hashes])
+        except Exception:
+            logger.exception('Failed to get rerank scores from redis')
+            return scores
+
+        redis_scores = {doc_hash: float(value) for doc_hash, value in zip(missing_hashes, values) if value}
+        if redis_scores:
+            cls._put_local(provider, model, query_hash, redis_scores)
+            scores.update(redis_scores)
+
+        return scores
+
+    @classmethod
+    def set_many(cls, provider: str, model: str, query_hash: str, scores: dict[str, float]) -> None:
+        """
+        Set rerank scores to cache
+        :param provider: provider name
+        :param model: model name
+        :param query_hash: query text hash
+        :param scores: scores by document text hash
+        :return:
+        """
+        if not scores:
+            return
+
+        cls._put_local(provider, model, query_hash, scores)
+
+        try:
+            ttl = current_app.config['RERANK_CACHE_TTL']
+            pipeline = redis_client.pipeline(transaction=False)
+            for doc_hash, score in scores.items():
+                pipeline.setex(cls._get_cache_key(provider, model, query_hash, doc_hash), ttl, str(score))
+            pipeline.execute()
+        except Exception:
+            logger.exception('Failed to add rerank scores to redis')
+
+    @classmethod
+    def _put_local(cls, provider: str, model: str, query_hash: str, scores: dict[str, float]) -> None:
+        expires_at = time.monotonic() + current_app.config['RERANK_CACHE_TTL']
+        with cls._lock:
+            for doc_hash, score in scores.items():
+                cls._get_local_cache().put(cls._get_cache_key(provider, model, query_hash, doc_hash),
+                                           (expires_at, score))
+
+    @classmethod
+    def _get_cache_key(cls, provider: str, model: str, query_hash: str, doc_hash: str) -> str:
+        return f'rerank_score:{provider}:{model}:{query_hash}:{doc_hash}'
+
+    @classmethod
+    def _get_local_cache(cls) -> LRUCache:
+        if cls._cache is None:
+            cls._cache = LRUCache(current_app.config['RERANK_CACHE_SIZE'])
+
+        return cls._cache
 
 
 class RerankRunner:
@@ -19,39 +120,100 @@ class RerankRunner:
         :param user: unique user id if needed
         :return:
         """
-        docs = []
-        doc_id = []
-        unique_documents = []
+        unique_documents = {}
         for document in documents:
-            if document.metadata['doc_id'] not in doc_id:
-                doc_id.append(document.metadata['doc_id'])
-                docs.append(document.page_content)
-                unique_documents.append(document)
+            unique_documents.setdefault(document.metadata['doc_id'], document)
 
-        documents = unique_documents
+        documents = list(unique_documents.values())
+        if not documents:
+            return []
 
-        rerank_result = self.rerank_model_instance.invoke_rerank(
-            query=query,
-            docs=docs,
-            score_threshold=score_threshold,
-            top_n=top_n,
-            user=user
-        )
+        # scores of cached (query, document text) pairs are reused, only the others are sent to the model
+        provider = self.rerank_model_instance.provider
+        model = self.rerank_model_instance.model
+        query_hash = helper.generate_text_hash(query)
+        doc_hashes = [helper.generate_text_hash(document.page_content) for document in documents]
+        scores = RerankScoreCache.get_many(provider, model, query_hash, doc_hashes)
+
+        uncached_texts = {}
+        for doc_hash, document in zip(doc_hashes, documents):
+            if doc_hash not in scores:
+                uncached_texts.setdefault(doc_hash, document.page_content)
+
+        if uncached_texts:
+            rerank_scores = self._rerank(query, uncached_texts, user)
+            RerankScoreCache.set_many(provider, model, query_hash, rerank_scores)
+            scores.update(rerank_scores)
 
         rerank_documents = []
+        for doc_hash, document in zip(doc_hashes, documents):
+            score = scores.get(doc_hash)
+            if score is None or (score_threshold is not None and score < score_threshold):
+                continue
 
-        for result in rerank_result.docs:
             # format document
             rerank_document = Document(
-                page_content=result.text,
+                page_content=document.page_content,
                 metadata={
-                    "doc_id": documents[result.index].metadata['doc_id'],
-                    "doc_hash": documents[result.index].metadata['doc_hash'],
-                    "document_id": documents[result.index].metadata['document_id'],
-                    "dataset_id": documents[result.index].metadata['dataset_id'],
-                    'score': result.score
+                    "doc_id": document.metadata['doc_id'],
+                    "doc_hash": document.metadata['doc_hash'],
+                    "document_id": document.metadata['document_id'],
+                    "dataset_id": document.metadata['dataset_id'],
+                    'score': score
                 }
             )
             rerank_documents.append(rerank_document)
 
-        return rerank_documents
+        rerank_documents.sort(key=lambda document: document.metadata['score'], reverse=True)
+
+        return rerank_documents[:top_n]
+
+    def _rerank(self, query: str, texts: dict[str, str], user: Optional[str] = None) -> dict[str, float]:
+        """
+        Get rerank scores of texts, large sets are split into batches the model accepts, reranked concurrently
+        :param query: search query
+        :param texts: texts by text hash
+        :param user: unique user id if needed
+        :return: scores by text hash
+        """
+        items = list(texts.items())
+        batch_size = self._get_batch_size()
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        if len(batches) == 1:
+            return self._rerank_batch(None, query, batches[0], user)
+
+        flask_app = current_app._get_current_object()
+        max_workers = min(len(batches), current_app.config['RERANK_MAX_CONCURRENCY'])
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batch_scores = executor.map(lambda batch: self._rerank_batch(flask_app, query, batch, user), batches)
+
+            return {doc_hash: score for scores in batch_scores for doc_hash, score in scores.items()}
+
+    def _rerank_batch(self, flask_app: Optional[Flask], query: str, batch: list[tuple[str, str]],
+                      user: Optional[str] = None) -> dict[str, float]:
+        if flask_app:
+            with flask_app.app_context():
+                return self._rerank_batch(None, query, batch, user)
+
+        # scores of all texts are needed for caching, providers don't all accept an unset top_n
+        rerank_result = self.rerank_model_instance.invoke_rerank(
+            query=query,
+            docs=[text for _, text in batch],
+            top_n=len(batch),
+            user=user
+        )
+
+        return {batch[result.index][0]: result.score for result in rerank_result.docs}
+
+    def _get_batch_size(self) -> int:
+        """
+        Get max number of documents reranked in one request
+        :return:
+        """
+        model_type_instance = cast(RerankModel, self.rerank_model_instance.model_type_instance)
+        model_schema = model_type_instance.get_model_schema(self.rerank_model_instance.model,
+                                                            self.rerank_model_instance.credentials)
+        if model_schema and ModelPropertyKey.MAX_CHUNKS in model_schema.model_properties:
+            return model_schema.model_properties[ModelPropertyKey.MAX_CHUNKS]
+
+        return current_app.config['RERANK_BATCH_SIZE']
@@ -1,18 +1,18 @@
 import logging
-import threading
 from typing import Optional
 
-from flask import Flask, current_app
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 
 from core.callback_handler.index_tool_callback_handler import DatasetIndexToolCallbackHandler
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelType
+from core.rag.datasource.retrieval_executor import RetrievalExecutor
 from core.rag.datasource.retrieval_service import RetrievalService
+from core.rag.models.document import Document
 from core.rerank.rerank import RerankRunner
 from extensions.ext_database import db
-from models.dataset import Dataset, Document, DocumentSegment
+from models.dataset import Dataset
 
 logger = logging.getLogger(__name__)
 
@@ -57,21 +57,16 @@ class DatasetMultiRetrieverTool(BaseTool):
         )
 
     def _run(self, query: str) -> str:
-        threads = []
-        all_documents = []
         logger.info(f"datasets: {len(self.dataset_ids)}, {self.dataset_ids}")
-        for dataset_id in self.dataset_ids:
-            retrieval_thread = threading.Thread(target=self._retriever, kwargs={
-                'flask_app': current_app._get_current_object(),
+        results = RetrievalExecutor.run([
+            (f'dataset:{dataset_id}', self._retriever, {
                 'dataset_id': dataset_id,
                 'query': query,
-                'all_documents': all_documents,
                 'hit_callbacks': self.hit_callbacks
             })
-            threads.append(retrieval_thread)
-            retrieval_thread.start()
-        for thread in threads:
-            thread.join()
+            for dataset_id in self.dataset_ids
+        ])
+        all_documents = [document for documents in results if documents for document in documents]
         # do rerank for searched documents
         model_manager = ModelManager()
         rerank_model_instance = model_manager.get_model_instance(
@@ -97,20 +92,9 @@ class DatasetMultiRetrieverTool(BaseTool):
                 document_score_list[item.metadata['doc_id']] = item.metadata['score']
 
         document_context_list = []
-        index_node_ids = [document.metadata['doc_id'] for document in all_documents]
-        segments = DocumentSegment.query.filter(
-            DocumentSegment.dataset_id.in_(self.dataset_ids),
-            DocumentSegment.completed_at.isnot(None),
-            DocumentSegment.status == 'completed',
-            DocumentSegment.enabled == True,
-            DocumentSegment.index_node_id.in_(index_node_ids)
-        ).all()
-
-        if segments:
-            index_node_id_to_position = {id: position for position, id in enumerate(index_node_ids)}
-            sorted_segments = sorted(segments,
-                                     key=lambda segment: index_node_id_to_position.get(segment.index_node_id,
-                                                                                       float('inf')))
+        sorted_segments = RetrievalService.fetch_segments(self.dataset_ids, all_documents)
+
+        if sorted_segments:
             for segment in sorted_segments:
                 if segment.answer:
                     document_context_list.append(f'question:{segment.content} answer:{segment.answer}')
@@ -119,14 +103,10 @@ class DatasetMultiRetrieverTool(BaseTool):
             if self.return_resource:
                 context_list = []
                 resource_number = 1
+                datasets_by_id, documents_by_id = RetrievalService.fetch_segment_sources(sorted_segments)
                 for segment in sorted_segments:
-                    dataset = Dataset.query.filter_by(
-                        id=segment.dataset_id
-                    ).first()
-                    document = Document.query.filter(Document.id == segment.document_id,
-                                                     Document.enabled == True,
-                                                     Document.archived == False,
-                                                     ).first()
+                    dataset = datasets_by_id.get(segment.dataset_id)
+                    document = documents_by_id.get(segment.document_id)
                     if dataset and document:
                         source = {
                             'position': resource_number,
@@ -160,43 +140,40 @@ class DatasetMultiRetrieverTool(BaseTool):
     async def _arun(self, tool_input: str) -> str:
         raise NotImplementedError()
 
-    def _retriever(self, flask_app: Flask, dataset_id: str, query: str, all_documents: list,
-                   hit_callbacks: list[DatasetIndexToolCallbackHandler]):
-        with flask_app.app_context():
-            dataset = db.session.query(Dataset).filter(
-                Dataset.tenant_id == self.tenant_id,
-                Dataset.id == dataset_id
-            ).first()
-
-            if not dataset:
-                return []
-
-            for hit_callback in hit_callbacks:
-                hit_callback.on_query(query, dataset.id)
-
-            # get retrieval model , if the model is not setting , using default
-            retrieval_model = dataset.retrieval_model if dataset.retrieval_model else default_retrieval_model
-
-            if dataset.indexing_technique == "economy":
-                # use keyword table query
-                documents = RetrievalService.retrieve(retrival_method='keyword_search',
-                                                      dataset_id=dataset.id,
-                                                      query=query,
-                                                      top_k=self.top_k
-                                                      )
-                if documents:
-                    all_documents.extend(documents)
-            else:
-                if self.top_k > 0:
-                    # retrieval source
-                    documents = RetrievalService.retrieve(retrival_method=retrieval_model['search_method'],
-                                                          dataset_id=dataset.id,
-                                                          query=query,
-                                                          top_k=self.top_k,
-                                                          score_threshold=retrieval_model['score_threshold']
-                                                          if retrieval_model['score_threshold_enabled'] else None,
-                                                          reranking_model=retrieval_model['reranking_model']
-                                                          if retrieval_model['reranking_enable'] else None
-                                                          )
-
-                    all_documents.extend(documents)
\ No newline at end of file
+    def _retriever(self, dataset_id: str, query: str,
+                   hit_callbacks: list[DatasetIndexToolCallbackHandler]) -> list[Document]:
+        dataset = db.session.query(Dataset).filter(
+            Dataset.tenant_id == self.tenant_id,
+            Dataset.id == dataset_id
+        ).first()
+
+        if not dataset:
+            return []
+
+        for hit_callback in hit_callbacks:
+            hit_callback.on_query(query, dataset.id)
+
+        # get retrieval model , if the model is not setting , using default
+        retrieval_model = dataset.retrieval_model if dataset.retrieval_model else default_retrieval_model
+
+        if dataset.indexing_technique == "economy":
+            # use keyword table query
+            return RetrievalService.retrieve(retrival_method='keyword_search',
+                                             dataset_id=dataset.id,
+                                             query=query,
+                                             top_k=self.top_k
+                                             )
+
+        if self.top_k > 0:
+            # retrieval source
+            return RetrievalService.retrieve(retrival_method=retrieval_model['search_method'],
+                                             dataset_id=dataset.id,
+                                             query=query,
+                                             top_k=self.top_k,
+                                             score_threshold=retrieval_model['score_threshold']
+                                             if retrieval_model['score_threshold_enabled'] else None,
+                                             reranking_model=retrieval_model['reranking_model']
+                                             if retrieval_model['reranking_enable'] else None
+                                             )
+
+        return []
@@ -4,7 +4,7 @@ from pydantic import BaseModel, Field
 from core.rag.datasource.retrieval_service import RetrievalService
 from core.tools.tool.dataset_retriever.dataset_retriever_base_tool import DatasetRetrieverBaseTool
 from extensions.ext_database import db
-from models.dataset import Dataset, Document, DocumentSegment
+from models.dataset import Dataset
 
 default_retrieval_model = {
     'search_method': 'semantic_search',
@@ -90,19 +90,9 @@ class DatasetRetrieverTool(DatasetRetrieverBaseTool):
                     if 'score' in item.metadata and item.metadata['score']:
                         document_score_list[item.metadata['doc_id']] = item.metadata['score']
             document_context_list = []
-            index_node_ids = [document.metadata['doc_id'] for document in documents]
-            segments = DocumentSegment.query.filter(DocumentSegment.dataset_id == self.dataset_id,
-                                                    DocumentSegment.completed_at.isnot(None),
-                                                    DocumentSegment.status == 'completed',
-                                                    DocumentSegment.enabled == True,
-                                                    DocumentSegment.index_node_id.in_(index_node_ids)
-                                                    ).all()
-
-            if segments:
-                index_node_id_to_position = {id: position for position, id in enumerate(index_node_ids)}
-                sorted_segments = sorted(segments,
-                                         key=lambda segment: index_node_id_to_position.get(segment.index_node_id,
-                                                                                           float('inf')))
+            sorted_segments = RetrievalService.fetch_segments([self.dataset_id], documents)
+
+            if sorted_segments:
                 for segment in sorted_segments:
                     if segment.answer:
                         document_context_list.append(f'question:{segment.content} answer:{segment.answer}')
@@ -111,12 +101,9 @@ class DatasetRetrieverTool(DatasetRetrieverBaseTool):
                 if self.return_resource:
                     context_list = []
                     resource_number = 1
+                    documents_by_id = RetrievalService.fetch_segment_documents(sorted_segments)
                     for segment in sorted_segments:
-                        context = {}
-                        document = Document.query.filter(Document.id == segment.document_id,
-                                                         Document.enabled == True,
-                                                         Document.archived == False,
-                                                         ).first()
+                        document = documents_by_id.get(segment.document_id)
                         if dataset and document:
                             source = {
                                 'position': resource_number,
@@ -1,3 +1,5 @@
+import threading
+from collections.abc import Callable, Iterator
 from enum import Enum
 from typing import Any, Optional, Union
 
@@ -21,6 +23,34 @@ class ValueType(Enum):
     FILE = "file"
 
 
+class LazyVariableValue:
+    """
+    Variable value which is only decoded when a node reads it, like large http bodies or file lists.
+    The decoded value is kept, so the loader runs at most once.
+    """
+
+    def __init__(self, loader: Callable[[], VariableValue]) -> None:
+        self._loader = loader
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> VariableValue:
+        """
+        Get decoded value
+        :return:
+        """
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self._loader()
+                    self._loaded = True
+                    self._loader = None
+
+        return self._value
+
+
 class VariablePool:
 
     def __init__(self, system_variables: dict[SystemVariable, Any],
@@ -31,13 +61,20 @@ class VariablePool:
         #     'query': 'abc',
         #     'files': []
         # }
-        self.variables_mapping = {}
+        # variables are stored by node id and output key, like: {'llm': {'text': 'abc', 'usage': {...}}},
+        # nested selectors like ['llm', 'usage', 'total_tokens'] are resolved by walking into dict values.
+        # node variable dicts are never modified in place but replaced (copy-on-write),
+        # so snapshots only need a shallow copy of the node id mapping.
+        self.variables_mapping: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
         self.user_inputs = user_inputs
         self.system_variables = system_variables
         for system_variable, value in system_variables.items():
             self.append_variable('sys', [system_variable.value], value)
 
-    def append_variable(self, node_id: str, variable_key_list: list[str], value: VariableValue) -> None:
+    def append_variable(self, node_id: str,
+                        variable_key_list: list[str],
+                        value: Union[VariableValue, LazyVariableValue]) -> None:
         """
         Append variable
         :param node_id: node id
@@ -45,12 +82,16 @@ class VariablePool:
         :param value: value
         :return:
         """
-        if node_id not in self.variables_mapping:
-            self.variables_mapping[node_id] = {}
+        if not variable_key_list:
+            raise ValueError('Invalid variable key list')
 
-        variable_key_list_hash = hash(tuple(variable_key_list))
-
-        self.variables_mapping[node_id][variable_key_list_hash] = value
+        # nodes of parallel branches append their outputs concurrently
+        with self._lock:
+            self.variables_mapping[node_id] = self._set_value(
+                self.variables_mapping.get(node_id),
+                variable_key_list,
+                value
+            )
 
     def get_variable_value(self, variable_selector: list[str],
                            target_value_type: Optional[ValueType] = None) -> Optional[VariableValue]:
@@ -64,21 +105,29 @@ class VariablePool:
             raise ValueError('Invalid value selector')
 
         node_id = variable_selector[0]
-        if node_id not in self.variables_mapping:
+        variables = self.variables_mapping.get(node_id)
+        if variables is None:
             return None
 
-        # fetch variable keys, pop node_id
-        variable_key_list = variable_selector[1:]
+        # walk into nested values by the variable keys, pop node_id
+        value = variables
+        for key in variable_selector[1:]:
+            if isinstance(value, LazyVariableValue):
+                value = value.value
+
+            if not isinstance(value, dict):
+                return None
 
-        variable_key_list_hash = hash(tuple(variable_key_list))
+            value = value.get(key)
 
-        value = self.variables_mapping[node_id].get(variable_key_list_hash)
+        if isinstance(value, LazyVariableValue):
+            value = value.value
 
         if target_value_type:
             if target_value_type == ValueType.STRING:
-                return str(value)
+                return value if isinstance(value, str) else str(value)
             elif target_value_type == ValueType.NUMBER:
-                return int(value)
+                return value if type(value) is int else int(value)
             elif target_value_type == ValueType.OBJECT:
                 if not isinstance(value, dict):
                     raise ValueError('Invalid value type: object')
@@ -90,3 +139,68 @@ class VariablePool:
                     raise ValueError(f'Invalid value type: {target_value_type.value}')
 
         return value
+
+    def snapshot(self) -> 'VariablePool':
+        """
+        Get a copy-on-write snapshot of the variable pool,
+        variables appended to the snapshot or the pool afterwards are not visible to each other
+        :return:
+        """
+        variable_pool = VariablePool.__new__(VariablePool)
+        variable_pool.user_inputs = self.user_inputs
+        variable_pool.system_variables = self.system_variables
+        variable_pool._lock = threading.Lock()
+        with self._lock:
+            variable_pool.variables_mapping = dict(self.variables_mapping)
+
+        return variable_pool
+
+    def __iter__(self) -> Iterator[tuple[list[str], VariableValue]]:
+        """
+        Iterate top level variables as (variable selector, value), lazy values are decoded
+        """
+        for node_id, variables in list(self.variables_mapping.items()):
+            for key, value in variables.items():
+                if isinstance(value, LazyVariableValue):
+                    value = value.value
+
+                yield [node_id, key], value
+
+    def to_dict(self) -> dict[str, dict[str, VariableValue]]:
+        """
+        Serialize variables to dict by node id and variable key, lazy values are decoded
+        :return:
+        """
+        result = {}
+        for (node_id, key), value in self:
+            result.setdefault(node_id, {})[key] = value
+
+        return result
+
+    @classmethod
+    def _set_value(cls, variables: Optional[dict],
+                   variable_key_list: list[str],
+                   value: Union[VariableValue, LazyVariableValue]) -> dict:
+        """
+        Set value into a copy of variables by key list, copying only the dicts on the key path
+        :param variables: variables
+        :param variable_key_list: variable key list
+        :param value: value
+        :return: new variables
+        """
+        new_variables = dict(variables) if variables else {}
+        key = variable_key_list[0]
+        if len(variable_key_list) == 1:
+            new_variables[key] = value
+        else:
+            child = new_variables.get(key)
+            if isinstance(child, LazyVariableValue):
+                child = child.value
+
+            new_variables[key] = cls._set_value(
+                child if isinstance(child, dict) else None,
+                variable_key_list[1:],
+                value
+            )
+
+        return new_variables
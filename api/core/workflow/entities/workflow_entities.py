@@ -1,3 +1,4 @@
+import threading
 from typing import Optional
 
 from core.workflow.entities.node_entities import NodeRunResult
@@ -30,6 +31,9 @@ class WorkflowRunState:
 
     workflow_nodes_and_results: list[WorkflowNodeAndResult]
 
+    # guards total_tokens and workflow_nodes_and_results, nodes of parallel branches run in separate threads
+    lock: threading.Lock
+
     def __init__(self, workflow: Workflow,
                  start_at: float,
                  variable_pool: VariablePool,
@@ -47,3 +51,4 @@ class WorkflowRunState:
 
         self.total_tokens = 0
         self.workflow_nodes_and_results = []
+        self.lock = threading.Lock()
@@ -0,0 +1,165 @@
+import threading
+from collections import deque
+from typing import Any, Optional
+
+from core.helper.lru_cache import LRUCache
+from core.workflow.entities.base_node_data_entities import BaseNodeData
+from core.workflow.entities.node_entities import NodeType
+
+
+class WorkflowGraph:
+    """
+    Compiled workflow graph.
+
+    Indexes node configs by id and edges by source node once, so the scheduler
+    doesn't have to re-scan the raw nodes / edges lists on every step.
+    Compiled graphs are immutable and shared between workflow runs through WorkflowGraphCache.
+    """
+    node_configs: dict[str, dict]
+    node_types: dict[str, NodeType]
+    node_datas: dict[str, BaseNodeData]
+    outgoing_edges: dict[str, list[dict]]
+    in_degrees: dict[str, int]
+    topological_order: list[str]
+    start_node_id: Optional[str]
+
+    def __init__(self, graph: dict, node_classes: Optional[dict[NodeType, Any]] = None):
+        """
+        Compile workflow graph
+        :param graph: workflow graph dict
+        :param node_classes: node classes by node type, used to pre-validate node data
+        """
+        self.node_configs = {}
+        self.node_types = {}
+        self.node_datas = {}
+        self.start_node_id = None
+        for node_config in graph.get('nodes') or []:
+            node_id = node_config.get('id')
+            if not node_id:
+                continue
+
+            self.node_configs[node_id] = node_config
+
+            try:
+                node_type = NodeType.value_of(node_config.get('data', {}).get('type'))
+            except ValueError:
+                # invalid node type is reported when the node is going to run
+                continue
+
+            self.node_types[node_id] = node_type
+            if not self.start_node_id and node_type == NodeType.START:
+                self.start_node_id = node_id
+
+            node_cls = node_classes.get(node_type) if node_classes else None
+            if node_cls:
+                try:
+                    self.node_datas[node_id] = node_cls.get_node_data(node_config)
+                except Exception:
+                    # invalid node data is reported when the node is going to run
+                    pass
+
+        self.outgoing_edges = {}
+        for edge in graph.get('edges') or []:
+            source_node_id = edge.get('source')
+            target_node_id = edge.get('target')
+            if source_node_id not in self.node_configs or target_node_id not in self.node_configs:
+                continue
+
+            self.outgoing_edges.setdefault(source_node_id, []).append(edge)
+
+        # only edges coming from nodes reachable from the start node take part in join counting,
+        # otherwise a dangling node wired into a branch would block that branch forever
+        reachable_node_ids = self._get_reachable_node_ids()
+        self.in_degrees = {node_id: 0 for node_id in reachable_node_ids}
+        for source_node_id in reachable_node_ids:
+            for edge in self.outgoing_edges.get(source_node_id, []):
+                self.in_degrees[edge.get('target')] += 1
+
+        self.topological_order = self._get_topological_order()
+
+    def get_node_type(self, node_id: str) -> NodeType:
+        """
+        Get node type of node
+        :param node_id: node id
+        :return:
+        """
+        node_type = self.node_types.get(node_id)
+        if not node_type:
+            return NodeType.value_of(self.node_configs[node_id].get('data', {}).get('type'))
+
+        return node_type
+
+    def _get_reachable_node_ids(self) -> set[str]:
+        """
+        Get ids of all nodes reachable from the start node
+        :return:
+        """
+        if not self.start_node_id:
+            return set()
+
+        reachable_node_ids = {self.start_node_id}
+        queue = deque([self.start_node_id])
+        while queue:
+            node_id = queue.popleft()
+            for edge in self.outgoing_edges.get(node_id, []):
+                target_node_id = edge.get('target')
+                if target_node_id not in reachable_node_ids:
+                    reachable_node_ids.add(target_node_id)
+                    queue.append(target_node_id)
+
+        return reachable_node_ids
+
+    def _get_topological_order(self) -> list[str]:
+        """
+        Get topological order of nodes reachable from the start node, nodes on a cycle are left out
+        :return:
+        """
+        if not self.start_node_id:
+            return []
+
+        in_degrees = dict(self.in_degrees)
+        topological_order = []
+        queue = deque([self.start_node_id])
+        while queue:
+            node_id = queue.popleft()
+            topological_order.append(node_id)
+            for edge in self.outgoing_edges.get(node_id, []):
+                target_node_id = edge.get('target')
+                in_degrees[target_node_id] -= 1
+                if in_degrees[target_node_id] == 0:
+                    queue.append(target_node_id)
+
+        return topological_order
+
+
+class WorkflowGraphCache:
+    """
+    Process level LRU cache of compiled workflow graphs, keyed by workflow id and graph hash.
+    """
+    MAX_SIZE = 256
+
+    _cache = LRUCache(MAX_SIZE)
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, workflow_id: str, graph_hash: str) -> Optional[WorkflowGraph]:
+        """
+        Get compiled workflow graph
+        :param workflow_id: workflow id
+        :param graph_hash: hash of workflow graph
+        :return:
+        """
+        with cls._lock:
+            return cls._cache.get((workflow_id, graph_hash))
+
+    @classmethod
+    def set(cls, workflow_id: str, graph_hash: str, workflow_graph: WorkflowGraph) -> None:
+        """
+        Set compiled workflow graph
+        :param workflow_id: workflow id
+        :param graph_hash: hash of workflow graph
+        :param workflow_graph: compiled workflow graph
+        :return:
+        """
+        with cls._lock:
+            cls._cache.put((workflow_id, graph_hash), workflow_graph)
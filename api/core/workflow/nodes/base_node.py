@@ -50,7 +50,14 @@ class BaseNode(ABC):
                  user_id: str,
                  user_from: UserFrom,
                  config: dict,
-                 callbacks: list[BaseWorkflowCallback] = None) -> None:
+                 callbacks: list[BaseWorkflowCallback] = None,
+                 node_data: Optional[BaseNodeData] = None) -> None:
+        """
+        Init node
+        :param config: node config
+        :param callbacks: workflow callbacks
+        :param node_data: pre-validated node data of config, shared between runs and must not be modified
+        """
         self.tenant_id = tenant_id
         self.app_id = app_id
         self.workflow_id = workflow_id
@@ -61,7 +68,7 @@ class BaseNode(ABC):
         if not self.node_id:
             raise ValueError("Node ID is required.")
 
-        self.node_data = self._node_data_cls(**config.get("data", {}))
+        self.node_data = node_data or self.get_node_data(config)
         self.callbacks = callbacks or []
 
     @abstractmethod
@@ -104,6 +111,15 @@ class BaseNode(ABC):
                     }
                 )
 
+    @classmethod
+    def get_node_data(cls, config: dict) -> BaseNodeData:
+        """
+        Validate node data of node config
+        :param config: node config
+        :return:
+        """
+        return cls._node_data_cls(**config.get("data", {}))
+
     @classmethod
     def extract_variable_selector_to_variable_mapping(cls, config: dict) -> dict[str, list[str]]:
         """
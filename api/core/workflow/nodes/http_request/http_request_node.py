@@ -91,10 +91,12 @@ class HttpRequestNode(BaseNode):
         if timeout is None:
             return HTTP_REQUEST_DEFAULT_TIMEOUT
 
-        timeout.connect = min(timeout.connect, MAX_CONNECT_TIMEOUT)
-        timeout.read = min(timeout.read, MAX_READ_TIMEOUT)
-        timeout.write = min(timeout.write, MAX_WRITE_TIMEOUT)
-        return timeout
+        # node data may be shared between workflow runs, don't modify it in place
+        return timeout.copy(update={
+            'connect': min(timeout.connect, MAX_CONNECT_TIMEOUT),
+            'read': min(timeout.read, MAX_READ_TIMEOUT),
+            'write': min(timeout.write, MAX_WRITE_TIMEOUT),
+        })
 
     @classmethod
     def _extract_variable_selector_to_variable_mapping(cls, node_data: HttpRequestNodeData) -> dict[str, list[str]]:
@@ -8,6 +8,7 @@ from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotIni
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.model_entities import ModelFeature, ModelType
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
+from core.rag.datasource.retrieval_service import RetrievalService
 from core.rag.retrieval.dataset_retrieval import DatasetRetrieval
 from core.workflow.entities.base_node_data_entities import BaseNodeData
 from core.workflow.entities.node_entities import NodeRunResult, NodeType
@@ -15,7 +16,7 @@ from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.nodes.base_node import BaseNode
 from core.workflow.nodes.knowledge_retrieval.entities import KnowledgeRetrievalNodeData
 from extensions.ext_database import db
-from models.dataset import Dataset, Document, DocumentSegment
+from models.dataset import Dataset
 from models.workflow import WorkflowNodeExecutionStatus
 
 default_retrieval_model = {
@@ -147,33 +148,18 @@ class KnowledgeRetrievalNode(BaseNode):
                     document_score_list[item.metadata['doc_id']] = item.metadata['score']
 
             document_context_list = []
-            index_node_ids = [document.metadata['doc_id'] for document in all_documents]
-            segments = DocumentSegment.query.filter(
-                DocumentSegment.dataset_id.in_(dataset_ids),
-                DocumentSegment.completed_at.isnot(None),
-                DocumentSegment.status == 'completed',
-                DocumentSegment.enabled == True,
-                DocumentSegment.index_node_id.in_(index_node_ids)
-            ).all()
-            if segments:
-                index_node_id_to_position = {id: position for position, id in enumerate(index_node_ids)}
-                sorted_segments = sorted(segments,
-                                         key=lambda segment: index_node_id_to_position.get(segment.index_node_id,
-                                                                                           float('inf')))
+            sorted_segments = RetrievalService.fetch_segments(dataset_ids, all_documents)
+            if sorted_segments:
                 for segment in sorted_segments:
                     if segment.answer:
                         document_context_list.append(f'question:{segment.content} answer:{segment.answer}')
                     else:
                         document_context_list.append(segment.content)
 
+                datasets_by_id, documents_by_id = RetrievalService.fetch_segment_sources(sorted_segments)
                 for segment in sorted_segments:
-                    dataset = Dataset.query.filter_by(
-                        id=segment.dataset_id
-                    ).first()
-                    document = Document.query.filter(Document.id == segment.document_id,
-                                                     Document.enabled == True,
-                                                     Document.archived == False,
-                                                     ).first()
+                    dataset = datasets_by_id.get(segment.dataset_id)
+                    document = documents_by_id.get(segment.document_id)
                     resource_number = 1
                     if dataset and document:
 
@@ -7,6 +7,7 @@ from core.entities.model_entities import ModelStatus
 from core.entities.provider_entities import QuotaUnit
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.file.file_obj import FileVar
+from core.helper.provider_usage_accounting import ProviderUsageAccounting
 from core.memory.token_buffer_memory import TokenBufferMemory
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.llm_entities import LLMUsage
@@ -25,7 +26,7 @@ from core.workflow.nodes.llm.entities import LLMNodeData, ModelConfig
 from core.workflow.utils.variable_template_parser import VariableTemplateParser
 from extensions.ext_database import db
 from models.model import Conversation
-from models.provider import Provider, ProviderType
+from models.provider import ProviderType
 from models.workflow import WorkflowNodeExecutionStatus
 
 
@@ -499,9 +500,11 @@ class LLMNode(BaseNode):
         system_configuration = provider_configuration.system_configuration
 
         quota_unit = None
+        quota_limit = None
         for quota_configuration in system_configuration.quota_configurations:
             if quota_configuration.quota_type == system_configuration.current_quota_type:
                 quota_unit = quota_configuration.quota_unit
+                quota_limit = quota_configuration.quota_limit
 
                 if quota_configuration.quota_limit == -1:
                     return
@@ -521,14 +524,13 @@ class LLMNode(BaseNode):
                 used_quota = 1
 
         if used_quota is not None:
-            db.session.query(Provider).filter(
-                Provider.tenant_id == tenant_id,
-                Provider.provider_name == model_instance.provider,
-                Provider.provider_type == ProviderType.SYSTEM.value,
-                Provider.quota_type == system_configuration.current_quota_type.value,
-                Provider.quota_limit > Provider.quota_used
-            ).update({'quota_used': Provider.quota_used + used_quota})
-            db.session.commit()
+            ProviderUsageAccounting.deduct_quota(
+                tenant_id=tenant_id,
+                provider_name=model_instance.provider,
+                quota_type=system_configuration.current_quota_type,
+                quota_limit=quota_limit,
+                used_quota=used_quota
+            )
 
     @classmethod
     def _extract_variable_selector_to_variable_mapping(cls, node_data: BaseNodeData) -> dict[str, list[str]]:
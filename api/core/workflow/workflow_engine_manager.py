@@ -1,14 +1,20 @@
 import logging
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import Optional, cast
 
+from flask import Flask, current_app
+
 from core.app.app_config.entities import FileExtraConfig
 from core.app.apps.base_app_queue_manager import GenerateTaskStoppedException
 from core.file.file_obj import FileTransferMethod, FileType, FileVar
 from core.workflow.callbacks.base_workflow_callback import BaseWorkflowCallback
+from core.workflow.entities.base_node_data_entities import BaseNodeData
 from core.workflow.entities.node_entities import NodeRunMetadataKey, NodeRunResult, NodeType
-from core.workflow.entities.variable_pool import VariablePool, VariableValue
+from core.workflow.entities.variable_pool import VariablePool
 from core.workflow.entities.workflow_entities import WorkflowNodeAndResult, WorkflowRunState
+from core.workflow.entities.workflow_graph import WorkflowGraph, WorkflowGraphCache
 from core.workflow.errors import WorkflowNodeRunFailedError
 from core.workflow.nodes.answer.answer_node import AnswerNode
 from core.workflow.nodes.base_node import BaseNode, UserFrom
@@ -25,6 +31,7 @@ from core.workflow.nodes.template_transform.template_transform_node import Templ
 from core.workflow.nodes.tool.tool_node import ToolNode
 from core.workflow.nodes.variable_assigner.variable_assigner_node import VariableAssignerNode
 from extensions.ext_database import db
+from libs.helper import generate_text_hash
 from models.workflow import (
     Workflow,
     WorkflowNodeExecutionStatus,
@@ -94,19 +101,8 @@ class WorkflowEngineManager:
         :param callbacks: workflow callbacks
         :return:
         """
-        # fetch workflow graph
-        graph = workflow.graph_dict
-        if not graph:
-            raise ValueError('workflow graph not found')
-
-        if 'nodes' not in graph or 'edges' not in graph:
-            raise ValueError('nodes or edges not found in workflow graph')
-
-        if not isinstance(graph.get('nodes'), list):
-            raise ValueError('nodes in workflow graph must be a list')
-
-        if not isinstance(graph.get('edges'), list):
-            raise ValueError('edges in workflow graph must be a list')
+        # fetch compiled workflow graph
+        workflow_graph = self._get_workflow_graph(workflow)
 
         # init workflow run
         if callbacks:
@@ -126,55 +122,18 @@ class WorkflowEngineManager:
         )
 
         try:
-            predecessor_node = None
-            has_entry_node = False
-            while True:
-                # get next node, multiple target nodes in the future
-                next_node = self._get_next_node(
-                    workflow_run_state=workflow_run_state,
-                    graph=graph,
-                    predecessor_node=predecessor_node,
-                    callbacks=callbacks
-                )
-
-                if not next_node:
-                    break
-
-                # check is already ran
-                if next_node.node_id in [node_and_result.node.node_id
-                                         for node_and_result in workflow_run_state.workflow_nodes_and_results]:
-                    predecessor_node = next_node
-                    continue
-
-                has_entry_node = True
-
-                # max steps 30 reached
-                if len(workflow_run_state.workflow_nodes_and_results) > 30:
-                    raise ValueError('Max steps 30 reached.')
-
-                # or max execution time 10min reached
-                if self._is_timed_out(start_at=workflow_run_state.start_at, max_execution_time=600):
-                    raise ValueError('Max execution time 10min reached.')
-
-                # run workflow, run multiple target nodes in the future
-                self._run_workflow_node(
-                    workflow_run_state=workflow_run_state,
-                    node=next_node,
-                    predecessor_node=predecessor_node,
-                    callbacks=callbacks
-                )
-
-                if next_node.node_type in [NodeType.END]:
-                    break
-
-                predecessor_node = next_node
-
-            if not has_entry_node:
+            if not workflow_graph.start_node_id:
                 self._workflow_run_failed(
                     error='Start node not found in workflow graph.',
                     callbacks=callbacks
                 )
                 return
+
+            self._run_workflow_graph(
+                workflow_run_state=workflow_run_state,
+                workflow_graph=workflow_graph,
+                callbacks=callbacks
+            )
         except GenerateTaskStoppedException as e:
             return
         except Exception as e:
@@ -189,6 +148,35 @@ class WorkflowEngineManager:
             callbacks=callbacks
         )
 
+    def _get_workflow_graph(self, workflow: Workflow) -> WorkflowGraph:
+        """
+        Get compiled workflow graph, compiled graphs are cached by workflow id and graph hash
+        :param workflow: Workflow instance
+        :return:
+        """
+        graph_hash = generate_text_hash(workflow.graph)
+        workflow_graph = WorkflowGraphCache.get(workflow.id, graph_hash)
+        if workflow_graph:
+            return workflow_graph
+
+        graph = workflow.graph_dict
+        if not graph:
+            raise ValueError('workflow graph not found')
+
+        if 'nodes' not in graph or 'edges' not in graph:
+            raise ValueError('nodes or edges not found in workflow graph')
+
+        if not isinstance(graph.get('nodes'), list):
+            raise ValueError('nodes in workflow graph must be a list')
+
+        if not isinstance(graph.get('edges'), list):
+            raise ValueError('edges in workflow graph must be a list')
+
+        workflow_graph = WorkflowGraph(graph, node_classes)
+        WorkflowGraphCache.set(workflow.id, graph_hash, workflow_graph)
+
+        return workflow_graph
+
     def single_step_run_workflow_node(self, workflow: Workflow,
                                       node_id: str,
                                       user_id: str,
@@ -332,82 +320,166 @@ class WorkflowEngineManager:
                     error=error
                 )
 
-    def _get_next_node(self, workflow_run_state: WorkflowRunState,
-                       graph: dict,
-                       predecessor_node: Optional[BaseNode] = None,
-                       callbacks: list[BaseWorkflowCallback] = None) -> Optional[BaseNode]:
+    def _run_workflow_graph(self, workflow_run_state: WorkflowRunState,
+                            workflow_graph: WorkflowGraph,
+                            callbacks: list[BaseWorkflowCallback] = None) -> None:
         """
-        Get next node
-        multiple target nodes in the future.
-        :param graph: workflow graph
-        :param predecessor_node: predecessor node
+        Run workflow graph, nodes whose predecessors are all resolved run concurrently on a bounded worker pool
+        :param workflow_run_state: workflow run state
+        :param workflow_graph: compiled workflow graph
         :param callbacks: workflow callbacks
         :return:
         """
-        nodes = graph.get('nodes')
-        if not nodes:
-            return None
+        flask_app = current_app._get_current_object()
+        max_workers = int(flask_app.config.get('WORKFLOW_MAX_PARALLELISM') or 1)
+
+        # number of incoming edges of each node that are not resolved yet
+        unresolved_in_degrees = dict(workflow_graph.in_degrees)
+
+        # node id -> id of the latest predecessor which activated the node through a taken edge
+        activated_node_predecessors: dict[str, Optional[str]] = {}
+
+        ready_nodes: deque[tuple[str, Optional[str]]] = deque([(workflow_graph.start_node_id, None)])
+        running_nodes: dict[Future, BaseNode] = {}
+        steps = 0
+        end_node_reached = False
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='workflow_node')
+        succeeded = False
+        try:
+            while ready_nodes or running_nodes:
+                while ready_nodes and not end_node_reached:
+                    node_id, predecessor_node_id = ready_nodes.popleft()
+
+                    # max steps 30 reached
+                    if steps > 30:
+                        raise ValueError('Max steps 30 reached.')
 
-        if not predecessor_node:
-            for node_config in nodes:
-                if node_config.get('data', {}).get('type', '') == NodeType.START.value:
-                    return StartNode(
-                        tenant_id=workflow_run_state.tenant_id,
-                        app_id=workflow_run_state.app_id,
-                        workflow_id=workflow_run_state.workflow_id,
-                        user_id=workflow_run_state.user_id,
-                        user_from=workflow_run_state.user_from,
-                        config=node_config,
+                    steps += 1
+
+                    node = self._init_workflow_node(
+                        workflow_run_state=workflow_run_state,
+                        node_config=workflow_graph.node_configs[node_id],
+                        node_type=workflow_graph.get_node_type(node_id),
+                        node_data=workflow_graph.node_datas.get(node_id),
                         callbacks=callbacks
                     )
-        else:
-            edges = graph.get('edges')
-            source_node_id = predecessor_node.node_id
-
-            # fetch all outgoing edges from source node
-            outgoing_edges = [edge for edge in edges if edge.get('source') == source_node_id]
-            if not outgoing_edges:
-                return None
-
-            # fetch target node id from outgoing edges
-            outgoing_edge = None
-            source_handle = predecessor_node.node_run_result.edge_source_handle \
-                if predecessor_node.node_run_result else None
-            if source_handle:
-                for edge in outgoing_edges:
-                    if edge.get('sourceHandle') and edge.get('sourceHandle') == source_handle:
-                        outgoing_edge = edge
-                        break
-            else:
-                outgoing_edge = outgoing_edges[0]
 
-            if not outgoing_edge:
-                return None
-
-            target_node_id = outgoing_edge.get('target')
+                    future = executor.submit(
+                        self._run_workflow_node_in_app_context,
+                        flask_app=flask_app,
+                        workflow_run_state=workflow_run_state,
+                        node=node,
+                        predecessor_node_id=predecessor_node_id,
+                        callbacks=callbacks
+                    )
+                    running_nodes[future] = node
 
-            # fetch target node from target node id
-            target_node_config = None
-            for node in nodes:
-                if node.get('id') == target_node_id:
-                    target_node_config = node
+                if not running_nodes:
                     break
 
-            if not target_node_config:
-                return None
+                # or max execution time 10min reached
+                remaining_time = 600 - (time.perf_counter() - workflow_run_state.start_at)
+                done_futures, _ = wait(
+                    running_nodes.keys(),
+                    timeout=max(remaining_time, 0),
+                    return_when=FIRST_COMPLETED
+                )
+                if not done_futures:
+                    raise ValueError('Max execution time 10min reached.')
 
-            # get next node
-            target_node = node_classes.get(NodeType.value_of(target_node_config.get('data', {}).get('type')))
+                for future in done_futures:
+                    node = running_nodes.pop(future)
 
-            return target_node(
-                tenant_id=workflow_run_state.tenant_id,
-                app_id=workflow_run_state.app_id,
-                workflow_id=workflow_run_state.workflow_id,
-                user_id=workflow_run_state.user_id,
-                user_from=workflow_run_state.user_from,
-                config=target_node_config,
-                callbacks=callbacks
-            )
+                    # re-raise node failure or task stopped in the scheduler thread
+                    future.result()
+
+                    if node.node_type == NodeType.END:
+                        end_node_reached = True
+
+                    self._resolve_outgoing_edges(
+                        workflow_graph=workflow_graph,
+                        node=node,
+                        unresolved_in_degrees=unresolved_in_degrees,
+                        activated_node_predecessors=activated_node_predecessors,
+                        ready_nodes=ready_nodes
+                    )
+
+            succeeded = True
+        finally:
+            # wait for the running branches when the workflow ends normally,
+            # don't block on them when the workflow failed or stopped
+            executor.shutdown(wait=succeeded, cancel_futures=True)
+
+    def _resolve_outgoing_edges(self, workflow_graph: WorkflowGraph,
+                                node: BaseNode,
+                                unresolved_in_degrees: dict[str, int],
+                                activated_node_predecessors: dict[str, Optional[str]],
+                                ready_nodes: deque[tuple[str, Optional[str]]]) -> None:
+        """
+        Resolve outgoing edges of a finished node and push the nodes that became ready.
+        Edges not matching the source handle of a branch node are skipped, and nodes whose incoming edges
+        are all skipped are skipped as well, so merge points after a branch don't wait forever.
+        :param workflow_graph: compiled workflow graph
+        :param node: finished node
+        :param unresolved_in_degrees: number of unresolved incoming edges of nodes
+        :param activated_node_predecessors: activated nodes and their predecessor node id
+        :param ready_nodes: ready nodes queue
+        :return:
+        """
+        source_handle = node.node_run_result.edge_source_handle if node.node_run_result else None
+
+        resolved_edges = []
+        for edge in workflow_graph.outgoing_edges.get(node.node_id, []):
+            is_taken = not source_handle or edge.get('sourceHandle') == source_handle
+            resolved_edges.append((edge, node.node_id if is_taken else None))
+
+        while resolved_edges:
+            edge, predecessor_node_id = resolved_edges.pop()
+            target_node_id = edge.get('target')
+            if target_node_id not in unresolved_in_degrees:
+                continue
+
+            if predecessor_node_id:
+                activated_node_predecessors[target_node_id] = predecessor_node_id
+
+            unresolved_in_degrees[target_node_id] -= 1
+            if unresolved_in_degrees[target_node_id] > 0:
+                continue
+
+            if target_node_id in activated_node_predecessors:
+                ready_nodes.append((target_node_id, activated_node_predecessors[target_node_id]))
+            else:
+                # skip node and propagate the skip to its successors
+                resolved_edges.extend(
+                    (skipped_edge, None) for skipped_edge in workflow_graph.outgoing_edges.get(target_node_id, [])
+                )
+
+    def _init_workflow_node(self, workflow_run_state: WorkflowRunState,
+                            node_config: dict,
+                            node_type: NodeType,
+                            node_data: Optional[BaseNodeData] = None,
+                            callbacks: list[BaseWorkflowCallback] = None) -> BaseNode:
+        """
+        Init workflow node
+        :param workflow_run_state: workflow run state
+        :param node_config: node config
+        :param node_type: node type
+        :param node_data: pre-validated node data
+        :param callbacks: workflow callbacks
+        :return:
+        """
+        node_cls = node_classes.get(node_type)
+        return node_cls(
+            tenant_id=workflow_run_state.tenant_id,
+            app_id=workflow_run_state.app_id,
+            workflow_id=workflow_run_state.workflow_id,
+            user_id=workflow_run_state.user_id,
+            user_from=workflow_run_state.user_from,
+            config=node_config,
+            callbacks=callbacks,
+            node_data=node_data
+        )
 
     def _is_timed_out(self, start_at: float, max_execution_time: int) -> bool:
         """
@@ -418,34 +490,50 @@ class WorkflowEngineManager:
         """
         return time.perf_counter() - start_at > max_execution_time
 
+    def _run_workflow_node_in_app_context(self, flask_app: Flask,
+                                          workflow_run_state: WorkflowRunState,
+                                          node: BaseNode,
+                                          predecessor_node_id: Optional[str] = None,
+                                          callbacks: list[BaseWorkflowCallback] = None) -> None:
+        with flask_app.app_context():
+            self._run_workflow_node(
+                workflow_run_state=workflow_run_state,
+                node=node,
+                predecessor_node_id=predecessor_node_id,
+                callbacks=callbacks
+            )
+
     def _run_workflow_node(self, workflow_run_state: WorkflowRunState,
                            node: BaseNode,
-                           predecessor_node: Optional[BaseNode] = None,
+                           predecessor_node_id: Optional[str] = None,
                            callbacks: list[BaseWorkflowCallback] = None) -> None:
+        workflow_nodes_and_result = WorkflowNodeAndResult(
+            node=node,
+            result=None
+        )
+
+        # add to workflow_nodes_and_results
+        with workflow_run_state.lock:
+            workflow_run_state.workflow_nodes_and_results.append(workflow_nodes_and_result)
+            node_run_index = len(workflow_run_state.workflow_nodes_and_results)
+
         if callbacks:
             for callback in callbacks:
                 callback.on_workflow_node_execute_started(
                     node_id=node.node_id,
                     node_type=node.node_type,
                     node_data=node.node_data,
-                    node_run_index=len(workflow_run_state.workflow_nodes_and_results) + 1,
-                    predecessor_node_id=predecessor_node.node_id if predecessor_node else None
+                    node_run_index=node_run_index,
+                    predecessor_node_id=predecessor_node_id
                 )
 
         db.session.close()
 
-        workflow_nodes_and_result = WorkflowNodeAndResult(
-            node=node,
-            result=None
-        )
-
-        # add to workflow_nodes_and_results
-        workflow_run_state.workflow_nodes_and_results.append(workflow_nodes_and_result)
-
         try:
             # run node, result must have inputs, process_data, outputs, execution_metadata
+            # node reads a snapshot, so outputs of parallel branches appended meanwhile don't change its inputs
             node_run_result = node.run(
-                variable_pool=workflow_run_state.variable_pool
+                variable_pool=workflow_run_state.variable_pool.snapshot()
             )
         except GenerateTaskStoppedException as e:
             node_run_result = NodeRunResult(
@@ -492,49 +580,19 @@ class WorkflowEngineManager:
 
         if node_run_result.outputs:
             for variable_key, variable_value in node_run_result.outputs.items():
-                # append variables to variable pool recursively
-                self._append_variables_recursively(
-                    variable_pool=workflow_run_state.variable_pool,
+                # append variables to variable pool, nested values are resolved by the variable pool on read
+                workflow_run_state.variable_pool.append_variable(
                     node_id=node.node_id,
                     variable_key_list=[variable_key],
-                    variable_value=variable_value
+                    value=variable_value
                 )
 
         if node_run_result.metadata and node_run_result.metadata.get(NodeRunMetadataKey.TOTAL_TOKENS):
-            workflow_run_state.total_tokens += int(node_run_result.metadata.get(NodeRunMetadataKey.TOTAL_TOKENS))
+            with workflow_run_state.lock:
+                workflow_run_state.total_tokens += int(node_run_result.metadata.get(NodeRunMetadataKey.TOTAL_TOKENS))
 
         db.session.close()
 
-    def _append_variables_recursively(self, variable_pool: VariablePool,
-                                      node_id: str,
-                                      variable_key_list: list[str],
-                                      variable_value: VariableValue):
-        """
-        Append variables recursively
-        :param variable_pool: variable pool
-        :param node_id: node id
-        :param variable_key_list: variable key list
-        :param variable_value: variable value
-        :return:
-        """
-        variable_pool.append_variable(
-            node_id=node_id,
-            variable_key_list=variable_key_list,
-            value=variable_value
-        )
-
-        # if variable_value is a dict, then recursively append variables
-        if isinstance(variable_value, dict):
-            for key, value in variable_value.items():
-                # construct new key list
-                new_key_list = variable_key_list + [key]
-                self._append_variables_recursively(
-                    variable_pool=variable_pool,
-                    node_id=node_id,
-                    variable_key_list=new_key_list,
-                    variable_value=value
-                )
-
     @classmethod
     def handle_special_values(cls, value: Optional[dict]) -> Optional[dict]:
         """
@@ -5,6 +5,7 @@ set -e
 if [[ "${MIGRATION_ENABLED}" == "true" ]]; then
   echo "Running migrations"
   flask db upgrade
+  flask migrate-keyword-postings
 fi
 
 if [[ "${MODE}" == "worker" ]]; then
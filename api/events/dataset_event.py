@@ -2,3 +2,6 @@ from blinker import signal
 
 # sender: dataset
 dataset_was_deleted = signal('dataset-was-deleted')
+
+# sender: dataset
+dataset_index_was_updated = signal('dataset-index-was-updated')
@@ -1,8 +1,8 @@
 from core.app.entities.app_invoke_entities import AgentChatAppGenerateEntity, ChatAppGenerateEntity
 from core.entities.provider_entities import QuotaUnit
+from core.helper.provider_usage_accounting import ProviderUsageAccounting
 from events.message_event import message_was_created
-from extensions.ext_database import db
-from models.provider import Provider, ProviderType
+from models.provider import ProviderType
 
 
 @message_was_created.connect
@@ -23,9 +23,11 @@ def handle(sender, **kwargs):
     system_configuration = provider_configuration.system_configuration
 
     quota_unit = None
+    quota_limit = None
     for quota_configuration in system_configuration.quota_configurations:
         if quota_configuration.quota_type == system_configuration.current_quota_type:
             quota_unit = quota_configuration.quota_unit
+            quota_limit = quota_configuration.quota_limit
 
             if quota_configuration.quota_limit == -1:
                 return
@@ -45,11 +47,10 @@ def handle(sender, **kwargs):
             used_quota = 1
 
     if used_quota is not None:
-        db.session.query(Provider).filter(
-            Provider.tenant_id == application_generate_entity.app_config.tenant_id,
-            Provider.provider_name == model_config.provider,
-            Provider.provider_type == ProviderType.SYSTEM.value,
-            Provider.quota_type == system_configuration.current_quota_type.value,
-            Provider.quota_limit > Provider.quota_used
-        ).update({'quota_used': Provider.quota_used + used_quota})
-        db.session.commit()
+        ProviderUsageAccounting.deduct_quota(
+            tenant_id=application_generate_entity.app_config.tenant_id,
+            provider_name=model_config.provider,
+            quota_type=system_configuration.current_quota_type,
+            quota_limit=quota_limit,
+            used_quota=used_quota
+        )
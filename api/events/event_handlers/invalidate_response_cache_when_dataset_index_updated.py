@@ -0,0 +1,8 @@
+from core.app.features.response_cache.response_cache import ResponseCacheFeature
+from events.dataset_event import dataset_index_was_updated
+
+
+@dataset_index_was_updated.connect
+def handle(sender, **kwargs):
+    dataset = sender
+    ResponseCacheFeature.invalidate_datasets([dataset.id])
@@ -42,6 +42,7 @@ def init_app(app: Flask) -> Celery:
     imports = [
         "schedule.clean_embedding_cache_task",
         "schedule.clean_unused_datasets_task",
+        "schedule.flush_provider_usage_task",
     ]
 
     beat_schedule = {
@@ -52,6 +53,10 @@ def init_app(app: Flask) -> Celery:
         'clean_unused_datasets_task': {
             'task': 'schedule.clean_unused_datasets_task.clean_unused_datasets_task',
             'schedule': timedelta(days=1),
+        },
+        'flush_provider_usage_task': {
+            'task': 'schedule.flush_provider_usage_task.flush_provider_usage_task',
+            'schedule': timedelta(seconds=app.config["PROVIDER_USAGE_FLUSH_INTERVAL"]),
         }
     }
     celery_app.conf.update(
@@ -1,8 +1,11 @@
 import json
 import logging
 import pickle
+import struct
 from json import JSONDecodeError
+from typing import Union
 
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -495,6 +498,21 @@ class DatasetKeywordTable(db.Model):
                 return None
 
 
+class DatasetKeywordPosting(db.Model):
+    __tablename__ = 'dataset_keyword_postings'
+    __table_args__ = (
+        db.PrimaryKeyConstraint('id', name='dataset_keyword_posting_pkey'),
+        db.Index('dataset_keyword_posting_keyword_idx', 'dataset_id', 'keyword'),
+        db.UniqueConstraint('dataset_id', 'index_node_id', 'keyword', name='dataset_keyword_posting_unique'),
+    )
+
+    id = db.Column(StringUUID, primary_key=True, server_default=db.text('uuid_generate_v4()'))
+    dataset_id = db.Column(StringUUID, nullable=False)
+    keyword = db.Column(db.String(255), nullable=False)
+    index_node_id = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.text('CURRENT_TIMESTAMP(0)'))
+
+
 class Embedding(db.Model):
     __tablename__ = 'embeddings'
     __table_args__ = (
@@ -511,11 +529,33 @@ class Embedding(db.Model):
     provider_name = db.Column(db.String(40), nullable=False,
                               server_default=db.text("''::character varying"))
 
-    def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+    # binary embedding layout: magic, dtype code and dimension header followed by raw little-endian vector bytes,
+    # embeddings stored before are pickled python float lists
+    EMBEDDING_MAGIC = b'EMB\x01'
+    EMBEDDING_HEADER = struct.Struct('<4sBI')
+    EMBEDDING_DTYPES = {
+        1: np.dtype('<f4')
+    }
+
+    def set_embedding(self, embedding_data: Union[list[float], np.ndarray]):
+        self.embedding = self.encode_embedding(embedding_data)
 
     def get_embedding(self) -> list[float]:
-        return pickle.loads(self.embedding)
+        return self.decode_embedding(self.embedding).tolist()
+
+    @classmethod
+    def encode_embedding(cls, embedding_data: Union[list[float], np.ndarray]) -> bytes:
+        vector = np.asarray(embedding_data, dtype=cls.EMBEDDING_DTYPES[1])
+        return cls.EMBEDDING_HEADER.pack(cls.EMBEDDING_MAGIC, 1, vector.shape[0]) + vector.tobytes()
+
+    @classmethod
+    def decode_embedding(cls, data: bytes) -> np.ndarray:
+        if data[:len(cls.EMBEDDING_MAGIC)] != cls.EMBEDDING_MAGIC:
+            return np.asarray(pickle.loads(data), dtype=np.float64)
+
+        _, dtype_code, dim = cls.EMBEDDING_HEADER.unpack_from(data)
+        return np.frombuffer(data, dtype=cls.EMBEDDING_DTYPES[dtype_code],
+                             count=dim, offset=cls.EMBEDDING_HEADER.size)
 
 
 class DatasetCollectionBinding(db.Model):
@@ -220,6 +220,7 @@ class AppModelConfig(db.Model):
     speech_to_text = db.Column(db.Text)
     text_to_speech = db.Column(db.Text)
     more_like_this = db.Column(db.Text)
+    response_cache = db.Column(db.Text)
     model = db.Column(db.Text)
     user_input_form = db.Column(db.Text)
     dataset_query_variable = db.Column(db.String(255))
@@ -290,6 +291,10 @@ class AppModelConfig(db.Model):
     def more_like_this_dict(self) -> dict:
         return json.loads(self.more_like_this) if self.more_like_this else {"enabled": False}
 
+    @property
+    def response_cache_dict(self) -> dict:
+        return json.loads(self.response_cache) if self.response_cache else {"enabled": False}
+
     @property
     def sensitive_word_avoidance_dict(self) -> dict:
         return json.loads(self.sensitive_word_avoidance) if self.sensitive_word_avoidance \
@@ -343,6 +348,7 @@ class AppModelConfig(db.Model):
             "retriever_resource": self.retriever_resource_dict,
             "annotation_reply": self.annotation_reply_dict,
             "more_like_this": self.more_like_this_dict,
+            "response_cache": self.response_cache_dict,
             "sensitive_word_avoidance": self.sensitive_word_avoidance_dict,
             "external_data_tools": self.external_data_tools_list,
             "model": self.model_dict,
@@ -369,6 +375,8 @@ class AppModelConfig(db.Model):
             if model_config.get('text_to_speech') else None
         self.more_like_this = json.dumps(model_config['more_like_this']) \
             if model_config.get('more_like_this') else None
+        self.response_cache = json.dumps(model_config['response_cache']) \
+            if model_config.get('response_cache') else None
         self.sensitive_word_avoidance = json.dumps(model_config['sensitive_word_avoidance']) \
             if model_config.get('sensitive_word_avoidance') else None
         self.external_data_tools = json.dumps(model_config['external_data_tools']) \
@@ -404,6 +412,7 @@ class AppModelConfig(db.Model):
             speech_to_text=self.speech_to_text,
             text_to_speech=self.text_to_speech,
             more_like_this=self.more_like_this,
+            response_cache=self.response_cache,
             sensitive_word_avoidance=self.sensitive_word_avoidance,
             external_data_tools=self.external_data_tools,
             model=self.model,
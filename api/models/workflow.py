@@ -303,6 +303,25 @@ class WorkflowRun(db.Model):
         return db.session.query(Workflow).filter(Workflow.id == self.workflow_id).first()
 
 
+class WorkflowRunSequence(db.Model):
+    """
+    Workflow Run Sequence, the last sequence number allocated to a workflow run of an App
+
+    Attributes:
+
+    - app_id (uuid) App ID
+    - sequence_number (int) Last allocated sequence number
+    """
+
+    __tablename__ = 'workflow_run_sequences'
+    __table_args__ = (
+        db.PrimaryKeyConstraint('app_id', name='workflow_run_sequence_pkey'),
+    )
+
+    app_id = db.Column(StringUUID, nullable=False)
+    sequence_number = db.Column(db.Integer, nullable=False)
+
+
 class WorkflowNodeExecutionTriggeredFrom(Enum):
     """
     Workflow Node Execution Triggered From Enum
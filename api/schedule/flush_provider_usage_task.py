@@ -0,0 +1,16 @@
+import time
+
+import click
+
+import app
+from core.helper.provider_usage_accounting import ProviderUsageAccounting
+
+
+@app.celery.task(queue='generation')
+def flush_provider_usage_task():
+    start_at = time.perf_counter()
+    flushed = ProviderUsageAccounting.flush()
+    end_at = time.perf_counter()
+    if flushed:
+        click.echo(click.style('Flushed {} provider usage entries latency: {}'.format(flushed, end_at - start_at),
+                               fg='green'))
@@ -7,6 +7,7 @@ from sqlalchemy import or_
 from werkzeug.datastructures import FileStorage
 from werkzeug.exceptions import NotFound
 
+from core.app.features.annotation_reply.annotation_matcher import AnnotationMatcher
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
 from models.model import App, AppAnnotationHitHistory, AppAnnotationSetting, Message, MessageAnnotation
@@ -65,6 +66,7 @@ class AppAnnotationService:
             )
         db.session.add(annotation)
         db.session.commit()
+        AnnotationMatcher.invalidate(app_id)
         # if annotation reply is enabled , add annotation to index
         annotation_setting = db.session.query(AppAnnotationSetting).filter(
             AppAnnotationSetting.app_id == app_id).first()
@@ -182,6 +184,7 @@ class AppAnnotationService:
         )
         db.session.add(annotation)
         db.session.commit()
+        AnnotationMatcher.invalidate(app_id)
         # if annotation reply is enabled , add annotation to index
         annotation_setting = db.session.query(AppAnnotationSetting).filter(
             AppAnnotationSetting.app_id == app_id).first()
@@ -211,6 +214,7 @@ class AppAnnotationService:
         annotation.question = args['question']
 
         db.session.commit()
+        AnnotationMatcher.invalidate(app_id)
         # if annotation reply is enabled , add annotation to index
         app_annotation_setting = db.session.query(AppAnnotationSetting).filter(
             AppAnnotationSetting.app_id == app_id
@@ -251,6 +255,7 @@ class AppAnnotationService:
                 db.session.delete(annotation_hit_history)
 
         db.session.commit()
+        AnnotationMatcher.invalidate(app_id)
         # if annotation reply is enabled , delete annotation index
         app_annotation_setting = db.session.query(AppAnnotationSetting).filter(
             AppAnnotationSetting.app_id == app_id
@@ -418,6 +423,7 @@ class AppAnnotationService:
         annotation_setting.updated_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
         db.session.add(annotation_setting)
         db.session.commit()
+        AnnotationMatcher.invalidate(app_id)
 
         collection_binding_detail = annotation_setting.collection_binding_detail
 
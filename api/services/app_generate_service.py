@@ -1,10 +1,12 @@
 from collections.abc import Generator
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 from core.app.apps.advanced_chat.app_generator import AdvancedChatAppGenerator
 from core.app.apps.agent_chat.app_generator import AgentChatAppGenerator
+from core.app.apps.base_app_queue_manager import AppQueueManager
 from core.app.apps.chat.app_generator import ChatAppGenerator
 from core.app.apps.completion.app_generator import CompletionAppGenerator
+from core.app.apps.task_stream_broker import TaskStreamBroker
 from core.app.apps.workflow.app_generator import WorkflowAppGenerator
 from core.app.entities.app_invoke_entities import InvokeFrom
 from models.model import Account, App, AppMode, EndUser
@@ -96,6 +98,24 @@ class AppGenerateService:
             stream=streaming
         )
 
+    @classmethod
+    def attach_stream(cls, task_id: str, user: Union[Account, EndUser], invoke_from: InvokeFrom,
+                      last_event_id: Optional[str] = None) -> Optional[Generator]:
+        """
+        Attach to the event stream of a running or finished task of user, to resume a dropped stream
+        :param task_id: task id
+        :param user: user
+        :param invoke_from: invoke from
+        :param last_event_id: id of the last received event
+        :return: None if the stream doesn't exist, or queue backend isn't redis streams
+        """
+        if (not TaskStreamBroker.is_enabled()
+                or not AppQueueManager.is_task_owner(task_id, invoke_from, user.id)
+                or not TaskStreamBroker.exists(task_id)):
+            return None
+
+        return TaskStreamBroker.attach(task_id, last_event_id)
+
     @classmethod
     def _get_workflow(cls, app_model: App, invoke_from: InvokeFrom) -> Any:
         """
@@ -16,7 +16,7 @@ from core.model_runtime.entities.model_entities import ModelType
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 from core.rag.datasource.keyword.keyword_factory import Keyword
 from core.rag.models.document import Document as RAGDocument
-from events.dataset_event import dataset_was_deleted
+from events.dataset_event import dataset_index_was_updated, dataset_was_deleted
 from events.document_event import document_was_deleted
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
@@ -230,6 +230,8 @@ class DatasetService:
         dataset.query.filter_by(id=dataset_id).update(filtered_data)
 
         db.session.commit()
+        # retrieval settings changed
+        dataset_index_was_updated.send(dataset)
         if action:
             deal_dataset_vector_index_task.delay(dataset_id, action)
         return dataset
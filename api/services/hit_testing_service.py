@@ -94,17 +94,18 @@ class HitTestingService:
 
         query_position = tsne_position_data.pop(0)
 
+        segments = db.session.query(DocumentSegment).filter(
+            DocumentSegment.dataset_id == dataset.id,
+            DocumentSegment.enabled == True,
+            DocumentSegment.status == 'completed',
+            DocumentSegment.index_node_id.in_([document.metadata['doc_id'] for document in documents])
+        ).all() if documents else []
+        segments_by_index_node_id = {segment.index_node_id: segment for segment in segments}
+
         i = 0
         records = []
         for document in documents:
-            index_node_id = document.metadata['doc_id']
-
-            segment = db.session.query(DocumentSegment).filter(
-                DocumentSegment.dataset_id == dataset.id,
-                DocumentSegment.enabled == True,
-                DocumentSegment.status == 'completed',
-                DocumentSegment.index_node_id == index_node_id
-            ).first()
+            segment = segments_by_index_node_id.get(document.metadata['doc_id'])
 
             if not segment:
                 i += 1
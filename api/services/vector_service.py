@@ -3,6 +3,7 @@ from typing import Optional
 from core.rag.datasource.keyword.keyword_factory import Keyword
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
+from events.dataset_event import dataset_index_was_updated
 from models.dataset import Dataset, DocumentSegment
 
 
@@ -38,6 +39,8 @@ class VectorService:
         else:
             keyword.add_texts(documents)
 
+        dataset_index_was_updated.send(dataset)
+
     @classmethod
     def update_segment_vector(cls, keywords: Optional[list[str]], segment: DocumentSegment, dataset: Dataset):
         # update segment index task
@@ -69,3 +72,5 @@ class VectorService:
             keyword.add_texts([document], keywords_list=[keywords])
         else:
             keyword.add_texts([document])
+
+        dataset_index_was_updated.send(dataset)
@@ -5,6 +5,7 @@ import click
 from celery import shared_task
 from werkzeug.exceptions import NotFound
 
+from core.app.features.annotation_reply.annotation_matcher import AnnotationMatcher
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from extensions.ext_database import db
@@ -83,6 +84,7 @@ def batch_import_annotations_task(job_id: str, content_list: list[dict], app_id:
                 vector.create(documents, duplicate_check=True)
 
             db.session.commit()
+            AnnotationMatcher.invalidate(app_id)
             redis_client.setex(indexing_cache_key, 600, 'completed')
             end_at = time.perf_counter()
             logging.info(
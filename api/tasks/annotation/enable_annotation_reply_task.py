@@ -6,6 +6,7 @@ import click
 from celery import shared_task
 from werkzeug.exceptions import NotFound
 
+from core.app.features.annotation_reply.annotation_matcher import AnnotationMatcher
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.models.document import Document
 from extensions.ext_database import db
@@ -91,6 +92,7 @@ def enable_annotation_reply_task(job_id: str, app_id: str, user_id: str, tenant_
                                 fg='red'))
             vector.create(documents)
         db.session.commit()
+        AnnotationMatcher.invalidate(app_id)
         redis_client.setex(enable_app_annotation_job_key, 600, 'completed')
         end_at = time.perf_counter()
         logging.info(
@@ -1,7 +1,29 @@
 import os
+from collections.abc import Generator
+
+import pytest
+from flask import Flask
 
 # Getting the absolute path of the current file's directory
 ABS_PATH = os.path.dirname(os.path.abspath(__file__))
 
 # Getting the absolute path of the project's root directory
 PROJECT_DIR = os.path.abspath(os.path.join(ABS_PATH, os.pardir, os.pardir))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'app_config(**config): config of the flask_app fixture')
+
+
+@pytest.fixture
+def flask_app(request) -> Generator[Flask, None, None]:
+    """
+    Flask app with the config of the closest app_config marker, in an app context
+    """
+    app = Flask(__name__)
+    marker = request.node.get_closest_marker('app_config')
+    if marker:
+        app.config.update(marker.kwargs)
+
+    with app.app_context():
+        yield app
@@ -0,0 +1,80 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.app.apps.chat.generate_response_converter import ChatAppGenerateResponseConverter
+from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueueLLMChunkEvent, QueueMessageEndEvent
+from core.app.entities.task_entities import ChatbotAppStreamResponse, MessageStreamResponse, PingStreamResponse
+from core.model_runtime.entities.llm_entities import LLMResultChunk, LLMResultChunkDelta, LLMUsage
+from core.model_runtime.entities.message_entities import AssistantPromptMessage
+
+
+def _chat_stream_response(stream_response) -> ChatbotAppStreamResponse:
+    return ChatbotAppStreamResponse(
+        conversation_id='conversation',
+        message_id='message',
+        created_at=1700000000,
+        stream_response=stream_response
+    )
+
+
+def test_message_chunks_rendered_like_json_dumps():
+    answers = ['Hello', ' "wörld"\n', '']
+    stream = [_chat_stream_response(MessageStreamResponse(task_id='task', id='message', answer=answer))
+              for answer in answers]
+    stream.insert(1, _chat_stream_response(PingStreamResponse(task_id='task')))
+
+    chunks = list(ChatAppGenerateResponseConverter.convert_stream_full_response(iter(stream)))
+
+    assert chunks[1] == 'ping'
+    for chunk, answer in zip([chunks[0]] + chunks[2:], answers):
+        assert json.loads(chunk) == {
+            'event': 'message',
+            'conversation_id': 'conversation',
+            'message_id': 'message',
+            'created_at': 1700000000,
+            'task_id': 'task',
+            'id': 'message',
+            'answer': answer
+        }
+    assert chunks[0] == json.dumps(json.loads(chunks[0]))
+
+
+def _chunk_event(text: str, usage=None) -> QueueLLMChunkEvent:
+    return QueueLLMChunkEvent(chunk=LLMResultChunk(
+        model='model',
+        prompt_messages=[],
+        delta=LLMResultChunkDelta(index=0, message=AssistantPromptMessage(content=text), usage=usage)
+    ))
+
+
+@pytest.mark.app_config(STREAM_COALESCE_WINDOW_MS=1000, STREAM_COALESCE_MAX_SIZE=8)
+@patch('core.app.apps.task_stop_registry.TaskStopRegistry.register')
+@patch('core.app.apps.base_app_queue_manager.redis_client')
+def test_listen_coalesces_text_chunks(redis_client, register, flask_app):
+    register.return_value.is_set.return_value = False
+    queue_manager = MessageBasedAppQueueManager(
+        task_id='task',
+        user_id='user',
+        invoke_from=InvokeFrom.SERVICE_API,
+        conversation_id='conversation',
+        app_mode='chat',
+        message_id='message'
+    )
+
+    for text in ['a', 'b', 'c']:
+        queue_manager.publish(_chunk_event(text), PublishFrom.APPLICATION_MANAGER)
+    # max size reached
+    queue_manager.publish(_chunk_event('0123456789'), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(_chunk_event('d', usage=LLMUsage.empty_usage()), PublishFrom.APPLICATION_MANAGER)
+    queue_manager.publish(QueueMessageEndEvent(), PublishFrom.APPLICATION_MANAGER)
+
+    events = [message.event for message in queue_manager.listen()]
+
+    assert [event.chunk.delta.message.content for event in events[:-1]] == ['abc0123456789', 'd']
+    assert events[1].chunk.delta.usage is not None
+    assert isinstance(events[-1], QueueMessageEndEvent)
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from core.app.apps.task_stop_registry import TaskStopRegistry
+
+
+@patch('core.app.apps.task_stop_registry.PubSubSubscriber')
+@patch('core.app.apps.task_stop_registry.redis_client')
+def test_stop_sets_local_flag(redis_client, _):
+    redis_client.exists.return_value = 0
+    flag = TaskStopRegistry.register('task')
+    assert not flag.is_set()
+
+    TaskStopRegistry.stop('task')
+    redis_client.setex.assert_called_once_with('generate_task_stopped:task', TaskStopRegistry.STOPPED_KEY_TTL, 1)
+    redis_client.publish.assert_called_once_with(TaskStopRegistry.CHANNEL, 'task')
+
+    # received by the subscriber
+    TaskStopRegistry._set_stopped('other')
+    assert not flag.is_set()
+    TaskStopRegistry._set_stopped('task')
+    assert flag.is_set()
+
+
+@patch('core.app.apps.task_stop_registry.PubSubSubscriber')
+@patch('core.app.apps.task_stop_registry.redis_client')
+def test_stopped_before_registered_or_subscribed(redis_client, _):
+    redis_client.exists.return_value = 1
+    assert TaskStopRegistry.register('stopped').is_set()
+
+    redis_client.exists.return_value = 0
+    flag = TaskStopRegistry.register('missed')
+    other_flag = TaskStopRegistry.register('running')
+    redis_client.mget.side_effect = lambda keys: [b'1' if key == 'generate_task_stopped:missed' else None
+                                                  for key in keys]
+
+    TaskStopRegistry._sync_stopped()
+    assert flag.is_set()
+    assert not other_flag.is_set()
+
+
+@patch('core.app.apps.task_stop_registry.PubSubSubscriber')
+@patch('core.app.apps.task_stop_registry.redis_client')
+def test_flags_dropped_with_task(redis_client, _):
+    redis_client.exists.return_value = 0
+    TaskStopRegistry.register('finished')
+    assert 'finished' not in TaskStopRegistry._flags
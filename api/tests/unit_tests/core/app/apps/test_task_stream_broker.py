@@ -0,0 +1,85 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.app.apps.task_stream_broker import TaskStreamBroker, TaskStreamPoolFullError
+
+pytestmark = pytest.mark.app_config(
+    APP_QUEUE_BACKEND='redis_stream',
+    APP_QUEUE_STREAM_MAXLEN=100,
+    APP_QUEUE_STREAM_TTL=600,
+    APP_QUEUE_STREAM_MAX_WORKERS=2
+)
+
+
+def test_relay_memory_backend_or_blocking_response(flask_app):
+    assert TaskStreamBroker.relay('task', {'answer': 'hello'}) == {'answer': 'hello'}
+
+    flask_app.config['APP_QUEUE_BACKEND'] = 'memory'
+    response = iter(['data: {}\n\n'])
+    assert TaskStreamBroker.relay('task', response) is response
+
+
+@patch('core.app.apps.task_stream_broker.redis_client')
+def test_produce(redis_client, flask_app):
+    pipeline = MagicMock()
+    redis_client.pipeline.return_value = pipeline
+
+    TaskStreamBroker._slots = threading.BoundedSemaphore(1)
+    TaskStreamBroker._slots.acquire()
+    TaskStreamBroker._produce(flask_app, 'task', iter(['data: {"answer": "a"}\n\n', 'event: ping\n\n']))
+
+    assert [call.args[1] for call in pipeline.xadd.call_args_list] == [
+        {'chunk': 'data: {"answer": "a"}\n\n'},
+        {'chunk': 'event: ping\n\n'},
+        {'end': 1}
+    ]
+    pipeline.xadd.assert_called_with('generate_task_stream:task', {'end': 1}, maxlen=100, approximate=True)
+    pipeline.expire.assert_called_with('generate_task_stream:task', 600)
+    # slot of the task released
+    assert TaskStreamBroker._slots.acquire(blocking=False)
+
+
+@patch('core.app.apps.task_stream_broker.TaskStopRegistry')
+@patch.object(TaskStreamBroker, 'attach')
+def test_relay_rejected_when_pool_is_full(attach, task_stop_registry, flask_app):
+    TaskStreamBroker._executor = None
+    release = threading.Event()
+
+    def response():
+        release.wait(5)
+        yield 'data: {}\n\n'
+
+    with patch.object(TaskStreamBroker, '_append'):
+        busy_responses = [response() for _ in range(2)]
+        for index, busy_response in enumerate(busy_responses):
+            TaskStreamBroker.relay(f'task-{index}', busy_response)
+        assert attach.call_count == 2
+
+        # no worker to produce the stream, generation is stopped instead of queued
+        with pytest.raises(TaskStreamPoolFullError):
+            TaskStreamBroker.relay('task-2', response())
+        task_stop_registry.stop.assert_called_once_with('task-2')
+
+        release.set()
+        TaskStreamBroker._executor.shutdown(wait=True)
+
+    TaskStreamBroker._executor = None
+
+
+@patch('core.app.apps.task_stream_broker.redis_client')
+def test_attach_resumes_after_last_event_id(redis_client, flask_app):
+    stream_key = 'generate_task_stream:task'
+    redis_client.xread.side_effect = [
+        [],
+        [[stream_key.encode(), [(b'2-0', {b'chunk': b'data: {"answer": "b"}\n\n'})]]],
+        [[stream_key.encode(), [(b'3-0', {b'chunk': b'event: ping\n\n'}), (b'4-0', {b'end': b'1'})]]],
+    ]
+
+    events = list(TaskStreamBroker.attach('task', '1-0'))
+
+    assert events == ['id: 2-0\ndata: {"answer": "b"}\n\n', 'id: 3-0\nevent: ping\n\n']
+    assert [call.args[0] for call in redis_client.xread.call_args_list] == [
+        {stream_key: '1-0'}, {stream_key: '1-0'}, {stream_key: '2-0'}
+    ]
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from core.app.features.annotation_reply.annotation_matcher import AnnotationMatcher, AppAnnotationIndex
+from core.helper.pubsub_invalidation import VersionedCache
+
+pytestmark = pytest.mark.app_config(
+    ANNOTATION_INDEX_CACHE_SIZE=10,
+    ANNOTATION_INDEX_CACHE_TTL=600,
+    ANNOTATION_INDEX_MAX_SIZE=2000
+)
+
+
+def _cache() -> VersionedCache:
+    return VersionedCache(
+        channel=AnnotationMatcher.CHANNEL,
+        size_config_key='ANNOTATION_INDEX_CACHE_SIZE',
+        ttl_config_key='ANNOTATION_INDEX_CACHE_TTL'
+    )
+
+
+def _index(embeddings=None) -> AppAnnotationIndex:
+    annotation_index = AppAnnotationIndex(
+        tenant_id='tenant',
+        score_threshold=0.8,
+        embedding_provider_name='openai',
+        embedding_model_name='text-embedding-3-small',
+        collection_binding_id='binding'
+    )
+    if embeddings is not None:
+        annotation_index.annotation_ids = [f'annotation-{i}' for i in range(len(embeddings))]
+        annotation_index.embeddings = np.asarray(embeddings, dtype=np.float32)
+
+    return annotation_index
+
+
+@patch('core.helper.pubsub_invalidation.PubSubSubscriber')
+@patch.object(AnnotationMatcher, '_get_embeddings')
+@patch.object(AnnotationMatcher, '_load_index')
+def test_match_in_memory(load_index, get_embeddings, _, flask_app):
+    AnnotationMatcher._cache = _cache()
+    load_index.return_value = _index([[1, 0], [0.6, 0.8]])
+    embeddings = get_embeddings.return_value
+    app_record = MagicMock(id='app')
+
+    embeddings.embed_query.return_value = [1, 0]
+    annotation_id, score = AnnotationMatcher.match(app_record, 'question')
+    assert annotation_id == 'annotation-0'
+    assert abs(score - 1) < 1e-6
+
+    embeddings.embed_query.return_value = [0.6, 0.8]
+    assert AnnotationMatcher.match(app_record, 'other question')[0] == 'annotation-1'
+
+    # below the score threshold
+    embeddings.embed_query.return_value = [-1, 0]
+    assert AnnotationMatcher.match(app_record, 'unrelated') is None
+
+    load_index.assert_called_once()
+
+
+@patch('core.helper.pubsub_invalidation.PubSubSubscriber')
+@patch.object(AnnotationMatcher, '_search_vector')
+@patch.object(AnnotationMatcher, '_load_index')
+def test_match_large_sets_in_vector_database(load_index, search_vector, _, flask_app):
+    AnnotationMatcher._cache = _cache()
+    load_index.return_value = _index()
+    search_vector.return_value = ('annotation', 0.9)
+
+    assert AnnotationMatcher.match(MagicMock(id='app'), 'question') == ('annotation', 0.9)
+
+
+@patch('core.helper.pubsub_invalidation.PubSubSubscriber')
+@patch.object(AnnotationMatcher, '_load_index')
+@patch('core.helper.pubsub_invalidation.redis_client')
+def test_invalidate(redis_client, load_index, _, flask_app):
+    AnnotationMatcher._cache = _cache()
+    load_index.return_value = None
+    app_record = MagicMock(id='app')
+
+    assert AnnotationMatcher.match(app_record, 'question') is None
+    assert AnnotationMatcher.match(app_record, 'question') is None
+    assert load_index.call_count == 1
+
+    AnnotationMatcher.invalidate('app')
+    redis_client.publish.assert_called_once_with(AnnotationMatcher.CHANNEL, 'app')
+    AnnotationMatcher.match(app_record, 'question')
+    assert load_index.call_count == 2
+
+    # resubscribed, invalidations may have been missed
+    AnnotationMatcher._cache._clear_local()
+    AnnotationMatcher.match(app_record, 'question')
+    assert load_index.call_count == 3
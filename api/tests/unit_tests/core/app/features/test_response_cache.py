@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from core.app.app_config.entities import AppAdditionalFeatures, ResponseCacheEntity
+from core.app.features.response_cache.response_cache import ResponseCacheFeature
+from models.model import AppMode
+
+pytestmark = pytest.mark.app_config(
+    RESPONSE_CACHE_MAX_ENTRIES=10
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        value = self.values.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, '0')) + 1)
+
+    def hset(self, key, field, value):
+        self.values.setdefault(key, {})[field.encode()] = value
+
+    def hlen(self, key):
+        return len(self.values.get(key, {}))
+
+    def hgetall(self, key):
+        return dict(self.values.get(key, {}))
+
+    def expire(self, key, ttl):
+        pass
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+class FakeEmbedding:
+    VECTORS = {
+        'how do i reset my password?': [1.0, 0.0],
+        'how can i reset my password?': [0.99, 0.141],
+        'what is the price?': [0.0, 1.0],
+    }
+
+    def __init__(self, model_instance):
+        pass
+
+    def embed_query(self, text):
+        return self.VECTORS[text]
+
+
+def _entity(query: str, conversation_id: Optional[str] = None) -> SimpleNamespace:
+    app_config = SimpleNamespace(
+        tenant_id='tenant',
+        app_id='app',
+        app_mode=AppMode.CHAT,
+        app_model_config_dict={'model': {'name': 'gpt-4'}},
+        dataset=SimpleNamespace(dataset_ids=['dataset']),
+        external_data_variables=[],
+        additional_features=AppAdditionalFeatures(
+            response_cache=ResponseCacheEntity(enabled=True, ttl=600, similarity_threshold=0.95)
+        )
+    )
+    return SimpleNamespace(app_config=app_config, query=query, inputs={}, files=[], extras={},
+                           conversation_id=conversation_id)
+
+
+def test_normalize_query():
+    assert ResponseCacheFeature.normalize_query('  How do I\n reset   my PASSWORD? ') == \
+           'how do i reset my password?'
+    assert ResponseCacheFeature.normalize_query(None) == ''
+
+
+def test_query_and_save(flask_app):
+    ResponseCacheFeature._indexes = None
+    model_instance = MagicMock(provider='openai', model='text-embedding-3-small')
+    feature = ResponseCacheFeature()
+
+    with \
+            patch('core.app.features.response_cache.response_cache.redis_client', FakeRedis()) as redis_client, \
+            patch('core.app.features.response_cache.response_cache.CacheEmbedding', FakeEmbedding), \
+            patch.object(ResponseCacheFeature, '_get_embedding_model_instance', return_value=model_instance):
+        assert feature.query(_entity('How do I reset my password?')) is None
+
+        feature.save(_entity('How do I reset my password?'), 'Click "Forgot password".')
+        assert feature.query(_entity('how do i  reset my password?')) == 'Click "Forgot password".'
+
+        # similar query
+        assert feature.query(_entity('How can I reset my password?')) == 'Click "Forgot password".'
+        assert feature.query(_entity('What is the price?')) is None
+
+        # not cached with conversation history
+        assert feature.query(_entity('How do I reset my password?', conversation_id='conversation')) is None
+
+        # not cached with external data
+        entity = _entity('How do I reset my password?')
+        entity.app_config.external_data_variables = [MagicMock()]
+        assert feature.query(entity) is None
+
+        # other app config
+        entity = _entity('How do I reset my password?')
+        entity.app_config.app_model_config_dict = {'model': {'name': 'gpt-3.5-turbo'}}
+        assert feature.query(entity) is None
+
+        ResponseCacheFeature.invalidate_datasets(['dataset'])
+        assert feature.query(_entity('How do I reset my password?')) is None
+        assert redis_client.values['response_cache_dataset_version:dataset'] == '1'
+
+
+def test_search_index():
+    ResponseCacheFeature._indexes = None
+    with patch.object(ResponseCacheFeature, '_get_index',
+                      return_value=(['a', 'b'], np.array([[1.0, 0.0], [0.6, 0.8]], dtype=np.float32))):
+        embedding = np.array([0.8, 0.6], dtype=np.float32)
+        assert ResponseCacheFeature._search_index('index', embedding, 0.9) == 'b'
+        assert ResponseCacheFeature._search_index('index', embedding, 0.99) is None
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.app.task_pipeline.workflow_run_writer import WorkflowRunWriter
+from models.workflow import WorkflowNodeExecution, WorkflowRun
+
+pytestmark = pytest.mark.app_config(WORKFLOW_PERSISTENCE_FLUSH_INTERVAL=5)
+
+
+@patch('core.app.task_pipeline.workflow_run_writer.db')
+def test_flush_batches_inserts_then_updates(db, flask_app):
+    writer = WorkflowRunWriter()
+    workflow_run = writer.add(WorkflowRun(status='running'))
+    node_executions = [writer.add(WorkflowNodeExecution(workflow_run_id=workflow_run.id, index=index))
+                       for index in range(1, 3)]
+
+    assert workflow_run.id and workflow_run.created_at
+    assert writer.get(node_executions[0].id) is node_executions[0]
+    writer.flush_if_due()
+    db.session.commit.assert_not_called()
+
+    writer.flush()
+    inserts = db.session.bulk_insert_mappings.call_args_list
+    assert [call.args[0] for call in inserts] == [WorkflowRun, WorkflowNodeExecution]
+    assert [row['index'] for row in inserts[1].args[1]] == [1, 2]
+    db.session.bulk_update_mappings.assert_not_called()
+    db.session.commit.assert_called_once()
+
+    db.session.reset_mock()
+    writer.flush()
+    db.session.commit.assert_not_called()
+
+    node_executions[1].status = 'succeeded'
+    writer.mark_dirty(node_executions[1])
+    writer.flush()
+    db.session.bulk_insert_mappings.assert_not_called()
+    db.session.bulk_update_mappings.assert_called_once()
+    model, rows = db.session.bulk_update_mappings.call_args.args
+    assert model is WorkflowNodeExecution
+    assert [(row['id'], row['status']) for row in rows] == [(node_executions[1].id, 'succeeded')]
+
+
+@pytest.mark.app_config(WORKFLOW_PERSISTENCE_FLUSH_INTERVAL=0)
+@patch('core.app.task_pipeline.workflow_run_writer.db')
+def test_flush_on_close(db, flask_app):
+    writer = WorkflowRunWriter()
+
+    def stream():
+        writer.add(WorkflowRun(status='running'))
+        yield 'workflow_started'
+        yield 'node_started'
+
+    generator = writer.flush_on_close(stream())
+    assert next(generator) == 'workflow_started'
+    generator.close()
+
+    db.session.bulk_insert_mappings.assert_called_once()
+    db.session.commit.assert_called_once()
+
+
+@patch('core.app.task_pipeline.workflow_run_writer.db')
+def test_allocate_sequence_number(db):
+    db.session.execute.return_value.scalar.side_effect = [8]
+    assert WorkflowRunWriter.allocate_sequence_number('tenant', 'app') == 8
+    statement = str(db.session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert statement.startswith('UPDATE workflow_run_sequences SET sequence_number=')
+    db.session.commit.assert_called_once()
+
+    # sequence row of app created from the max sequence number of the app
+    db.session.reset_mock()
+    db.session.execute.return_value.scalar.side_effect = [None, 1]
+    assert WorkflowRunWriter.allocate_sequence_number('tenant', 'app') == 1
+    statement = str(db.session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert 'max(workflow_runs.sequence_number)' in statement
+    assert 'ON CONFLICT ON CONSTRAINT workflow_run_sequence_pkey DO UPDATE' in statement
+    db.session.commit.assert_called_once()
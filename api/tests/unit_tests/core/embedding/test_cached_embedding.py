@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from core.embedding.cached_embedding import QueryEmbeddingCache
+from models.dataset import Embedding
+
+pytestmark = pytest.mark.app_config(
+    EMBEDDING_QUERY_CACHE_SIZE=10,
+    EMBEDDING_QUERY_CACHE_TTL=600,
+    EMBEDDING_QUERY_CACHE_MODEL_TTLS='openai:text-embedding-3-small=3600'
+)
+
+
+def test_query_embedding_cache(flask_app):
+    QueryEmbeddingCache._cache = None
+    QueryEmbeddingCache._model_ttls = None
+    redis_client = MagicMock()
+    redis_client.pipeline.return_value.execute.return_value = [
+        Embedding.encode_embedding([0.6, 0.8]), True
+    ]
+
+    with patch('core.embedding.cached_embedding.redis_client', redis_client):
+        # first read hits redis, then the in-process cache
+        embedding = QueryEmbeddingCache.get('openai', 'text-embedding-3-small', 'hash')
+        assert embedding.dtype == np.float32
+        assert np.allclose(embedding, [0.6, 0.8])
+        assert QueryEmbeddingCache.get('openai', 'text-embedding-3-small', 'hash') is embedding
+        assert redis_client.pipeline.call_count == 1
+        redis_client.pipeline.return_value.expire.assert_called_once_with(
+            'openai_text-embedding-3-small_hash', 3600
+        )
+
+        QueryEmbeddingCache.set('cohere', 'embed-english-v3.0', 'hash', np.array([1.0, 0.0]))
+        redis_client.setex.assert_called_once_with(
+            'cohere_embed-english-v3.0_hash', 600, Embedding.encode_embedding([1.0, 0.0])
+        )
+
+
+def test_query_embedding_cache_ignores_legacy_values(flask_app):
+    QueryEmbeddingCache._cache = None
+    QueryEmbeddingCache._model_ttls = None
+    redis_client = MagicMock()
+    redis_client.pipeline.return_value.execute.return_value = [b'AAAAAAAA4D8=', True]
+
+    with patch('core.embedding.cached_embedding.redis_client', redis_client):
+        assert QueryEmbeddingCache.get('openai', 'text-embedding-ada-002', 'hash') is None
+
+        # misses are not cached in process, the next read goes to redis again
+        assert QueryEmbeddingCache.get('openai', 'text-embedding-ada-002', 'hash') is None
+        assert redis_client.pipeline.call_count == 2
@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from core.embedding.embedding_dispatcher import EmbeddingDispatcher
+from core.model_runtime.entities.text_embedding_entities import TextEmbeddingResult
+from core.model_runtime.errors.invoke import InvokeRateLimitError
+from libs import helper
+
+
+def _embedding_result(texts: list[str]) -> TextEmbeddingResult:
+    return TextEmbeddingResult.construct(
+        model='text-embedding',
+        embeddings=[[float(len(text)), 0.0] for text in texts]
+    )
+
+
+@pytest.mark.app_config(EMBEDDING_MAX_CONCURRENCY=2)
+def test_embed_documents(flask_app):
+    model_instance = MagicMock()
+    model_instance.provider = 'openai'
+    invoked_texts = []
+    rate_limited = []
+
+    def invoke_text_embedding(texts: list[str], user=None):
+        # the first request with more than 2 texts is rate limited
+        if len(texts) > 2 and not rate_limited:
+            rate_limited.append(texts)
+            raise InvokeRateLimitError('rate limited')
+
+        invoked_texts.extend(texts)
+        return _embedding_result(texts)
+
+    model_instance.invoke_text_embedding.side_effect = invoke_text_embedding
+
+    texts = ['cached', 'a', 'bb', 'a', 'ccc', 'dddd']
+    with patch('core.embedding.embedding_dispatcher.CacheEmbedding') as cache_embedding_cls, \
+            patch.object(EmbeddingDispatcher, 'RETRY_BACKOFF_SECONDS', 0):
+        cache_embedding = cache_embedding_cls.return_value
+        cache_embedding.get_max_chunks.return_value = 4
+        cache_embedding.get_cached_embeddings.return_value = {
+            helper.generate_text_hash('cached'): np.array([0.0, 1.0], dtype=np.float32)
+        }
+
+        text_embeddings = {}
+        for embeddings in EmbeddingDispatcher(model_instance).embed_documents(texts):
+            text_embeddings.update(embeddings)
+
+    assert text_embeddings[0] == [0.0, 1.0]
+    assert text_embeddings[1] == text_embeddings[3] == [1.0, 0.0]
+    assert len(text_embeddings) == len(texts)
+
+    # duplicated and cached texts are not embedded, the rate limited batch is retried in halves
+    assert rate_limited == [['a', 'bb', 'ccc', 'dddd']]
+    assert sorted(invoked_texts) == ['a', 'bb', 'ccc', 'dddd']
+    assert cache_embedding.save_cached_embeddings.call_count == 2
@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper.provider_configurations_cache import ProviderConfigurationsCache
+from core.helper.pubsub_invalidation import VersionedCache
+
+pytestmark = pytest.mark.app_config(
+    PROVIDER_CONFIGURATIONS_CACHE_SIZE=10,
+    PROVIDER_CONFIGURATIONS_CACHE_TTL=300
+)
+
+
+def _cache() -> VersionedCache:
+    return VersionedCache(
+        channel=ProviderConfigurationsCache.CHANNEL,
+        size_config_key='PROVIDER_CONFIGURATIONS_CACHE_SIZE',
+        ttl_config_key='PROVIDER_CONFIGURATIONS_CACHE_TTL'
+    )
+
+
+@patch('core.helper.pubsub_invalidation.PubSubSubscriber')
+@patch('core.helper.pubsub_invalidation.redis_client')
+def test_get_and_invalidate(redis_client, _, flask_app):
+    ProviderConfigurationsCache._cache = _cache()
+    configurations = MagicMock()
+
+    cached, version = ProviderConfigurationsCache.get('tenant')
+    assert cached is None
+
+    ProviderConfigurationsCache.set('tenant', version, configurations)
+    assert ProviderConfigurationsCache.get('tenant')[0] is configurations
+    assert ProviderConfigurationsCache.get('other')[0] is None
+
+    ProviderConfigurationsCache.invalidate('tenant')
+    redis_client.publish.assert_called_once_with(ProviderConfigurationsCache.CHANNEL, 'tenant')
+    assert ProviderConfigurationsCache.get('tenant')[0] is None
+
+
+@patch('core.helper.pubsub_invalidation.PubSubSubscriber')
+def test_not_cached_when_invalidated_while_building(_, flask_app):
+    ProviderConfigurationsCache._cache = _cache()
+
+    _, version = ProviderConfigurationsCache.get('tenant')
+    # invalidation received from another process
+    ProviderConfigurationsCache._cache._invalidate_local('tenant')
+    ProviderConfigurationsCache.set('tenant', version, MagicMock())
+    assert ProviderConfigurationsCache.get('tenant')[0] is None
+
+    _, version = ProviderConfigurationsCache.get('tenant')
+    # resubscribed, invalidations may have been missed
+    ProviderConfigurationsCache._cache._clear_local()
+    ProviderConfigurationsCache.set('tenant', version, MagicMock())
+    assert ProviderConfigurationsCache.get('tenant')[0] is None
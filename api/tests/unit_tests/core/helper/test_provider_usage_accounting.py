@@ -0,0 +1,73 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper.provider_usage_accounting import ProviderUsageAccounting
+from models.provider import ProviderQuotaType
+
+
+@patch.object(ProviderUsageAccounting, '_flush_if_due')
+@patch('core.helper.provider_usage_accounting.ProviderConfigurationsCache')
+@patch('core.helper.provider_usage_accounting.redis_client')
+def test_deduct_quota_invalidates_when_exhausted(redis_client, configurations_cache, flush_if_due):
+    redis_client.eval.return_value = 90
+    ProviderUsageAccounting.deduct_quota('tenant', 'openai', ProviderQuotaType.TRIAL, 100, 10)
+
+    args = redis_client.eval.call_args.args
+    assert args[2:] == (ProviderUsageAccounting.PENDING_QUOTA_KEY, 'provider_usage:quota_used:tenant:openai:trial',
+                        'tenant:openai:trial', 10)
+    configurations_cache.invalidate.assert_not_called()
+
+    redis_client.eval.return_value = 100
+    ProviderUsageAccounting.deduct_quota('tenant', 'openai', ProviderQuotaType.TRIAL, 100, 10)
+    configurations_cache.invalidate.assert_called_once_with('tenant')
+
+    # counter not loaded
+    redis_client.eval.return_value = None
+    ProviderUsageAccounting.deduct_quota('tenant', 'openai', ProviderQuotaType.TRIAL, 100, 10)
+    assert configurations_cache.invalidate.call_count == 2
+    assert flush_if_due.call_count == 3
+
+
+@pytest.mark.app_config(PROVIDER_USAGE_FLUSH_INTERVAL=30)
+@patch.object(ProviderUsageAccounting, 'flush')
+@patch('core.helper.provider_usage_accounting.redis_client')
+def test_flush_if_due(redis_client, flush, flask_app):
+    # flushed by another process within the interval
+    redis_client.set.return_value = None
+    ProviderUsageAccounting.update_last_used('tenant', 'openai')
+    flush.assert_not_called()
+
+    redis_client.set.return_value = True
+    with patch('core.helper.provider_usage_accounting.threading.Thread') as thread:
+        thread.return_value.start.side_effect = lambda: ProviderUsageAccounting._flush_in_background(flask_app)
+        ProviderUsageAccounting.update_last_used('tenant', 'openai')
+
+    redis_client.set.assert_called_with(ProviderUsageAccounting.FLUSH_DUE_KEY, 1, nx=True, ex=30)
+    flush.assert_called_once()
+
+
+@patch('core.helper.provider_usage_accounting.db')
+@patch('core.helper.provider_usage_accounting.redis_client')
+def test_flush(redis_client, db):
+    redis_client.exists.side_effect = lambda key: key in [ProviderUsageAccounting.PENDING_QUOTA_KEY,
+                                                          ProviderUsageAccounting.FLUSHING_LAST_USED_KEY]
+    redis_client.hgetall.side_effect = lambda key: {
+        ProviderUsageAccounting.FLUSHING_QUOTA_KEY: {b'tenant:openai:trial': b'30', b'tenant:anthropic:paid': b'5'},
+        ProviderUsageAccounting.FLUSHING_LAST_USED_KEY: {b'tenant:openai': b'1700000000'}
+    }[key]
+    pipeline = MagicMock()
+    redis_client.pipeline.return_value = pipeline
+
+    assert ProviderUsageAccounting.flush() == 3
+
+    # usage left by a failed flush is flushed before the pending one
+    redis_client.rename.assert_called_once_with(ProviderUsageAccounting.PENDING_QUOTA_KEY,
+                                                ProviderUsageAccounting.FLUSHING_QUOTA_KEY)
+    assert db.session.query.return_value.filter.return_value.update.call_count == 3
+    db.session.commit.assert_called_once()
+    pipeline.delete.assert_any_call(ProviderUsageAccounting.FLUSHING_QUOTA_KEY,
+                                    ProviderUsageAccounting.FLUSHING_LAST_USED_KEY)
+    pipeline.delete.assert_any_call('provider_usage:quota_used:tenant:openai:trial')
+    pipeline.delete.assert_any_call('provider_usage:quota_used:tenant:anthropic:paid')
+    pipeline.execute.assert_called_once()
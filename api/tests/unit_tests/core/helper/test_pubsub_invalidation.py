@@ -0,0 +1,33 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper.pubsub_invalidation import PubSubSubscriber
+
+
+@patch('core.helper.pubsub_invalidation.redis_client')
+def test_listen_dispatches_messages_by_channel(redis_client):
+    pubsub = redis_client.pubsub.return_value
+    pubsub.get_message.side_effect = [
+        {'type': 'message', 'channel': b'first', 'data': b'tenant'},
+        None,
+        {'type': 'message', 'channel': b'second', 'data': b'app'},
+        KeyboardInterrupt,
+    ]
+    first, first_subscribed, second = MagicMock(), MagicMock(), MagicMock()
+
+    with patch.object(PubSubSubscriber, '_handlers', {'first': (first, first_subscribed)}):
+        def add_channel(data):
+            # channel added while listening
+            PubSubSubscriber._handlers['second'] = (second, None)
+
+        first.side_effect = add_channel
+        with pytest.raises(KeyboardInterrupt):
+            PubSubSubscriber._listen()
+
+    # one connection for all channels
+    redis_client.pubsub.assert_called_once()
+    assert [call.args for call in pubsub.subscribe.call_args_list] == [('first',), ('second',)]
+    first_subscribed.assert_called_once()
+    first.assert_called_once_with('tenant')
+    second.assert_called_once_with('app')
@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock, patch
+
+from core.memory.token_buffer_memory import TokenBufferMemory
+from core.model_runtime.entities.message_entities import PromptMessage
+
+
+def _get_num_tokens(model: str, credentials: dict, prompt_messages: list[PromptMessage]) -> int:
+    # 3 tokens per request, 1 per message and 1 per char
+    return 3 + sum(1 + len(prompt_message.content) for prompt_message in prompt_messages)
+
+
+def _history(max_token_limit: int, cached_tokens: list):
+    messages = []
+    for i in range(5):
+        message = MagicMock()
+        message.id = f'message-{i}'
+        message.query = 'q' * (i + 1)
+        message.answer = 'a' * 10
+        message.message_files = []
+        messages.append(message)
+
+    model_type_instance = MagicMock()
+    model_type_instance.get_num_tokens.side_effect = _get_num_tokens
+
+    redis_client = MagicMock()
+    redis_client.mget.return_value = cached_tokens
+
+    with patch('core.memory.token_buffer_memory.db') as db, \
+            patch('core.memory.token_buffer_memory.redis_client', redis_client), \
+            patch('core.memory.token_buffer_memory.MessageFileParser'), \
+            patch('core.memory.token_buffer_memory.model_provider_factory') as model_provider_factory:
+        db.session.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all \
+            .return_value = list(reversed(messages))
+        model_provider_factory.get_provider_instance.return_value.get_model_instance.return_value \
+            = model_type_instance
+
+        memory = TokenBufferMemory(conversation=MagicMock(), model_instance=MagicMock())
+        prompt_messages = memory.get_history_prompt_messages(max_token_limit=max_token_limit)
+
+    return prompt_messages, model_type_instance, redis_client
+
+
+def _pruned_one_at_a_time(max_token_limit: int) -> list[str]:
+    contents = [content for i in range(5) for content in ('q' * (i + 1), 'a' * 10)]
+    while _get_num_tokens('', {}, [MagicMock(content=content) for content in contents]) > max_token_limit:
+        contents.pop(0)
+
+    return contents
+
+
+def test_get_history_prompt_messages_within_limit():
+    prompt_messages, model_type_instance, redis_client = _history(1000, [None] * 5)
+
+    assert len(prompt_messages) == 10
+    # only the whole history is counted
+    assert model_type_instance.get_num_tokens.call_count == 1
+    redis_client.mget.assert_not_called()
+
+    prompt_messages, model_type_instance, redis_client = _history(50, [None] * 5)
+    # single messages are counted for pruning, and cached
+    assert _get_num_tokens('', {}, prompt_messages) <= 50
+    assert model_type_instance.get_num_tokens.call_count == 12
+    assert redis_client.pipeline.return_value.setex.call_count == 5
+
+
+def test_get_history_prompt_messages_pruned():
+    max_token_limit = 50
+
+    cached_tokens = [f'{3 + 1 + i + 1},{3 + 1 + 10}'.encode() for i in range(5)]
+    prompt_messages, model_type_instance, _ = _history(max_token_limit, cached_tokens)
+
+    expected_messages = _pruned_one_at_a_time(max_token_limit)
+    assert len(expected_messages) < 10
+    assert [prompt_message.content for prompt_message in prompt_messages] == expected_messages
+    # cached single message tokens, only the whole and the pruned history are counted
+    assert model_type_instance.get_num_tokens.call_count == 2
+
+
+def test_get_history_prompt_messages_pruned_within_limit_when_estimates_are_off():
+    max_token_limit = 50
+
+    # estimates of the oldest message higher than its share of the counted tokens, e.g. of tokenizers
+    # which are not additive, pruning it alone seems to be enough
+    cached_tokens = [b'60,60'] + [f'{3 + 1 + i + 1},{3 + 1 + 10}'.encode() for i in range(1, 5)]
+    prompt_messages, model_type_instance, _ = _history(max_token_limit, cached_tokens)
+
+    # pruned further after counting the pruned history
+    assert model_type_instance.get_num_tokens.call_count > 2
+
+    assert [prompt_message.content for prompt_message in prompt_messages] == _pruned_one_at_a_time(max_token_limit)
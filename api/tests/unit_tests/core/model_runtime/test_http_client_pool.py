@@ -0,0 +1,45 @@
+import httpx
+from openai import OpenAI
+
+from core.model_runtime.utils.http_client_pool import HttpClientPool
+
+
+def _get_client(api_key: str) -> OpenAI:
+    client_kwargs = {'api_key': api_key, 'timeout': httpx.Timeout(315.0, read=300.0, write=10.0, connect=5.0)}
+    return HttpClientPool.get_client(
+        provider='test',
+        client_kwargs=client_kwargs,
+        factory=lambda http_client: OpenAI(**client_kwargs, http_client=http_client)
+    )
+
+
+def test_get_client_by_credentials():
+    client = _get_client('sk-1')
+
+    assert _get_client('sk-1') is client
+    assert _get_client('sk-2') is not client
+    assert isinstance(client._client, httpx.Client)
+
+
+def test_evict_idle_and_least_recently_used(monkeypatch):
+    HttpClientPool._clients.clear()
+    client = _get_client('sk-1')
+
+    monkeypatch.setattr(HttpClientPool, 'CLIENT_IDLE_TIMEOUT', -1)
+    _get_client('sk-2')
+    assert _get_client('sk-1') is not client
+
+    monkeypatch.setattr(HttpClientPool, 'CLIENT_IDLE_TIMEOUT', 600)
+    monkeypatch.setattr(HttpClientPool, 'MAX_CLIENTS', 2)
+    client = _get_client('sk-1')
+    _get_client('sk-2')
+    _get_client('sk-3')
+    assert len(HttpClientPool._clients) == 2
+    assert _get_client('sk-1') is not client
+
+
+def test_get_session_by_host():
+    session = HttpClientPool.get_session('test', 'https://api.example.com/v1/chat/completions')
+
+    assert HttpClientPool.get_session('test', 'https://api.example.com/v1/embeddings') is session
+    assert HttpClientPool.get_session('test', 'https://other.example.com/v1/embeddings') is not session
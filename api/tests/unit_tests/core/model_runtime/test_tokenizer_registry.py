@@ -0,0 +1,55 @@
+from unittest.mock import MagicMock
+
+import pytest
+import tiktoken
+
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
+from core.model_runtime.model_providers.__base.tokenizers.tokenizer_registry import BaseTokenizer, TokenizerRegistry
+
+
+def test_gpt2_num_tokens_match_transformers_tokenizer():
+    encoder = GPT2Tokenizer.get_encoder()
+    texts = ['Hello world', ' leading space', '中文测试，你好！', 'a<|endoftext|>b', 'line\n\n  tab\t😀', 'a' * 5000]
+
+    expected = [len(encoder.encode(text, verbose=False)) for text in texts]
+
+    assert [GPT2Tokenizer.get_num_tokens(text) for text in texts] == expected
+    assert GPT2Tokenizer.get_num_tokens_batch(texts + ['']) == expected + [0]
+
+
+def test_register_tokenizer():
+    class CharTokenizer(BaseTokenizer):
+        def _get_num_tokens(self, text: str) -> int:
+            return len(text)
+
+    TokenizerRegistry.register('char', CharTokenizer)
+    try:
+        tokenizer = TokenizerRegistry.get('char')
+        assert TokenizerRegistry.get('char') is tokenizer
+        assert TokenizerRegistry.get_num_tokens('abc', 'char') == 3
+        assert tokenizer.get_num_tokens_batch(['ab', '', 'a' * 5000]) == [2, 0, 5000]
+    finally:
+        TokenizerRegistry.unregister('char')
+
+    with pytest.raises(ValueError):
+        TokenizerRegistry.get('char')
+
+
+def test_tiktoken_tokenizer_of_model(monkeypatch):
+    monkeypatch.setattr(TokenizerRegistry, '_factories', dict(TokenizerRegistry._factories))
+    monkeypatch.setattr(TokenizerRegistry, '_tokenizers', {})
+    get_encoding = MagicMock()
+    get_encoding.return_value.encode.side_effect = lambda text, disallowed_special: list(text.encode())
+    monkeypatch.setattr(tiktoken, 'get_encoding', get_encoding)
+
+    tokenizer = TokenizerRegistry.get_tiktoken_tokenizer('gpt-4')
+
+    # unknown models fall back to cl100k_base, special tokens are encoded as plain text
+    assert TokenizerRegistry.get_tiktoken_tokenizer('not-exists') is tokenizer
+    assert TokenizerRegistry.get('cl100k_base') is tokenizer
+    assert tokenizer.get_num_tokens('a<|endoftext|>b') == 15
+    get_encoding.return_value.encode.assert_called_with('a<|endoftext|>b', disallowed_special=())
+
+    # encodings of other models are registered on first use
+    assert TokenizerRegistry.get_tiktoken_tokenizer('text-davinci-003') is TokenizerRegistry.get('p50k_base')
+    assert [call.args[0] for call in get_encoding.call_args_list] == ['cl100k_base', 'p50k_base']
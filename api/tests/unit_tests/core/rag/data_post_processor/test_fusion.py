@@ -0,0 +1,49 @@
+import pytest
+
+from core.rag.data_post_processor.fusion import FusionRunner
+from core.rag.models.document import Document
+
+
+def _document(doc_id: str, score=None) -> Document:
+    metadata = {'doc_id': doc_id}
+    if score is not None:
+        metadata['score'] = score
+    return Document(page_content=doc_id, metadata=metadata)
+
+
+def test_rrf_fusion():
+    semantic_documents = [_document('a', 0.9), _document('b', 0.8), _document('c', 0.7)]
+    full_text_documents = [_document('c'), _document('d'), _document('a')]
+
+    documents = FusionRunner('rrf').run([semantic_documents, full_text_documents])
+
+    # documents found by both searches rank first, and are deduplicated
+    assert [document.metadata['doc_id'] for document in documents] == ['a', 'c', 'b', 'd']
+    # scores of documents are kept
+    assert documents[0].metadata['score'] == 0.9
+    assert documents[1].metadata['score'] == 0.7
+
+
+def test_rrf_fusion_top_n():
+    documents = FusionRunner('rrf').run([[_document('a'), _document('b')], [_document('c')]], top_n=2)
+
+    assert len(documents) == 2
+
+
+def test_weighted_fusion():
+    semantic_documents = [_document('a', 0.9), _document('b', 0.5), _document('c', 0.1)]
+    full_text_documents = [_document('c'), _document('b')]
+
+    documents = FusionRunner('weighted', weights=[0.7, 0.3]).run([semantic_documents, full_text_documents])
+
+    assert [document.metadata['doc_id'] for document in documents] == ['a', 'b', 'c']
+    assert documents[0].metadata['score'] == pytest.approx(0.7)
+    assert documents[1].metadata['score'] == pytest.approx(0.7 * 0.5 + 0.3 * 0.5)
+    assert documents[2].metadata['score'] == pytest.approx(0.3)
+    # input documents are not changed
+    assert semantic_documents[0].metadata['score'] == 0.9
+
+
+def test_unsupported_fusion_method():
+    with pytest.raises(ValueError):
+        FusionRunner('unknown')
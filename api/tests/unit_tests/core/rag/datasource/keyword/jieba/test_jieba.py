@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from core.rag.datasource.keyword.jieba.jieba import Jieba
+
+
+def test_bm25_scores():
+    scores = Jieba._bm25_scores({
+        'common': {'node-1', 'node-2', 'node-3'},
+        'rare': {'node-1'},
+    }, 100)
+
+    # chunks matching rare keywords rank higher
+    assert scores['node-1'] > scores['node-2']
+    assert scores['node-2'] == scores['node-3']
+
+    rare_scores = Jieba._bm25_scores({'rare': {'node-1'}}, 100)
+    common_scores = Jieba._bm25_scores({'common': {'node-1', 'node-2', 'node-3'}}, 100)
+    assert rare_scores['node-1'] > common_scores['node-1'] > 0
+
+
+def test_bm25_scores_with_stale_total_count():
+    scores = Jieba._bm25_scores({'keyword': {'node-1', 'node-2'}}, 0)
+
+    assert scores['node-1'] > 0
+
+
+@patch('core.rag.datasource.keyword.jieba.jieba.db')
+def test_save_postings(db):
+    jieba = Jieba(MagicMock(id='dataset'))
+
+    with patch.object(Jieba, 'INSERT_BATCH_SIZE', 2):
+        jieba.update_segment_keywords_index('node-1', ['a', 'b', 'a', 'c' * 300])
+
+    # postings of the node replaced, duplicated and concurrently saved postings skipped
+    db.session.query.return_value.filter.return_value.delete.assert_called_once()
+    statements = [call.args[0].compile(dialect=postgresql.dialect()) for call in db.session.execute.call_args_list]
+    assert len(statements) == 2
+    assert all('ON CONFLICT ON CONSTRAINT dataset_keyword_posting_unique DO NOTHING' in str(statement)
+               for statement in statements)
+    keywords = [value for statement in statements
+                for key, value in statement.params.items() if key.startswith('keyword')]
+    assert sorted(keywords) == ['a', 'b', 'c' * 255]
+    db.session.commit.assert_called_once()
+
+
+@patch('core.rag.datasource.keyword.jieba.jieba.JiebaKeywordTableHandler')
+@patch('core.rag.datasource.keyword.jieba.jieba.db')
+def test_search(db, keyword_table_handler):
+    keyword_table_handler.return_value.extract_keywords.return_value = {'common', 'rare'}
+    query = db.session.query.return_value.filter.return_value
+    query.all.side_effect = [
+        [('common', 'node-1'), ('common', 'node-2'), ('rare', 'node-2')],
+        [MagicMock(index_node_id=node_id, content=node_id, document_id='document', dataset_id='dataset')
+         for node_id in ['node-1', 'node-2']],
+    ]
+    query.scalar.return_value = 10
+
+    documents = Jieba(MagicMock(id='dataset')).search('query', top_k=2)
+
+    # ranked by score, matching the rare keyword too
+    assert [document.metadata['doc_id'] for document in documents] == ['node-2', 'node-1']
+    assert documents[0].page_content == 'node-2'
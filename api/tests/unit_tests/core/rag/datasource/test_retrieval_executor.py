@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from core.rag.datasource.retrieval_executor import RetrievalExecutor
+
+pytestmark = pytest.mark.app_config(RETRIEVAL_MAX_WORKERS=2, RETRIEVAL_TIMEOUT=5)
+
+
+@pytest.fixture(autouse=True)
+def _reset_executor(monkeypatch):
+    monkeypatch.setattr(RetrievalExecutor, '_executor', None)
+    monkeypatch.setattr(RetrievalExecutor, '_semaphore', None)
+
+
+def _search(name: str, delay: float = 0) -> list[str]:
+    time.sleep(delay)
+    return [name]
+
+
+def _fail():
+    raise ValueError('search failed')
+
+
+def test_run(flask_app):
+    results = RetrievalExecutor.run([
+        ('slow', _search, {'name': 'slow', 'delay': 0.1}),
+        ('fast', _search, {'name': 'fast'}),
+        ('failed', _fail, {}),
+    ])
+
+    assert results == [['slow'], ['fast'], None]
+
+
+def test_run_timeout(flask_app):
+    results = RetrievalExecutor.run([
+        ('slow', _search, {'name': 'slow', 'delay': 1}),
+        ('fast', _search, {'name': 'fast'}),
+    ], timeout=0.2)
+
+    assert results == [None, ['fast']]
+
+
+def test_run_bounded_nested(flask_app):
+    thread_names = set()
+
+    def retrieve_dataset(dataset_id: str) -> list[str]:
+        thread_names.add(threading.current_thread().name)
+        results = RetrievalExecutor.run([
+            (f'search:{dataset_id}:{i}', _search, {'name': f'{dataset_id}:{i}', 'delay': 0.05}) for i in range(2)
+        ])
+        return [document for documents in results for document in documents]
+
+    # more datasets than workers, the nested searches run in the calling threads instead of waiting for workers
+    results = RetrievalExecutor.run([
+        (f'dataset:{i}', retrieve_dataset, {'dataset_id': str(i)}) for i in range(4)
+    ])
+
+    assert results == [[f'{i}:0', f'{i}:1'] for i in range(4)]
+    assert len([name for name in thread_names if name.startswith('retrieval')]) <= 2
+
+
+def test_run_inline_bounded_by_deadline(flask_app):
+    started = []
+
+    def search(name: str, delay: float = 0) -> list[str]:
+        started.append(name)
+        return _search(name, delay)
+
+    # both workers busy, the third task runs in the calling thread past the deadline
+    results = RetrievalExecutor.run([
+        ('pooled:0', search, {'name': 'pooled:0', 'delay': 0.2}),
+        ('pooled:1', search, {'name': 'pooled:1', 'delay': 0.2}),
+        ('inline', search, {'name': 'inline', 'delay': 0.3}),
+        ('late', search, {'name': 'late'}),
+    ], timeout=0.1)
+
+    # pooled results done by then are kept, the task left after the deadline is not started
+    assert results == [['pooled:0'], ['pooled:1'], ['inline'], None]
+    assert 'late' not in started
@@ -0,0 +1,18 @@
+from unittest.mock import MagicMock, patch
+
+from core.rag.datasource.retrieval_service import RetrievalService
+from models.dataset import Document
+
+
+@patch('core.rag.datasource.retrieval_service.db')
+def test_fetch_segment_documents(db):
+    db.session.query.return_value.filter.return_value.all.return_value = [MagicMock(id='document')]
+    segments = [MagicMock(dataset_id='dataset', document_id='document') for _ in range(2)]
+
+    documents_by_id = RetrievalService.fetch_segment_documents(segments)
+
+    # only the documents are queried, once for all segments
+    assert list(documents_by_id) == ['document']
+    db.session.query.assert_called_once_with(Document)
+
+    assert RetrievalService.fetch_segment_documents([]) == {}
@@ -0,0 +1,71 @@
+import threading
+
+from core.helper.lru_cache import LRUCache
+from core.rag.datasource.vdb.vector_client_pool import VectorClientPool
+
+
+def test_get_client_shared():
+    created = []
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    client = VectorClientPool.get_client(('test', 'shared'), factory)
+
+    assert VectorClientPool.get_client(('test', 'shared'), factory) is client
+    assert VectorClientPool.get_client(('test', 'other'), factory) is not client
+    assert len(created) == 2
+
+
+def test_get_client_recreated_when_unhealthy(monkeypatch):
+    healthy = {'value': True}
+    client = VectorClientPool.get_client(('test', 'health'), object, health_check=lambda c: healthy['value'])
+
+    monkeypatch.setattr(VectorClientPool, 'HEALTH_CHECK_INTERVAL', -1)
+    assert VectorClientPool.get_client(('test', 'health'), object, health_check=lambda c: healthy['value']) is client
+
+    healthy['value'] = False
+    assert VectorClientPool.get_client(('test', 'health'), object, health_check=lambda c: healthy['value']) is not client
+
+
+def test_slow_client_does_not_block_others():
+    creating = threading.Event()
+    release = threading.Event()
+
+    def slow_factory():
+        creating.set()
+        release.wait(5)
+        return object()
+
+    thread = threading.Thread(target=VectorClientPool.get_client, args=(('test', 'slow'), slow_factory))
+    thread.start()
+    assert creating.wait(5)
+
+    # returned while the slow client is still being created
+    assert VectorClientPool.get_client(('test', 'fast'), object) is not None
+    assert thread.is_alive()
+
+    release.set()
+    thread.join(5)
+
+
+def test_clients_bounded(monkeypatch):
+    monkeypatch.setattr(VectorClientPool, 'MAX_CLIENTS', 2)
+    monkeypatch.setattr(VectorClientPool, '_clients', LRUCache(2))
+
+    for i in range(5):
+        VectorClientPool.get_client(('test', 'collection', i), object)
+
+    assert len(VectorClientPool._clients.cache) == 2
+    assert len(VectorClientPool._health_checked_at) <= 3
+
+
+def test_collection_exist():
+    assert not VectorClientPool.is_collection_exist('Vector_index_test_Node')
+
+    VectorClientPool.set_collection_exist('Vector_index_test_Node')
+    assert VectorClientPool.is_collection_exist('Vector_index_test_Node')
+
+    VectorClientPool.remove_collection_exist('Vector_index_test_Node')
+    assert not VectorClientPool.is_collection_exist('Vector_index_test_Node')
@@ -0,0 +1,73 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.rag.datasource.vdb.vector_factory import Vector
+from core.rag.models.document import Document
+from models.dataset import Dataset
+
+
+def _vector(index_struct_dict=None) -> Vector:
+    vector = Vector.__new__(Vector)
+    vector._dataset = Dataset(
+        tenant_id='tenant',
+        embedding_model_provider='openai',
+        embedding_model='text-embedding-ada-002',
+        index_struct=json.dumps(index_struct_dict) if index_struct_dict else None
+    )
+    vector._embeddings = MagicMock()
+    vector._embeddings.embed_query.return_value = [0.1] * 1536
+    return vector
+
+
+def test_get_dimension_from_index_struct():
+    vector = _vector({'type': 'pgvecto_rs', 'vector_store': {'class_prefix': 'vector_index_1_node', 'dimension': 768}})
+
+    assert vector._get_dimension() == 768
+    vector._embeddings.embed_query.assert_not_called()
+
+
+def test_get_dimension_probed_once_per_model():
+    Vector._dimensions.clear()
+    index_struct_dict = {'type': 'pgvecto_rs', 'vector_store': {'class_prefix': 'vector_index_1_node'}}
+
+    vector = _vector(index_struct_dict)
+    assert vector._get_dimension() == 1536
+
+    other_vector = _vector(index_struct_dict)
+    assert other_vector._get_dimension() == 1536
+    other_vector._embeddings.embed_query.assert_not_called()
+
+
+@patch('core.rag.datasource.vdb.vector_factory.db')
+def test_record_dimension(db):
+    vector = _vector({'type': 'pgvecto_rs', 'vector_store': {'class_prefix': 'vector_index_1_node'}})
+    vector._dataset.id = 'dataset'
+    # as loaded from the database
+    set_committed_value(vector._dataset, 'index_struct', vector._dataset.index_struct)
+
+    vector._record_dimension(1024)
+
+    assert vector._dataset.index_struct_dict['vector_store']['dimension'] == 1024
+    assert vector._get_dimension() == 1024
+    # written in a transaction of its own, the dataset is not marked as changed
+    statement = db.engine.begin.return_value.__enter__.return_value.execute.call_args.args[0]
+    assert json.loads(statement.compile().params['index_struct'])['vector_store']['dimension'] == 1024
+    assert not inspect(vector._dataset).attrs.index_struct.history.has_changes()
+
+    vector._record_dimension(1024)
+    db.engine.begin.assert_called_once()
+
+
+def test_filter_duplicate_texts():
+    vector = _vector()
+    vector._vector_processor = MagicMock()
+    vector._vector_processor.exists_many.return_value = {'node-1', 'node-2'}
+    texts = [Document(page_content=str(i), metadata={'doc_id': f'node-{i}'}) for i in range(4)]
+
+    filtered_texts = vector._filter_duplicate_texts(texts)
+
+    assert [text.metadata['doc_id'] for text in filtered_texts] == ['node-0', 'node-3']
+    vector._vector_processor.exists_many.assert_called_once_with(['node-0', 'node-1', 'node-2', 'node-3'])
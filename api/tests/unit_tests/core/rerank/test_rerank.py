@@ -0,0 +1,81 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.model_runtime.entities.rerank_entities import RerankDocument, RerankResult
+from core.rag.models.document import Document
+from core.rerank.rerank import RerankRunner, RerankScoreCache
+
+pytestmark = pytest.mark.app_config(
+    RERANK_CACHE_SIZE=100,
+    RERANK_CACHE_TTL=600,
+    RERANK_BATCH_SIZE=2,
+    RERANK_MAX_CONCURRENCY=2
+)
+
+
+def _document(doc_id: str, content: str) -> Document:
+    return Document(page_content=content, metadata={
+        'doc_id': doc_id,
+        'doc_hash': doc_id,
+        'document_id': 'document',
+        'dataset_id': 'dataset',
+    })
+
+
+def _model_instance(invoked_docs: list) -> MagicMock:
+    model_instance = MagicMock()
+    model_instance.provider = 'cohere'
+    model_instance.model = 'rerank-english-v3.0'
+    model_instance.model_type_instance.get_model_schema.return_value = None
+
+    def invoke_rerank(query: str, docs: list[str], top_n: int, user=None):
+        # all scores are requested
+        assert top_n == len(docs)
+        invoked_docs.append(docs)
+        return RerankResult(model='rerank-english-v3.0', docs=[
+            RerankDocument(index=i, text=doc, score=len(doc) / 10) for i, doc in enumerate(docs)
+        ])
+
+    model_instance.invoke_rerank.side_effect = invoke_rerank
+    return model_instance
+
+
+def test_rerank(flask_app):
+    RerankScoreCache._cache = None
+    redis_client = MagicMock()
+    redis_client.mget.side_effect = lambda keys: [None] * len(keys)
+    invoked_docs = []
+    runner = RerankRunner(_model_instance(invoked_docs))
+    documents = [_document('1', 'a'), _document('2', 'bbb'), _document('1', 'a'), _document('3', 'cc'),
+                 _document('4', 'dddd'), _document('5', 'a')]
+
+    with patch('core.rerank.rerank.redis_client', redis_client):
+        rerank_documents = runner.run('query', documents, score_threshold=0.15, top_n=3)
+
+        # deduplicated by doc id and text, sent in batches of 2
+        assert sorted(doc for docs in invoked_docs for doc in docs) == ['a', 'bbb', 'cc', 'dddd']
+        assert all(len(docs) <= 2 for docs in invoked_docs)
+        assert [document.metadata['doc_id'] for document in rerank_documents] == ['4', '2', '3']
+        assert rerank_documents[0].metadata['score'] == 0.4
+
+        # scores are cached
+        invoked_docs.clear()
+        assert runner.run('query', documents, score_threshold=0.15, top_n=3) == rerank_documents
+        assert invoked_docs == []
+        assert redis_client.mget.call_count == 1
+
+
+def test_rerank_score_cache_from_redis(flask_app):
+    RerankScoreCache._cache = None
+    redis_client = MagicMock()
+    redis_client.mget.return_value = [b'0.5', None]
+
+    with patch('core.rerank.rerank.redis_client', redis_client):
+        scores = RerankScoreCache.get_many('cohere', 'rerank-english-v3.0', 'query', ['doc-1', 'doc-2'])
+
+        assert scores == {'doc-1': 0.5}
+        redis_client.mget.assert_called_once_with([
+            'rerank_score:cohere:rerank-english-v3.0:query:doc-1',
+            'rerank_score:cohere:rerank-english-v3.0:query:doc-2',
+        ])
@@ -0,0 +1,50 @@
+from core.workflow.entities.node_entities import SystemVariable
+from core.workflow.entities.variable_pool import LazyVariableValue, ValueType, VariablePool
+
+
+def test_get_nested_variable_value():
+    pool = VariablePool(system_variables={SystemVariable.QUERY: 'hi'}, user_inputs={})
+    pool.append_variable(node_id='llm', variable_key_list=['usage'], value={'total_tokens': 10, 'detail': {'a': 1}})
+    pool.append_variable(node_id='code', variable_key_list=['result', 'args1'], value=1)
+    pool.append_variable(node_id='code', variable_key_list=['result', 'args2'], value=2)
+
+    assert pool.get_variable_value(['sys', 'query']) == 'hi'
+    assert pool.get_variable_value(['llm', 'usage', 'total_tokens']) == 10
+    assert pool.get_variable_value(['llm', 'usage', 'detail', 'a']) == 1
+    assert pool.get_variable_value(['llm', 'usage', 'not_exists', 'a']) is None
+    assert pool.get_variable_value(['llm', 'usage', 'total_tokens', 'a']) is None
+    assert pool.get_variable_value(['code', 'result']) == {'args1': 1, 'args2': 2}
+    assert pool.get_variable_value(['not_exists', 'result']) is None
+
+    assert pool.get_variable_value(['llm', 'usage', 'total_tokens'], target_value_type=ValueType.STRING) == '10'
+    assert pool.get_variable_value(['code', 'result', 'args1'], target_value_type=ValueType.NUMBER) == 1
+
+
+def test_variable_pool_snapshot():
+    pool = VariablePool(system_variables={}, user_inputs={})
+    pool.append_variable(node_id='start', variable_key_list=['a'], value={'b': 1})
+
+    snapshot = pool.snapshot()
+    pool.append_variable(node_id='start', variable_key_list=['a', 'b'], value=2)
+    pool.append_variable(node_id='llm', variable_key_list=['text'], value='abc')
+
+    assert snapshot.get_variable_value(['start', 'a', 'b']) == 1
+    assert snapshot.get_variable_value(['llm', 'text']) is None
+    assert pool.get_variable_value(['start', 'a', 'b']) == 2
+    assert pool.to_dict() == {'start': {'a': {'b': 2}}, 'llm': {'text': 'abc'}}
+
+
+def test_lazy_variable_value():
+    loaded = []
+
+    def loader():
+        loaded.append(True)
+        return {'body': 'large body'}
+
+    pool = VariablePool(system_variables={}, user_inputs={})
+    pool.append_variable(node_id='http', variable_key_list=['response'], value=LazyVariableValue(loader))
+
+    assert not loaded
+    assert pool.get_variable_value(['http', 'response', 'body']) == 'large body'
+    assert pool.get_variable_value(['http', 'response']) == {'body': 'large body'}
+    assert len(loaded) == 1
@@ -0,0 +1,78 @@
+from core.workflow.entities.node_entities import NodeType
+from core.workflow.entities.workflow_graph import WorkflowGraph, WorkflowGraphCache
+from core.workflow.nodes.end.end_node import EndNode
+from core.workflow.nodes.end.entities import EndNodeData
+from core.workflow.nodes.start.start_node import StartNode
+
+
+def test_compile_workflow_graph():
+    graph = {
+        'nodes': [
+            {'id': 'start', 'data': {'title': 'Start', 'type': 'start'}},
+            {'id': 'llm-1', 'data': {'title': 'LLM 1', 'type': 'llm'}},
+            {'id': 'llm-2', 'data': {'title': 'LLM 2', 'type': 'llm'}},
+            {'id': 'dangling', 'data': {'title': 'Dangling', 'type': 'code'}},
+            {'id': 'end', 'data': {'title': 'End', 'type': 'end'}},
+        ],
+        'edges': [
+            {'source': 'start', 'target': 'llm-1', 'sourceHandle': 'source'},
+            {'source': 'start', 'target': 'llm-2', 'sourceHandle': 'source'},
+            {'source': 'llm-1', 'target': 'end', 'sourceHandle': 'source'},
+            {'source': 'llm-2', 'target': 'end', 'sourceHandle': 'source'},
+            {'source': 'dangling', 'target': 'end', 'sourceHandle': 'source'},
+            {'source': 'end', 'target': 'not-exists', 'sourceHandle': 'source'},
+        ]
+    }
+
+    workflow_graph = WorkflowGraph(graph)
+
+    assert workflow_graph.start_node_id == 'start'
+    assert workflow_graph.get_node_type('llm-1') == NodeType.LLM
+    assert [edge['target'] for edge in workflow_graph.outgoing_edges['start']] == ['llm-1', 'llm-2']
+    assert 'end' not in workflow_graph.outgoing_edges
+
+    # edges from nodes unreachable from start are not counted
+    assert workflow_graph.in_degrees == {'start': 0, 'llm-1': 1, 'llm-2': 1, 'end': 2}
+    assert workflow_graph.topological_order == ['start', 'llm-1', 'llm-2', 'end']
+
+
+def test_compile_workflow_graph_node_datas():
+    graph = {
+        'nodes': [
+            {'id': 'start', 'data': {'title': 'Start', 'type': 'start', 'variables': []}},
+            {'id': 'end', 'data': {'title': 'End', 'type': 'end', 'outputs': []}},
+            {'id': 'invalid-end', 'data': {'type': 'end'}},
+        ],
+        'edges': [
+            {'source': 'start', 'target': 'end', 'sourceHandle': 'source'},
+        ]
+    }
+
+    workflow_graph = WorkflowGraph(graph, {
+        NodeType.START: StartNode,
+        NodeType.END: EndNode
+    })
+
+    assert isinstance(workflow_graph.node_datas['end'], EndNodeData)
+    assert workflow_graph.node_datas['end'].title == 'End'
+
+    # invalid node data is left to be validated when the node runs
+    assert 'invalid-end' not in workflow_graph.node_datas
+
+
+def test_workflow_graph_cache():
+    workflow_graph = WorkflowGraph({'nodes': [], 'edges': []})
+    WorkflowGraphCache.set('workflow-id', 'graph-hash', workflow_graph)
+
+    assert WorkflowGraphCache.get('workflow-id', 'graph-hash') is workflow_graph
+    assert WorkflowGraphCache.get('workflow-id', 'other-graph-hash') is None
+
+
+def test_compile_workflow_graph_without_start_node():
+    workflow_graph = WorkflowGraph({
+        'nodes': [{'id': 'end', 'data': {'title': 'End', 'type': 'end'}}],
+        'edges': []
+    })
+
+    assert workflow_graph.start_node_id is None
+    assert workflow_graph.in_degrees == {}
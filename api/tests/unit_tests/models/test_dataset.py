@@ -0,0 +1,24 @@
+import pickle
+
+import numpy as np
+
+from models.dataset import Embedding
+
+
+def test_embedding_binary_encoding():
+    embedding = Embedding()
+    embedding.set_embedding([0.6, 0.8, 0.0])
+
+    assert embedding.embedding.startswith(Embedding.EMBEDDING_MAGIC)
+    assert len(embedding.embedding) == Embedding.EMBEDDING_HEADER.size + 3 * 4
+
+    vector = Embedding.decode_embedding(embedding.embedding)
+    assert vector.dtype == np.float32
+    assert np.allclose(vector, [0.6, 0.8, 0.0])
+    assert np.allclose(embedding.get_embedding(), [0.6, 0.8, 0.0])
+
+
+def test_embedding_legacy_pickle_decoding():
+    embedding = Embedding(embedding=pickle.dumps([0.6, 0.8], protocol=pickle.HIGHEST_PROTOCOL))
+
+    assert embedding.get_embedding() == [0.6, 0.8]